@@ -0,0 +1,177 @@
+"""Summarize the close approaches that match a query, without building them.
+
+An aggregation groups the matching rows of an `ApproachTable` - by the year or
+the month of their approach, by their NEO, or all together - and computes some
+metrics of each group: the number of approaches, and the minimum, maximum and
+mean of their distances and velocities.
+
+Each group is first reduced to a running total (see `group_totals`): a list of
+its count, and of the minimum, maximum, sum and number of its known distances
+and velocities. A value that isn't known (NaN) only counts towards the count:
+the other metrics of a group without any known value are None.
+Totals are computed in one pass over the rows' columns, and never create a
+`CloseApproach` for a row. Totals of disjoint sets of rows can be combined with
+`merge_totals` - the `VectorizedEngine` computes totals over NumPy arrays, and
+leaves the few rows it can't group (such as those without a time) to this module.
+Only then are the totals turned into the requested metrics, by `summarize`.
+"""
+import datetime
+import math
+
+from table import NO_TIME
+
+
+# The ways to group approaches.
+GROUPINGS = ('year', 'month', 'neo')
+
+# The metrics that can be computed for each group.
+METRICS = ('count',
+           'min_distance', 'mean_distance', 'max_distance',
+           'min_velocity', 'mean_velocity', 'max_velocity')
+
+# The positions of the fields of a running total.
+(COUNT, MIN_DISTANCE, MAX_DISTANCE, SUM_DISTANCE, KNOWN_DISTANCE,
+ MIN_VELOCITY, MAX_VELOCITY, SUM_VELOCITY, KNOWN_VELOCITY) = range(9)
+
+
+def check_aggregation(group_by, metrics):
+    """Raise a ValueError unless a grouping and a collection of metrics are known.
+
+    :param group_by: One of `GROUPINGS`, or None.
+    :param metrics: A collection of names from `METRICS`.
+    """
+    if group_by is not None and group_by not in GROUPINGS:
+        raise ValueError(f"Unknown grouping {group_by!r}: use one of {', '.join(GROUPINGS)}")
+    for metric in metrics:
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric {metric!r}: use one of {', '.join(METRICS)}")
+
+
+def month_label(year, month):
+    """Return the label of a month group, such as '2020-01'."""
+    return f"{year:04d}-{month:02d}"
+
+
+def group_totals(table, rows, group_by=None):
+    """Compute the running total of each group of rows, in one pass.
+
+    :param table: An `ApproachTable`.
+    :param rows: An iterable of row numbers.
+    :param group_by: One of `GROUPINGS`, or None to put every row in one group.
+    :return: A dictionary from the label of each group to its running total.
+    """
+    group_of = _group_function(table, group_by)
+    distances = table.distances
+    velocities = table.velocities
+    totals = {}
+    for row in rows:
+        group = group_of(row)
+        distance = distances[row]
+        velocity = velocities[row]
+        total = totals.get(group)
+        if total is None:
+            total = totals[group] = empty_total()
+        total[COUNT] += 1
+        # NaN is never less or greater than anything, so it's never a minimum or a maximum.
+        if distance < total[MIN_DISTANCE]:
+            total[MIN_DISTANCE] = distance
+        if distance > total[MAX_DISTANCE]:
+            total[MAX_DISTANCE] = distance
+        if distance == distance:
+            total[SUM_DISTANCE] += distance
+            total[KNOWN_DISTANCE] += 1
+        if velocity < total[MIN_VELOCITY]:
+            total[MIN_VELOCITY] = velocity
+        if velocity > total[MAX_VELOCITY]:
+            total[MAX_VELOCITY] = velocity
+        if velocity == velocity:
+            total[SUM_VELOCITY] += velocity
+            total[KNOWN_VELOCITY] += 1
+    return totals
+
+
+def empty_total():
+    """Return the running total of a group without any row."""
+    return [0, math.inf, -math.inf, 0.0, 0, math.inf, -math.inf, 0.0, 0]
+
+
+def merge_totals(totals, others):
+    """Add the running totals of other, disjoint rows to a dictionary of running totals, in place.
+
+    :param totals: A dictionary from group labels to running totals.
+    :param others: Another such dictionary.
+    :return: `totals`.
+    """
+    for group, other in others.items():
+        total = totals.get(group)
+        if total is None:
+            totals[group] = list(other)
+            continue
+        total[COUNT] += other[COUNT]
+        total[MIN_DISTANCE] = min(total[MIN_DISTANCE], other[MIN_DISTANCE])
+        total[MAX_DISTANCE] = max(total[MAX_DISTANCE], other[MAX_DISTANCE])
+        total[SUM_DISTANCE] += other[SUM_DISTANCE]
+        total[KNOWN_DISTANCE] += other[KNOWN_DISTANCE]
+        total[MIN_VELOCITY] = min(total[MIN_VELOCITY], other[MIN_VELOCITY])
+        total[MAX_VELOCITY] = max(total[MAX_VELOCITY], other[MAX_VELOCITY])
+        total[SUM_VELOCITY] += other[SUM_VELOCITY]
+        total[KNOWN_VELOCITY] += other[KNOWN_VELOCITY]
+    return totals
+
+
+def summarize(totals, metrics):
+    """Turn running totals into metrics.
+
+    Groups are ordered by their label; the group of approaches without a label
+    (such as those without a time, grouped by year) comes last.
+
+    :param totals: A dictionary from group labels to running totals.
+    :param metrics: A collection of names from `METRICS`.
+    :return: A dictionary from the label of each group to a dictionary of its metrics, by name.
+    """
+    return {group: {metric: _metric(totals[group], metric) for metric in metrics}
+            for group in sorted(totals, key=lambda group: (group is None, group))}
+
+
+def empty_summary(metrics):
+    """Return the metrics of an empty group: a count of 0, and None for everything else."""
+    return {metric: 0 if metric == 'count' else None for metric in metrics}
+
+
+def _metric(total, metric):
+    """Compute one metric from a running total."""
+    if metric == 'count':
+        return total[COUNT]
+    kind, attribute = metric.split('_')
+    offset = MIN_DISTANCE if attribute == 'distance' else MIN_VELOCITY
+    known = total[offset + 3]
+    if not known:
+        return None
+    if kind == 'min':
+        return float(total[offset])
+    if kind == 'max':
+        return float(total[offset + 1])
+    return float(total[offset + 2]) / known
+
+
+def _group_function(table, group_by):
+    """Return a function from a row number to the label of its group."""
+    if group_by is None:
+        return lambda row: None
+    if group_by == 'neo':
+        return table.designation
+
+    minutes = table.minutes
+    labels = {}
+
+    def group_of(row):
+        minute = minutes[row]
+        if minute == NO_TIME:
+            return None
+        day = minute // 1440
+        label = labels.get(day)
+        if label is None:
+            date = datetime.date.fromordinal(day)
+            label = labels[day] = date.year if group_by == 'year' else month_label(date.year, date.month)
+        return label
+    return group_of
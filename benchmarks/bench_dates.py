@@ -0,0 +1,76 @@
+"""Compare `helpers.cd_to_datetime` and `helpers.datetime_to_str` with `strptime` and `strftime`.
+
+Every `cd` value of a close approach data file is converted once per round, so
+the timings correspond to one full load (or one full export) of that file.
+
+To run this benchmark from the project root, run:
+
+    $ python3 -m benchmarks.bench_dates [path/to/cad.json]
+
+The file defaults to `data/cad.json`, or the test data if that doesn't exist.
+"""
+import datetime
+import pathlib
+import sys
+import timeit
+
+from extract import _stream_cad_rows
+import helpers
+
+
+PROJECT_ROOT = pathlib.Path(__file__).parent.parent.resolve()
+DEFAULT_CAD_FILES = (PROJECT_ROOT / 'data' / 'cad.json', PROJECT_ROOT / 'tests' / 'test-cad-2020.json')
+
+
+def read_calendar_dates(cad_json_path):
+    """Read the `cd` value of every close approach in a JSON file."""
+    with open(cad_json_path) as in_json:
+        rows = _stream_cad_rows(in_json)
+        cd = next(rows).index('cd')
+        return [row[cd] for row in rows]
+
+
+def best_of(func, repeat=5):
+    """Return the best wall-clock time, in seconds, of several calls to `func`."""
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main(cad_json_path):
+    """Time both conversions and print a small report."""
+    dates = read_calendar_dates(cad_json_path)
+    print(f"{len(dates)} calendar dates from {cad_json_path}")
+
+    def parse_with_strptime():
+        strptime = datetime.datetime.strptime
+        return [strptime(cd, "%Y-%b-%d %H:%M") for cd in dates]
+
+    def parse_with_helpers():
+        # Start cold every round, as a fresh process loading the file would.
+        helpers._parse_cd_date.cache_clear()
+        return [helpers.cd_to_datetime(cd) for cd in dates]
+
+    datetimes = parse_with_strptime()
+    assert parse_with_helpers() == datetimes
+
+    def format_with_strftime():
+        return [datetime.datetime.strftime(dt, "%Y-%m-%d %H:%M") for dt in datetimes]
+
+    def format_with_helpers():
+        return [helpers.datetime_to_str(dt) for dt in datetimes]
+
+    assert format_with_helpers() == format_with_strftime()
+
+    for label, baseline, fast in (
+            ('cd_to_datetime', parse_with_strptime, parse_with_helpers),
+            ('datetime_to_str', format_with_strftime, format_with_helpers)):
+        slow_time, fast_time = best_of(baseline), best_of(fast)
+        print(f"{label:>16}: {slow_time * 1000:8.1f} ms -> {fast_time * 1000:8.1f} ms "
+              f"({slow_time / fast_time:.1f}x faster)")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        path = pathlib.Path(sys.argv[1])
+    else:
+        path = next((p for p in DEFAULT_CAD_FILES if p.exists()), DEFAULT_CAD_FILES[-1])
+    main(path)
@@ -0,0 +1,64 @@
+"""Compare evaluating filters one by one with evaluating them as one compiled predicate.
+
+Every close approach is tested against a few sets of filters that no index can
+answer, so the timings correspond to full scans.
+
+To run this benchmark from the project root, run:
+
+    $ python3 -m benchmarks.bench_filters [path/to/neos.csv path/to/cad.json]
+
+The files default to those in `data/`, or the test data if they don't exist.
+"""
+import pathlib
+import sys
+import timeit
+
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from filters import create_filters, compile_filters
+
+
+PROJECT_ROOT = pathlib.Path(__file__).parent.parent.resolve()
+DEFAULT_FILES = (
+    (PROJECT_ROOT / 'data' / 'neos.csv', PROJECT_ROOT / 'data' / 'cad.json'),
+    (PROJECT_ROOT / 'tests' / 'test-neos-2020.csv', PROJECT_ROOT / 'tests' / 'test-cad-2020.json'),
+)
+CRITERIA = (
+    {'distance_min': 0.001},
+    {'distance_min': 0.001, 'velocity_max': 50},
+    {'distance_max': 0.4, 'velocity_min': 1, 'velocity_max': 60, 'hazardous': False},
+)
+
+
+def best_of(func, repeat=5):
+    """Return the best wall-clock time, in seconds, of several calls to `func`."""
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main(neo_csv_path, cad_json_path):
+    """Time both ways of scanning and print a small report."""
+    approaches = list(NEODatabase(load_neos(neo_csv_path), load_approaches(cad_json_path)).query())
+    print(f"{len(approaches)} close approaches from {cad_json_path}")
+
+    for criteria in CRITERIA:
+        filters = create_filters(**criteria)
+
+        def scan_one_by_one():
+            return [approach for approach in approaches if all(map(lambda f: f(approach), filters))]
+
+        def scan_compiled():
+            return list(filter(compile_filters(filters), approaches))
+
+        assert scan_compiled() == scan_one_by_one()
+        slow_time, fast_time = best_of(scan_one_by_one), best_of(scan_compiled)
+        label = ', '.join(f'{key}={value}' for key, value in criteria.items())
+        print(f"{label}:\n    {slow_time * 1000:8.1f} ms -> {fast_time * 1000:8.1f} ms "
+              f"({slow_time / fast_time:.1f}x faster)")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2:
+        paths = pathlib.Path(sys.argv[1]), pathlib.Path(sys.argv[2])
+    else:
+        paths = next((pair for pair in DEFAULT_FILES if pair[1].exists()), DEFAULT_FILES[-1])
+    main(*paths)
@@ -0,0 +1,60 @@
+"""Measure the speedup of loading close approaches with a pool of processes, against the number of workers.
+
+Each worker decodes and converts its own ranges of the `data` array, so the
+parent process only puts columns back together: its CPU time, also reported,
+is the part of the load that doesn't get faster with more cores.
+
+To run this benchmark from the project root, run:
+
+    $ python3 -m benchmarks.bench_load [path/to/cad.json]
+
+The file defaults to the one in `data/`, or the test data if it doesn't exist.
+"""
+import os
+import pathlib
+import sys
+import time
+
+from extract import load_approach_table
+
+
+PROJECT_ROOT = pathlib.Path(__file__).parent.parent.resolve()
+DEFAULT_FILES = (
+    PROJECT_ROOT / 'data' / 'cad.json',
+    PROJECT_ROOT / 'tests' / 'test-cad-2020.json',
+)
+
+
+def timed_load(cad_json_path, workers, repeat=3):
+    """Load a file several times, and return the table with the best wall-clock and parent CPU times, in seconds."""
+    best_wall = best_cpu = float('inf')
+    for _ in range(repeat):
+        wall, cpu = time.perf_counter(), time.process_time()
+        table = load_approach_table(cad_json_path, workers)
+        best_wall = min(best_wall, time.perf_counter() - wall)
+        best_cpu = min(best_cpu, time.process_time() - cpu)
+    return table, best_wall, best_cpu
+
+
+def main(cad_json_path):
+    """Time the load with an increasing number of workers and print a small report."""
+    cores = os.cpu_count() or 1
+    expected, baseline, baseline_cpu = timed_load(cad_json_path, None)
+    print(f"{len(expected)} close approaches from {cad_json_path}, {cores} CPU core(s)")
+    print(f"  in this process: {baseline * 1000:8.1f} ms")
+
+    workers = 2
+    while workers <= max(2, cores):
+        table, elapsed, cpu = timed_load(cad_json_path, workers)
+        assert list(table.minutes) == list(expected.minutes)
+        print(f"  {workers:3} worker(s):   {elapsed * 1000:8.1f} ms ({baseline / elapsed:.2f}x), "
+              f"{cpu * 1000:.1f} ms of CPU in the parent ({baseline_cpu / cpu:.1f}x less)")
+        workers *= 2
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        path = pathlib.Path(sys.argv[1])
+    else:
+        path = next((path for path in DEFAULT_FILES if path.exists()), DEFAULT_FILES[-1])
+    main(path)
@@ -0,0 +1,90 @@
+"""Measure the memory taken by each NEO and each close approach once they are loaded.
+
+The data files are loaded (and linked in an `NEODatabase`) while `tracemalloc`
+traces allocations, once with `CloseApproach` objects and once with an
+`ApproachTable`. The memory still allocated afterwards is divided by the number
+of NEOs and close approaches.
+
+As a baseline, the objects are also loaded as instances of equivalent classes
+whose attributes are kept in a per-instance `__dict__`, rather than in the
+`__slots__` of `NearEarthObject` and `CloseApproach`.
+
+To run this benchmark from the project root, run:
+
+    $ python3 -m benchmarks.bench_memory [path/to/neos.csv path/to/cad.json]
+
+The files default to `data/`, or the test data if those don't exist.
+"""
+import contextlib
+import gc
+import pathlib
+import sys
+import tracemalloc
+import unittest.mock
+
+from database import NEODatabase
+from extract import load_neos, load_approaches, load_approach_table
+from models import NearEarthObject, CloseApproach
+
+
+PROJECT_ROOT = pathlib.Path(__file__).parent.parent.resolve()
+DEFAULT_FILES = (
+    (PROJECT_ROOT / 'data' / 'neos.csv', PROJECT_ROOT / 'data' / 'cad.json'),
+    (PROJECT_ROOT / 'tests' / 'test-neos-2020.csv', PROJECT_ROOT / 'tests' / 'test-cad-2020.json'),
+)
+
+
+def traced(func, *args):
+    """Call `func` while tracing allocations.
+
+    :return: The result of the call, and the number of bytes it still holds.
+    """
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = func(*args)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def with_dict(cls):
+    """Make a class equivalent to a model class, but whose instances keep their attributes in a `__dict__`."""
+    namespace = {name: value for name, value in vars(cls).items()
+                 if name not in cls.__slots__ and name not in ('__slots__', '__dict__', '__weakref__')}
+    return type(cls.__name__, (), namespace)
+
+
+def dict_models():
+    """Return a context manager in which the data files are loaded into instances with a `__dict__`."""
+    return unittest.mock.patch.multiple('extract', NearEarthObject=with_dict(NearEarthObject),
+                                        CloseApproach=with_dict(CloseApproach))
+
+
+def main(neo_csv_path, cad_json_path):
+    """Load the data files every way and print a small report."""
+    with dict_models():
+        neos, dict_bytes = traced(load_neos, neo_csv_path)
+    neos, neo_bytes = traced(load_neos, neo_csv_path)
+    print(f"{len(neos)} NEOs: {dict_bytes / len(neos):.0f} bytes per NEO with a __dict__, "
+          f"{neo_bytes / len(neos):.0f} with __slots__")
+
+    for label, loader, models in (('CloseApproach objects with a __dict__', load_approaches, dict_models),
+                                  ('CloseApproach objects with __slots__', load_approaches, contextlib.ExitStack),
+                                  ('ApproachTable', load_approach_table, contextlib.ExitStack)):
+        with models():
+            neos = load_neos(neo_csv_path)
+            database, approach_bytes = traced(lambda: NEODatabase(neos, loader(cad_json_path)))
+        count = len(database._approaches)
+        print(f"{count} close approaches, as {label}: {approach_bytes / count:.0f} bytes per approach "
+              f"({approach_bytes / 2 ** 20:.1f} MiB in all, including the links to the NEOs)")
+        del database, neos
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2:
+        paths = pathlib.Path(sys.argv[1]), pathlib.Path(sys.argv[2])
+    else:
+        paths = next((files for files in DEFAULT_FILES if files[0].exists()), DEFAULT_FILES[-1])
+    main(*paths)
@@ -0,0 +1,74 @@
+"""Measure the speedup of queries evaluated on shards by a pool of processes, against the number of workers.
+
+The query is chosen so that no index narrows it down: its filters are evaluated
+on every close approach, first one approach at a time and then, if NumPy is
+installed, over NumPy arrays (in this process, or by each worker on its shards).
+
+A speedup needs more than one CPU core: on a single core, the workers only add
+the cost of sending shards to them.
+
+To run this benchmark from the project root, run:
+
+    $ python3 -m benchmarks.bench_shards [path/to/neos.csv path/to/cad.json]
+
+The files default to those in `data/`, or the test data if they don't exist.
+"""
+import os
+import pathlib
+import sys
+import timeit
+
+from database import NEODatabase
+from extract import load_neos, load_approach_table
+from filters import create_filters
+import vectorized
+
+
+PROJECT_ROOT = pathlib.Path(__file__).parent.parent.resolve()
+DEFAULT_FILES = (
+    (PROJECT_ROOT / 'data' / 'neos.csv', PROJECT_ROOT / 'data' / 'cad.json'),
+    (PROJECT_ROOT / 'tests' / 'test-neos-2020.csv', PROJECT_ROOT / 'tests' / 'test-cad-2020.json'),
+)
+CRITERIA = {'distance_min': 0.1, 'velocity_min': 8, 'velocity_max': 40}
+
+
+def best_of(func, repeat=3):
+    """Return the best wall-clock time, in seconds, of several calls to `func`."""
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def report(database, filters, cores):
+    """Time the query in this process and with an increasing number of workers."""
+    baseline = best_of(lambda: list(database.query(filters)))
+    expected = list(database.query(filters))
+    print(f"  in this process: {baseline * 1000:8.1f} ms ({len(expected)} matches)")
+
+    workers = 2
+    while workers <= max(2, cores):
+        executor = database.enable_parallel_queries(workers, shard_size=max(1000, len(expected) // (4 * workers)))
+        assert list(database.query(filters)) == expected
+        elapsed = best_of(lambda: list(database.query(filters)))
+        print(f"  {workers:3} worker(s):   {elapsed * 1000:8.1f} ms ({baseline / elapsed:.2f}x)")
+        executor.shutdown()
+        workers *= 2
+
+
+def main(neo_csv_path, cad_json_path):
+    """Time the query with and without NumPy, and print a small report."""
+    neos, approaches = load_neos(neo_csv_path), load_approach_table(cad_json_path)
+    filters = create_filters(**CRITERIA)
+    cores = os.cpu_count() or 1
+    print(f"{len(approaches)} close approaches from {cad_json_path}, {cores} CPU core(s)")
+    for vectorize in (False, True):
+        if vectorize and not vectorized.available():
+            break
+        print("vectorized:" if vectorize else "one approach at a time:")
+        report(NEODatabase(neos, approaches, vectorize=vectorize), filters, cores)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2:
+        paths = pathlib.Path(sys.argv[1]), pathlib.Path(sys.argv[2])
+    else:
+        paths = next((pair for pair in DEFAULT_FILES if pair[1].exists()), DEFAULT_FILES[-1])
+    main(*paths)
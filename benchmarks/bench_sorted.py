@@ -0,0 +1,60 @@
+"""Measure top-k sorted queries: a full sort, a bounded heap and a walk of the sorted index.
+
+To run this benchmark from the project root, run:
+
+    $ python3 -m benchmarks.bench_sorted [path/to/neos.csv path/to/cad.json]
+
+The files default to those in `data/`, or the test data if they don't exist.
+"""
+import pathlib
+import sys
+import timeit
+
+from database import NEODatabase
+from extract import load_neos, load_approach_table
+from filters import create_filters
+
+
+PROJECT_ROOT = pathlib.Path(__file__).parent.parent.resolve()
+DEFAULT_FILES = (
+    (PROJECT_ROOT / 'data' / 'neos.csv', PROJECT_ROOT / 'data' / 'cad.json'),
+    (PROJECT_ROOT / 'tests' / 'test-neos-2020.csv', PROJECT_ROOT / 'tests' / 'test-cad-2020.json'),
+)
+QUERIES = (
+    ('closest approaches', {}, 'distance', False),
+    ('fastest approaches of hazardous NEOs', {'hazardous': True}, 'velocity', True),
+    ('largest NEOs within 0.1 au', {'distance_max': 0.1}, 'diameter', True),
+)
+LIMIT = 10
+
+
+def best_of(func, repeat=3):
+    """Return the best wall-clock time, in seconds, of several calls to `func`."""
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main(neo_csv_path, cad_json_path):
+    """Time each query sorted in full, with a heap and with an index walk, and print a small report."""
+    database = NEODatabase(load_neos(neo_csv_path), load_approach_table(cad_json_path))
+    print(f"{len(database._approaches)} close approaches from {cad_json_path}, top {LIMIT}")
+    for label, criteria, sort_by, descending in QUERIES:
+        filters = create_filters(**criteria)
+        full = best_of(lambda: database.query_sorted(filters, sort_by, descending)[:LIMIT])
+        # Without the sort attribute's index, the first matches are found with a heap.
+        database._index(sort_by)
+        index = database._indexes.pop(sort_by)
+        heap = best_of(lambda: database.query_sorted(filters, sort_by, descending, LIMIT))
+        database._indexes[sort_by] = index
+        walk = best_of(lambda: database.query_sorted(filters, sort_by, descending, LIMIT))
+        print(f"  {label}, by {sort_by}:")
+        print(f"    full sort: {full * 1000:8.1f} ms")
+        print(f"    heap:      {heap * 1000:8.1f} ms ({full / heap:.1f}x)")
+        print(f"    index:     {walk * 1000:8.1f} ms ({full / walk:.1f}x)")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2:
+        paths = pathlib.Path(sys.argv[1]), pathlib.Path(sys.argv[2])
+    else:
+        paths = next((pair for pair in DEFAULT_FILES if pair[1].exists()), DEFAULT_FILES[-1])
+    main(*paths)
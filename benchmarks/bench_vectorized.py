@@ -0,0 +1,65 @@
+"""Compare queries evaluated over NumPy columns with queries evaluated one approach at a time.
+
+The queries are chosen so that no index narrows them down much: their filters
+are evaluated on most close approaches. The timings include generating the
+matching `CloseApproach` objects.
+
+To run this benchmark from the project root (with NumPy installed), run:
+
+    $ python3 -m benchmarks.bench_vectorized [path/to/neos.csv path/to/cad.json]
+
+The files default to those in `data/`, or the test data if they don't exist.
+"""
+import pathlib
+import sys
+import timeit
+
+from database import NEODatabase
+from extract import load_neos, load_approach_table
+from filters import create_filters
+import vectorized
+
+
+PROJECT_ROOT = pathlib.Path(__file__).parent.parent.resolve()
+DEFAULT_FILES = (
+    (PROJECT_ROOT / 'data' / 'neos.csv', PROJECT_ROOT / 'data' / 'cad.json'),
+    (PROJECT_ROOT / 'tests' / 'test-neos-2020.csv', PROJECT_ROOT / 'tests' / 'test-cad-2020.json'),
+)
+CRITERIA = (
+    {'distance_min': 0.001, 'hazardous': True},
+    {'distance_max': 0.4, 'velocity_min': 25},
+    {'velocity_max': 60, 'diameter_min': 0.5, 'hazardous': False},
+)
+
+
+def best_of(func, repeat=5):
+    """Return the best wall-clock time, in seconds, of several calls to `func`."""
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main(neo_csv_path, cad_json_path):
+    """Time both engines and print a small report."""
+    if not vectorized.available():
+        sys.exit("NumPy isn't installed.")
+    scalar = NEODatabase(load_neos(neo_csv_path), load_approach_table(cad_json_path), vectorize=False)
+    vector = NEODatabase(load_neos(neo_csv_path), load_approach_table(cad_json_path))
+    vector.build_indexes()
+    scalar.build_indexes()
+    print(f"{len(scalar._approaches)} close approaches from {cad_json_path}")
+
+    for criteria in CRITERIA:
+        filters = create_filters(**criteria)
+        assert [str(a) for a in scalar.query(filters)] == [str(a) for a in vector.query(filters)]
+        slow_time = best_of(lambda: list(scalar.query(filters)))
+        fast_time = best_of(lambda: list(vector.query(filters)))
+        label = ', '.join(f'{key}={value}' for key, value in criteria.items())
+        print(f"{label} ({vector.explain(filters).strategy}, {len(list(vector.query(filters)))} matches):\n"
+              f"    {slow_time * 1000:8.1f} ms -> {fast_time * 1000:8.1f} ms ({slow_time / fast_time:.1f}x faster)")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2:
+        paths = pathlib.Path(sys.argv[1]), pathlib.Path(sys.argv[2])
+    else:
+        paths = next((pair for pair in DEFAULT_FILES if pair[1].exists()), DEFAULT_FILES[-1])
+    main(*paths)
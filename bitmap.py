@@ -0,0 +1,114 @@
+"""Index the rows of an `ApproachTable` by low-cardinality predicates, as bitmaps.
+
+A bitmap is a Python `int` used as a set of row numbers: bit `r` is set if row
+`r` is in the set. Intersections and unions of sets are then single bitwise
+`&` and `|` operations, carried out 30 bits at a time by the interpreter,
+without touching any row.
+
+A `BitmapIndex` holds the bitmaps of the rows that have a known NEO, of the
+rows whose NEO is potentially hazardous, of the rows whose NEO has a known
+diameter, and of the rows whose approach occurs in each year. Only once the bitmaps of a query have been
+combined are the row numbers read back, in internal order, with `bitmap_rows`.
+"""
+import datetime
+
+from table import NO_TIME, NO_NEO
+
+
+# The positions of the set bits of each byte.
+_BYTE_BITS = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+
+
+def bitmap_from_rows(rows, count):
+    """Build the bitmap of a collection of rows.
+
+    :param rows: An iterable of row numbers, each less than `count`.
+    :param count: The number of rows of the table.
+    :return: A bitmap, as an `int`.
+    """
+    # Setting bits of a bytearray is O(1) per row, unlike `bits |= 1 << row` on an int.
+    data = bytearray((count + 7) // 8)
+    for row in rows:
+        data[row >> 3] |= 1 << (row & 7)
+    return int.from_bytes(data, 'little')
+
+
+def bitmap_from_flags(flags):
+    """Build the bitmap of the rows whose flag is true.
+
+    :param flags: A sequence with a boolean for each row.
+    :return: A bitmap, as an `int`.
+    """
+    return bitmap_from_rows((row for row, flag in enumerate(flags) if flag), len(flags))
+
+
+def bitmap_span(start, stop):
+    """Build the bitmap of the rows from `start` (inclusive) to `stop` (exclusive)."""
+    if stop <= start:
+        return 0
+    return ((1 << (stop - start)) - 1) << start
+
+
+def bitmap_count(bits):
+    """Return the number of rows in a bitmap."""
+    return bin(bits).count('1')
+
+
+def bitmap_rows(bits):
+    """Return the rows of a bitmap, in increasing order.
+
+    :param bits: A bitmap, as an `int`.
+    :return: A list of row numbers.
+    """
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+    return [8 * position + bit
+            for position, byte in enumerate(data) if byte
+            for bit in _BYTE_BITS[byte]]
+
+
+class BitmapIndex:
+    """Bitmaps of the approaches of a database, by known NEO, hazardousness, known diameter and year."""
+
+    def __init__(self, database):
+        """Build the bitmaps of the approaches of a database.
+
+        :param database: An `NEODatabase`.
+        """
+        minutes = database._table.minutes
+        self.count = len(minutes)
+        self.all = bitmap_span(0, self.count)
+        self.hazardous = bitmap_from_flags(database._column('hazardous'))
+        self.linked = bitmap_from_flags([index != NO_NEO for index in database._table.neo_indexes])
+        self.diameter_known = bitmap_from_flags([diameter == diameter for diameter in database._column('diameter')])
+
+        # Group the rows by the year of their approach.
+        rows_of = {}
+        year_of = {}
+        for row, minute in enumerate(minutes):
+            if minute == NO_TIME:
+                continue
+            day = minute // 1440
+            year = year_of.get(day)
+            if year is None:
+                year = year_of[day] = datetime.date.fromordinal(day).year
+            rows_of.setdefault(year, []).append(row)
+        self.years = {year: bitmap_from_rows(rows, self.count) for year, rows in rows_of.items()}
+
+    def years_between(self, lo=None, hi=None):
+        """Cover a range of times with the bitmaps of whole years.
+
+        :param lo: The first minute of the range (inclusive), or None.
+        :param hi: The minute after the last one of the range (exclusive), or None.
+        :return: A pair of the bitmap of the rows in every year that overlaps the range, and whether that bitmap is exactly the range (because it starts and ends on year boundaries).
+        """
+        bits = 0
+        exact = True
+        for year, year_bits in self.years.items():
+            start = datetime.date(year, 1, 1).toordinal() * 1440
+            stop = datetime.date(year + 1, 1, 1).toordinal() * 1440 if year < datetime.MAXYEAR else None
+            if (hi is not None and start >= hi) or (lo is not None and stop is not None and stop <= lo):
+                continue
+            bits |= year_bits
+            if (lo is not None and start < lo) or (hi is not None and (stop is None or stop > hi)):
+                exact = False
+        return bits, exact
@@ -0,0 +1,107 @@
+"""Remember the results of recent queries, to answer repeated queries without a scan.
+
+A `QueryCache` maps a normalized form of a collection of filters (see
+`cache_key`) to the row numbers of the close approaches that match them. It
+evicts the least recently used entries once the row numbers it holds exceed a
+given number of bytes.
+
+Each entry is only valid for one version of the data: the cache is told the
+version of the data on each lookup and store, and forgets everything as soon as
+that version changes.
+"""
+from array import array
+from collections import OrderedDict
+import sys
+
+
+# The default bound on the memory taken by the cached row numbers.
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+def cache_key(filters):
+    """Return a hashable key that identifies a collection of filters, regardless of their order.
+
+    :param filters: A collection of filters capturing user-specified criteria.
+    :return: A hashable key, or None if some filter can't be identified by its value.
+    """
+    try:
+        key = frozenset(f.key() for f in filters)
+        hash(key)
+    except (AttributeError, TypeError):
+        return None
+    return key
+
+
+class QueryCache:
+    """A memory-bounded LRU mapping from filter keys to matching row numbers."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        """Create a new, empty `QueryCache`.
+
+        :param max_bytes: The maximum number of bytes taken by the cached row numbers.
+        """
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.version = None
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        """Return `len(self)`, the number of cached queries."""
+        return len(self._entries)
+
+    def get(self, key, version):
+        """Return the cached rows for a key, or None on a miss.
+
+        :param key: A key, as returned by `cache_key`.
+        :param version: The current version of the data.
+        :return: An `array` of row numbers, or None.
+        """
+        if version != self.version:
+            self.clear()
+            self.version = version
+        rows = self._entries.get(key)
+        if rows is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return rows
+
+    def put(self, key, version, rows):
+        """Cache the rows that match a key, evicting the least recently used entries if needed.
+
+        Results that are larger than the whole cache aren't cached.
+
+        :param key: A key, as returned by `cache_key`.
+        :param version: The version of the data that the rows were computed from.
+        :param rows: A collection of row numbers.
+        :return: The rows, as an `array`.
+        """
+        rows = array('l', rows)
+        size = sys.getsizeof(rows)
+        if version != self.version or size > self.max_bytes:
+            return rows
+        if key in self._entries:
+            self.bytes -= sys.getsizeof(self._entries.pop(key))
+        while self._entries and self.bytes + size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes -= sys.getsizeof(evicted)
+            self.evictions += 1
+        self._entries[key] = rows
+        self.bytes += size
+        return rows
+
+    def clear(self):
+        """Forget every cached query (but not the counters)."""
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self):
+        """Return a short, human-readable summary of the cache's usage."""
+        lookups = self.hits + self.misses
+        rate = f"{self.hits / lookups:.0%}" if lookups else "n/a"
+        return (f"{len(self)} queries cached in {self.bytes / 1024:.1f} of {self.max_bytes / 1024:.0f} KiB; "
+                f"{self.hits} hits, {self.misses} misses (hit rate {rate}), {self.evictions} evictions")
@@ -0,0 +1,53 @@
+"""Find conjunctions: close approaches of different NEOs at nearly the same time.
+
+A conjunction is a group of close approaches, all within a window of time of
+each other, of at least two (or `min_neos`) different NEOs. Only the largest
+such groups are reported: a group that could take in the next approach without
+becoming wider than the window isn't one yet, so no group is contained in
+another. Groups can still overlap - the approaches of a busy day may form
+several groups, each as wide as the window.
+
+`find_conjunctions` sweeps a line over the rows in time order, keeping the rows
+within one window behind it, along with how many of them belong to each NEO.
+Each row enters and leaves that window once, so the sweep costs O(n) once the
+rows are sorted; approaches are never compared pairwise.
+"""
+from collections import deque
+
+from table import NO_NEO, NO_TIME
+
+
+def find_conjunctions(table, rows, window, min_neos=2):
+    """Generate the largest groups of rows, of at least `min_neos` NEOs, within a window of time.
+
+    Rows without a time or without an NEO are left out.
+
+    :param table: A linked `ApproachTable`.
+    :param rows: An iterable of row numbers, sorted by time.
+    :param window: The longest time from the first to the last row of a group, in minutes.
+    :param min_neos: The least number of different NEOs in a group.
+    :yield: Lists of row numbers, sorted by time, in the order of their first row.
+    """
+    minutes = table.minutes
+    neo_indexes = table.neo_indexes
+    rows = [row for row in rows if minutes[row] != NO_TIME and neo_indexes[row] != NO_NEO]
+
+    current = deque()
+    counts = {}
+    for position, row in enumerate(rows):
+        time = minutes[row]
+        # Move the start of the window up to the sweep line.
+        while current and time - minutes[current[0]] > window:
+            neo = neo_indexes[current.popleft()]
+            counts[neo] -= 1
+            if not counts[neo]:
+                del counts[neo]
+        current.append(row)
+        neo = neo_indexes[row]
+        counts[neo] = counts.get(neo, 0) + 1
+
+        # The group is complete once the next row is too late for it.
+        following = position + 1
+        if len(counts) >= min_neos and (following == len(rows)
+                                        or minutes[rows[following]] - minutes[current[0]] > window):
+            yield list(current)
@@ -1,16 +1,66 @@
 """A database encapsulating collections of near-Earth objects and their close approaches.
 
 A `NEODatabase` holds an interconnected data set of NEOs and close approaches.
-It provides methods to fetch an NEO by primary designation or by name, as well
-as a method to query the set of close approaches that match a collection of
-user-specified criteria.
+It provides methods to fetch an NEO by primary designation (in any of its usual
+forms, with a `search.DesignationIndex`) or by name (and to find NEOs by
+approximate names, with a `search.NameIndex`), as well as a method to query the
+set of close approaches that match a collection of user-specified criteria.
 
 Under normal circumstances, the main module creates one NEODatabase from the
 data on NEOs and close approaches extracted by `extract.load_neos` and
 `extract.load_approaches`.
 
+The close approaches can be supplied either as a collection of `CloseApproach`
+objects or as an `ApproachTable` (see `extract.load_approach_table`). In the
+latter case the approaches only exist as compact columns, and `CloseApproach`
+compatible views of them are created as they are requested. Either way, the
+database keeps an `ApproachTable` of the approaches.
+
+The database also keeps a `SortedIndex` of the approaches by time and, once
+they are first needed (or `build_indexes` is called), by distance, by velocity
+and by the diameter of their NEO, along with a `BitmapIndex` of the approaches
+by hazardousness, known diameter and year, and an `NEOStore` of the NEOs,
+indexed by diameter and hazardousness. A `QueryPlanner` decides, for each
+query, which of these indexes to use to find candidate approaches and in which
+order to evaluate the remaining filters on them; `explain` shows that decision.
+`query_sorted` returns the matching approaches sorted by an attribute, walking
+the attribute's sorted index when only the first few of them are wanted, and
+`aggregate` summarizes them - by year, month or NEO - without building them.
+`approaches_near` finds the approaches within a window of time around a time
+(or, with `approaches_near_many`, around each of many times) in the time index.
+`conjunctions` finds groups of approaches of different NEOs at nearly the same
+time, with a sweep line over the matching approaches.
+
+When NumPy is installed, filters on many candidate approaches are evaluated
+over NumPy arrays of their columns, by a `vectorized.VectorizedEngine`, rather
+than one approach at a time.
+
+A long-lived process, such as the interactive shell, can also `enable_query_cache`
+to remember the approaches that match recent queries (see `cache.QueryCache`).
+With `enable_parallel_queries`, filters on large numbers of candidates are
+evaluated on shards of them by a pool of processes (see `shards.ShardedExecutor`),
+each of which vectorizes what it can of its shard in place of this process.
+
 You'll edit this file in Tasks 2 and 3.
 """
+import datetime
+import math
+
+from aggregate import check_aggregation, group_totals, merge_totals, summarize, empty_summary
+from cache import QueryCache, cache_key, DEFAULT_MAX_BYTES
+from conjunction import find_conjunctions
+from bitmap import BitmapIndex
+from filters import compile_filters, RangeFilter
+from helpers import datetime_to_minutes
+from index import SortedIndex
+from models import time_order
+from neostore import NEOStore
+from ordering import top_rows, walk_index
+from planner import QueryPlanner
+from search import DesignationIndex, NameIndex
+from shards import ShardedExecutor, SHARD_SIZE
+from table import ApproachTable, NO_NEO
+import vectorized
 
 
 class NEODatabase:
@@ -22,7 +72,7 @@ class NEODatabase:
     querying for close approaches that match criteria.
     """
 
-    def __init__(self, neos, approaches):
+    def __init__(self, neos, approaches, vectorize=True):
         """Create a new `NEODatabase`.
 
         As a precondition, this constructor assumes that the collections of NEOs
@@ -34,11 +84,16 @@ class NEODatabase:
         matches the `.designation` attribute of the corresponding NEO. This
         constructor modifies the supplied NEOs and close approaches to link them
         together - after it's done, the `.approaches` attribute of each NEO has
-        a collection of that NEO's close approaches, and the `.neo` attribute of
-        each close approach references the appropriate NEO.
+        a collection of that NEO's close approaches, sorted by time, and the
+        `.neo` attribute of each close approach references the appropriate NEO.
+
+        If `approaches` is an `ApproachTable`, the table is linked to the NEOs
+        instead, and the `.approaches` attribute of each NEO becomes a sequence
+        of views of its rows of the table.
 
         :param neos: A collection of `NearEarthObject`s.
-        :param approaches: A collection of `CloseApproach`es.
+        :param approaches: A collection of `CloseApproach`es, or an `ApproachTable`.
+        :param vectorize: Whether to evaluate filters over NumPy arrays, if NumPy is installed.
         """
         # Additional mappings to assist queries
         self._designations_mapping = {}
@@ -49,9 +104,134 @@ class NEODatabase:
                 self._names_mapping[neo.name] = neo
 
         # Link NEOs and Close Approaches together
-        self._approaches = [ca.link_neos_and_approaches(
-            self._designations_mapping) for ca in approaches]
-        self._neos = [ca.neo for ca in self._approaches]
+        if isinstance(approaches, ApproachTable):
+            approaches.link(neos)
+            self._table = approaches
+            self._approaches = approaches
+        else:
+            self._approaches = [ca.link_neos_and_approaches(
+                self._designations_mapping) for ca in approaches]
+            for neo in neos:
+                neo.approaches.sort(key=time_order)
+            self._table = ApproachTable.from_approaches(self._approaches, neos)
+        # Each NEO once, with indexes on the attributes of NEOs.
+        self._neos = NEOStore(self._table)
+
+        # Sorted indexes of the approaches, by attribute. Only the time index
+        # is built up front; the others are built when first needed.
+        self._indexes = {'time': SortedIndex(self._table.minutes, 'q')}
+        self._bitmap_index = None
+        self._name_index = None
+        self._designation_index = None
+        self._planner = QueryPlanner(self)
+
+        # The NumPy columns of the approaches, built when first needed.
+        self._vectorize = vectorize and vectorized.available()
+        self._engine = None
+        self._cache = None
+        self._executor = None
+
+    def __getstate__(self):
+        """Return the state to pickle: the NumPy columns and the query cache are left out."""
+        state = self.__dict__.copy()
+        state['_engine'] = None
+        state['_cache'] = None
+        state['_executor'] = None
+        return state
+
+    def enable_query_cache(self, max_bytes=DEFAULT_MAX_BYTES):
+        """Remember the approaches that match recent queries, to answer them again without a scan.
+
+        The cache is emptied whenever the approaches change.
+
+        :param max_bytes: The maximum number of bytes used by the cache.
+        :return: The `QueryCache`.
+        """
+        self._cache = QueryCache(max_bytes)
+        return self._cache
+
+    def enable_parallel_queries(self, workers, shard_size=SHARD_SIZE):
+        """Evaluate filters on large numbers of candidate approaches across a pool of processes.
+
+        :param workers: The number of worker processes; with 1 (or fewer), queries are evaluated as usual.
+        :param shard_size: The number of candidate approaches evaluated by a worker at a time.
+        :return: The `ShardedExecutor`.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+        self._executor = ShardedExecutor(self, workers, shard_size)
+        return self._executor
+
+    @property
+    def query_cache(self):
+        """The `QueryCache` of this database, or None if it isn't enabled."""
+        return self._cache
+
+    def build_indexes(self):
+        """Build every sorted index that hasn't been built yet.
+
+        This is useful before saving a snapshot of the database, so that the
+        indexes are saved along with it.
+        """
+        for attribute in _INDEXED_ATTRIBUTES:
+            self._index(attribute)
+        self._bitmaps()
+        self._names()
+        self._designations()
+        self._neos.build_indexes()
+
+    def _column(self, attribute):
+        """Return the value of an attribute for each approach, in internal order.
+
+        :param attribute: One of 'time' (in minutes), 'distance', 'velocity', 'diameter' or 'hazardous'.
+        :return: A sequence of values.
+        """
+        table = self._table
+        if attribute == 'time':
+            return table.minutes
+        if attribute == 'distance':
+            return table.distances
+        if attribute == 'velocity':
+            return table.velocities
+        # Fan the attributes of each NEO out to its approaches.
+        neos = table.neos
+        if attribute == 'diameter':
+            return [neos[i].diameter if i != NO_NEO else math.nan for i in table.neo_indexes]
+        if attribute == 'hazardous':
+            return [i != NO_NEO and bool(neos[i].hazardous) for i in table.neo_indexes]
+        raise ValueError(f"Unknown attribute {attribute!r}")
+
+    def _has_index(self, attribute):
+        """Return whether the sorted index of the approaches by an attribute has been built."""
+        return attribute in self._indexes
+
+    def _index(self, attribute):
+        """Return the sorted index of the approaches by an attribute, building it if needed.
+
+        :param attribute: One of 'time', 'distance', 'velocity' or 'diameter'.
+        :return: A `SortedIndex`.
+        """
+        if attribute not in self._indexes:
+            self._indexes[attribute] = SortedIndex(self._column(attribute))
+        return self._indexes[attribute]
+
+    def _bitmaps(self):
+        """Return the `BitmapIndex` of the approaches, building it if needed."""
+        if self._bitmap_index is None:
+            self._bitmap_index = BitmapIndex(self)
+        return self._bitmap_index
+
+    def _designations(self):
+        """Return the `DesignationIndex` of the NEOs, building it if needed."""
+        if self._designation_index is None:
+            self._designation_index = DesignationIndex(self._designations_mapping.values())
+        return self._designation_index
+
+    def _names(self):
+        """Return the `NameIndex` of the NEOs, building it if needed."""
+        if self._name_index is None:
+            self._name_index = NameIndex(self._designations_mapping.values())
+        return self._name_index
 
     def get_neo_by_designation(self, designation):
         """Find and return an NEO by its primary designation.
@@ -60,13 +240,28 @@ class NEODatabase:
 
         Each NEO in the data set has a unique primary designation, as a string.
 
-        The matching is exact - check for spelling and capitalization if no
-        match is found.
+        The designation can be written in any of its usual forms - with or
+        without its space, in any case, packed, or with an SPK-style prefix (see
+        `search.normalize_designation`).
 
         :param designation: The primary designation of the NEO to search for.
         :return: The `NearEarthObject` with the desired primary designation, or `None`.
         """
-        return self._designations_mapping.get(designation, None)
+        neo = self._designations_mapping.get(designation, None)
+        if neo is None:
+            neo = self._designations().get(designation)
+        return neo
+
+    def get_neos_by_designations(self, designations):
+        """Find and return the NEOs of many primary designations at once.
+
+        Each designation can be written in any of the forms accepted by
+        `get_neo_by_designation`.
+
+        :param designations: An iterable of primary designations.
+        :return: A list of the matching `NearEarthObject` (or `None`) of each designation, in order.
+        """
+        return self._designations().get_many(designations)
 
     def get_neo_by_name(self, name):
         """Find and return an NEO by its name.
@@ -84,6 +279,43 @@ class NEODatabase:
         """
         return self._names_mapping.get(name, None)
 
+    def find_neos_by_name(self, name, max_distance=2, limit=None):
+        """Find the NEOs that a name, as typed by a user, most likely refers to.
+
+        Unlike `get_neo_by_name`, the matching ignores case, and accepts a prefix
+        of a name or (failing that) a name misspelt by up to `max_distance`
+        inserted, deleted or substituted characters. See `NameIndex.find`.
+
+        :param name: A name, a prefix of a name, or a misspelt name.
+        :param max_distance: The largest edit distance of a misspelt name.
+        :param limit: The maximum number of NEOs to return, or None for all of them.
+        :return: A list of matching `NearEarthObject`s, the best matches first.
+        """
+        return self._names().find(name, max_distance, limit)
+
+    def complete_name(self, prefix):
+        """Return the names of the NEOs that start with a prefix, in any case, ordered by name.
+
+        :param prefix: The start of a name.
+        :return: A list of names.
+        """
+        return self._names().complete(prefix)
+
+    def query_neos(self, filters=()):
+        """Find the NEOs that match a collection of criteria on the attributes of NEOs.
+
+        The criteria can only be on the diameter and hazardousness of NEOs (such
+        as those created by `create_filters` from `diameter_min`, `diameter_max`
+        and `hazardous`); they are answered with the indexes of an `NEOStore`.
+        Each NEO is returned once, whether it has any close approach or not.
+
+        :param filters: A collection of filters on the attributes of NEOs.
+        :return: A list of matching `NearEarthObject`s, in the order of the data.
+        :raises ValueError: If a filter isn't a criterion on the attributes of NEOs.
+        """
+        neos = self._neos
+        return [neos[position] for position in neos.query(filters)]
+
     def query(self, filters=[]):
         """Query close approaches to generate those that match a collection of filters.
 
@@ -95,14 +327,305 @@ class NEODatabase:
         The `CloseApproach` objects are generated in internal order, which isn't
         guaranteed to be sorted meaningfully, although is often sorted by time.
 
+        If the query cache is enabled, every match is found and cached before
+        the first one is generated, so that a query that is stopped early (by
+        `filters.limit`, say) is still answered from the cache the next time.
+
         :param filters: A collection of filters capturing user-specified criteria.
         :return: A stream of matching `CloseApproach` objects.
         """
+        rows = self._cached_rows(filters)
+        if rows is not None:
+            yield from map(self._approaches.__getitem__, rows)
+            return
+
+        rows, filters = self._candidates(filters)
+        if self._is_sharded(rows, filters):
+            for shard in self._executor.matching_rows(rows, filters):
+                yield from map(self._approaches.__getitem__, shard)
+            return
+
+        approaches = map(self._approaches.__getitem__, rows)
         if len(filters) == 0:
-            for approach in self._approaches:
-                yield approach
+            yield from approaches
+        else:
+            # Yield the close approaches that pass all the filters, compiled into one predicate.
+            yield from filter(compile_filters(filters), approaches)
+
+    def query_sorted(self, filters=(), sort_by='time', descending=False, limit=None):
+        """Return the close approaches that match a collection of filters, sorted by an attribute.
+
+        Approaches with equal values stay in internal order, and approaches whose
+        value is unknown (such as the diameter of an NEO without one) come last.
+
+        With a limit, only the first approaches are kept - either with a bounded
+        heap over every matching approach, or, when few rows are expected to be
+        read before enough of them match, by walking the attribute's sorted index.
+
+        :param filters: A collection of filters capturing user-specified criteria.
+        :param sort_by: One of 'time', 'distance', 'velocity' or 'diameter'.
+        :param descending: Whether to sort the largest values first.
+        :param limit: The maximum number of approaches to return, or 0 or None for all of them, as with `filters.limit`.
+        :return: A list of matching `CloseApproach` objects.
+        """
+        if sort_by not in _INDEXED_ATTRIBUTES:
+            raise ValueError(f"Unknown attribute {sort_by!r}")
+        if not limit:
+            limit = None
+        elif limit < 0:
+            return []
+        filters = list(filters)
+        rows = self._cached_rows(filters)
+        if rows is None:
+            ordered = self._walk_rows(filters, sort_by, descending, limit) if limit is not None else None
+            if ordered is not None:
+                return [self._approaches[row] for row in ordered]
+            rows = self._matching_rows(filters)
+        ordered = top_rows(rows, self._column(sort_by), limit, descending)
+        return [self._approaches[row] for row in ordered]
+
+    def approaches_near(self, time, window, filters=()):
+        """Return the close approaches within a window of time around a time, sorted by time.
+
+        The approaches within the window are a run of the sorted index of the
+        approaches by time, found by binary search: for k approaches in the
+        window, this costs O(log n + k).
+
+        :param time: A `datetime`, or a `date` (the start of that day).
+        :param window: A `timedelta`, or a number of days, on either side of `time` (inclusive).
+        :param filters: A collection of filters that the approaches must also match.
+        :return: A list of matching `CloseApproach` objects, sorted by time.
+        """
+        return self.approaches_near_many([time], window, filters)[0]
+
+    def approaches_near_many(self, times, window, filters=()):
+        """Return the close approaches within a window of time around each of many times.
+
+        The times are visited in chronological order, in one pass over the sorted
+        index of the approaches by time: each binary search starts where the
+        previous one ended. An approach within several windows is only matched
+        against the filters once.
+
+        :param times: A collection of `datetime`s, or `date`s (the start of those days).
+        :param window: A `timedelta`, or a number of days, on either side of each time (inclusive).
+        :param filters: A collection of filters that the approaches must also match.
+        :return: A list with, for each time in the given order, a list of its matching `CloseApproach` objects, sorted by time.
+        """
+        width = _window_minutes(window)
+        centers = [datetime_to_minutes(time if isinstance(time, datetime.datetime)
+                                       else datetime.datetime.combine(time, datetime.time()))
+                   for time in times]
+        filters = list(filters)
+        predicate = compile_filters(filters) if filters else None
+        approaches = self._approaches
+        index = self._index('time')
+
+        matches = {}
+        results = [None] * len(centers)
+        start = 0
+        for position in sorted(range(len(centers)), key=centers.__getitem__):
+            center = centers[position]
+            start, stop = index.span(center - width, center + width, first=start)
+            rows = index.rows_in(start, stop)
+            if predicate is not None:
+                for row in rows:
+                    if row not in matches:
+                        matches[row] = predicate(approaches[row])
+                rows = [row for row in rows if matches[row]]
+            results[position] = [approaches[row] for row in rows]
+        return results
+
+    def conjunctions(self, window, filters=(), min_neos=2):
+        """Find the groups of close approaches of different NEOs within a window of time of each other.
+
+        The filters are applied first, and a sweep line then goes over the
+        matching approaches in time order (see `conjunction.find_conjunctions`):
+        the cost is that of sorting the matches by time, and approaches are
+        never compared pairwise. The groups are generated as the sweep finds them.
+
+        :param window: A `timedelta`, or a number of days: the longest time from the first to the last approach of a group.
+        :param filters: A collection of filters capturing user-specified criteria.
+        :param min_neos: The least number of different NEOs in a group.
+        :return: An iterator of lists of `CloseApproach` objects, sorted by time, in the order of their first approach.
+        :raises ValueError: If the window is negative, or `min_neos` is less than 2.
+        """
+        width = _window_minutes(window)
+        if min_neos < 2:
+            raise ValueError("A conjunction takes at least 2 NEOs")
+        rows = self._cached_rows(filters)
+        if rows is None:
+            rows = self._matching_rows(filters)
+        if not self._index('time').is_identity():
+            rows = sorted(rows, key=self._table.minutes.__getitem__)
+        approaches = self._approaches
+        return ([approaches[row] for row in group]
+                for group in find_conjunctions(self._table, rows, width, min_neos))
+
+    def aggregate(self, filters=(), group_by=None, metrics=('count',)):
+        """Summarize the close approaches that match a collection of filters, without building them.
+
+        The matching approaches are grouped by the year or the month of their
+        approach, or by the primary designation of their NEO. The metrics of each
+        group are computed in one pass over the columns of its rows - over NumPy
+        arrays, if NumPy is installed and there are many rows.
+
+        :param filters: A collection of filters capturing user-specified criteria.
+        :param group_by: One of 'year', 'month' or 'neo', or None for no grouping.
+        :param metrics: A collection of metrics: 'count', or 'min_', 'mean_' or 'max_' followed by 'distance' or 'velocity'.
+        :return: A dictionary of each metric, by name - or, if grouped, a dictionary from each group to such a dictionary, ordered by group.
+        """
+        check_aggregation(group_by, metrics)
+        rows = self._cached_rows(filters)
+        if rows is None:
+            rows = self._matching_rows(filters)
+
+        if self._vectorize and len(rows) >= vectorized.MIN_ROWS:
+            totals, left_out = self._vector_engine().group_totals(rows, group_by)
+            merge_totals(totals, group_totals(self._table, left_out, group_by))
         else:
-            for approach in self._approaches:
-                # If this close approach passes all the filters, yield this close approach
-                if all(map(lambda f: f(approach), filters)):
-                    yield approach
+            totals = group_totals(self._table, rows, group_by)
+        summary = summarize(totals, metrics)
+        if group_by is None:
+            return summary.get(None) or empty_summary(metrics)
+        return summary
+
+    def _cached_rows(self, filters):
+        """Return the rows that match a collection of filters through the query cache, if it's enabled.
+
+        :param filters: A collection of filters capturing user-specified criteria.
+        :return: An `array` of row numbers, in internal order, or None if the query can't be cached.
+        """
+        cache = self._cache
+        key = cache_key(filters) if cache is not None else None
+        if key is None:
+            return None
+        version = self._table.version
+        rows = cache.get(key, version)
+        if rows is None:
+            rows = cache.put(key, version, self._matching_rows(filters))
+        return rows
+
+    def _walk_rows(self, filters, sort_by, descending, limit):
+        """Find the first rows that match a collection of filters by walking the sorted index of an attribute.
+
+        A range filter on the attribute itself narrows the walk to its span of
+        the index. The index is only walked if it's been built and if the rows
+        expected to be read before `limit` of them match are fewer than the rows
+        that match overall.
+
+        :param filters: A list of filters capturing user-specified criteria.
+        :param sort_by: The attribute to sort by.
+        :param descending: Whether to sort the largest values first.
+        :param limit: The number of rows to find.
+        :return: A list of at most `limit` row numbers, in sorted order, or None if the index isn't worth walking.
+        """
+        if not self._has_index(sort_by):
+            return None
+        index = self._indexes[sort_by]
+        start, stop = 0, len(index)
+        others = []
+        for f in filters:
+            if isinstance(f, RangeFilter) and f.attribute == sort_by:
+                if f.is_empty():
+                    return []
+                lo, hi, lo_inclusive, hi_inclusive = f.bounds()
+                low, high = index.span(lo, hi, lo_inclusive, hi_inclusive)
+                start, stop = max(start, low), min(stop, high)
+            else:
+                others.append(f)
+
+        selectivity = self._planner.selectivity(others)
+        if selectivity == 0 or limit / selectivity > (stop - start) * selectivity:
+            return None
+
+        predicate = compile_filters(others) if others else None
+        approaches = self._approaches
+        rows = []
+        for row in walk_index(index, descending, start, stop):
+            if predicate is None or predicate(approaches[row]):
+                rows.append(row)
+                if len(rows) == limit:
+                    return rows
+
+        # Rows whose value is unknown aren't in the index; they come last, unless a range on the attribute excludes them.
+        if len(others) == len(filters) and len(index) < len(self._table):
+            column = self._column(sort_by)
+            for row in range(len(column)):
+                if column[row] != column[row] and (predicate is None or predicate(approaches[row])):
+                    rows.append(row)
+                    if len(rows) == limit:
+                        break
+        return rows
+
+    def _candidates(self, filters):
+        """Find the candidate rows for a query, and the filters that remain to be evaluated on them.
+
+        :param filters: A collection of filters capturing user-specified criteria.
+        :return: A pair of a sequence of row numbers, in internal order, and a list of filters.
+        """
+        plan = self._planner.plan(filters)
+        if self._is_sharded(plan.rows, plan.filters):
+            # The workers vectorize their own shards; build the columns first, so the workers inherit them.
+            if self._vectorize:
+                self._vector_engine()
+            return plan.rows, plan.filters
+        return self._vectorized_rows(plan.rows, plan.filters)
+
+    def _vectorized_rows(self, rows, filters):
+        """Evaluate the filters that can be evaluated over NumPy arrays on candidate rows, if there are enough of them.
+
+        :param rows: A sequence of candidate row numbers, in internal order.
+        :param filters: A list of filters.
+        :return: A pair of a sequence of row numbers, in internal order, and a list of the filters left to evaluate.
+        """
+        if filters and self._vectorize and len(rows) >= vectorized.MIN_ROWS:
+            return self._vector_engine().filter_rows(rows, filters)
+        return rows, filters
+
+    def _vector_engine(self):
+        """Return the `VectorizedEngine` of the current version of the approaches, building it if needed."""
+        if self._engine is None or self._engine.version != self._table.version:
+            self._engine = vectorized.VectorizedEngine(self)
+        return self._engine
+
+    def _is_sharded(self, rows, filters):
+        """Return whether filters should be evaluated on candidate rows by the pool of processes."""
+        executor = self._executor
+        return bool(filters) and executor is not None and executor.parallel and len(rows) > executor.shard_size
+
+    def _matching_rows(self, filters):
+        """Return the row numbers of every approach that matches a collection of filters, in internal order."""
+        rows, filters = self._candidates(filters)
+        if len(filters) == 0:
+            return rows
+        if self._is_sharded(rows, filters):
+            return [row for shard in self._executor.matching_rows(rows, filters) for row in shard]
+        predicate = compile_filters(filters)
+        approaches = self._approaches
+        return [row for row in rows if predicate(approaches[row])]
+
+    def explain(self, filters=()):
+        """Describe how a collection of filters would be evaluated by `query`.
+
+        :param filters: A collection of filters capturing user-specified criteria.
+        :return: A `QueryPlan`, with the candidate rows and the filters to evaluate on them, in order.
+        """
+        return self._planner.plan(filters)
+
+
+# The attributes that the approaches can be indexed by.
+_INDEXED_ATTRIBUTES = ('time', 'distance', 'velocity', 'diameter')
+
+
+def _window_minutes(window):
+    """Convert a window of time, as a `timedelta` or a number of days, to minutes.
+
+    :raises ValueError: If the window is negative.
+    """
+    if isinstance(window, datetime.timedelta):
+        width = window / datetime.timedelta(minutes=1)
+    else:
+        width = window * 1440
+    if width < 0:
+        raise ValueError("Window must not be negative")
+    return width
@@ -5,78 +5,526 @@ described in the project instructions, into a collection of `NearEarthObject`s.
 
 The `load_approaches` function extracts close approach data from a JSON file,
 formatted as described in the project instructions, into a collection of
-`CloseApproach` objects.
+`CloseApproach` objects. The `iter_approaches` function does the same, but
+streams the file and generates the `CloseApproach` objects one at a time. The
+`load_approach_table` function extracts the same data into the compact columns
+of an `ApproachTable` instead.
+
+Both `load_approaches` and `load_approach_table` can split the work between a
+pool of worker processes. The `data` array is cut into ranges of bytes, and
+each worker reads, decodes and converts the rows of its own range, returning
+them as columns; the parent process only puts the columns back together.
 
 The main module calls these functions with the arguments provided at the command
 line, and uses the resulting collections to build an `NEODatabase`.
 
+Designations and names are interned as they are extracted, so that an NEO and
+all of its close approaches share a single copy of each string.
+
 You'll edit this file in Task 2.
 """
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import csv
+from itertools import islice
 import json
+import mmap
+from operator import itemgetter
+import re
+from sys import intern
 
+from helpers import cd_to_datetime, datetime_to_minutes
 from models import NearEarthObject, CloseApproach
+from table import ApproachTable
+
+
+# The number of characters read from the JSON file at a time while streaming.
+_CHUNK_SIZE = 1 << 16
+
+# The number of rows of close approach data converted at a time.
+_ROWS_PER_CHUNK = 20000
+
+# The number of bytes of the `data` array given to a worker process at a time,
+# and the number of bytes read from the start of the file to find that array.
+_BYTES_PER_RANGE = 1 << 22
+_HEAD_SIZE = 1 << 16
 
+# The end of the `data` array: the `]` of its last row and its own `]`, or just its `]` if it's empty.
+_DATA_END = re.compile(rb'\][ \t\r\n]*\]')
+_EMPTY_DATA = re.compile(rb'[ \t\r\n]*\]')
 
-def load_neos(neo_csv_path):
+_decoder = json.JSONDecoder()
+
+
+def load_neos(neo_csv_path, extra_fields=()):
     """Read near-Earth object information from a CSV file.
 
+    Only the columns that are needed are pulled out of each row: their indexes
+    are looked up once, from the header. Additional columns (such as `H`,
+    `albedo` or the orbital elements) can be requested with `extra_fields`; they
+    are saved, by column name, in the `extras` dictionary of each NEO. Numeric
+    values become floats, empty values become `None`, and anything else is kept
+    as a string.
+
     :param neo_csv_path: A path to a CSV file containing data about near-Earth objects.
+    :param extra_fields: Names of additional columns to keep for each NEO.
     :return: A collection of `NearEarthObject`s.
+    :raises ValueError: If a column is missing, or an extra field is a column that's already read.
     """
     with open(neo_csv_path, 'r') as in_csv:
-        reader = csv.DictReader(in_csv)
+        reader = csv.reader(in_csv)
+        header = next(reader, [])
+        extra_fields = tuple(extra_fields)
+        columns = {}
+        for field in ('pdes', 'name', 'pha', 'diameter') + extra_fields:
+            if field in columns:
+                raise ValueError(f"NEO data column {field!r} is already read")
+            try:
+                columns[field] = header.index(field)
+            except ValueError:
+                raise ValueError(f"NEO data has no {field!r} column")
+
+        project = itemgetter(*columns.values())
         neos = []
 
         for row in reader:
-            pdes = str(row['pdes'])
-            name = str(row['name']) or None
-            pha = True if row['pha'] == 'Y' else False
+            if not row:
+                continue
+            pdes, name, pha, diameter, *extras = project(row)
 
             try:
-                diameter = float(row['diameter']) if row['diameter'] else float('nan')
+                diameter = float(diameter) if diameter else float('nan')
             except ValueError:
                 raise ValueError('NEO diameter must be a number')
 
             neo = NearEarthObject(
-                designation=pdes,
-                name=name,
+                designation=intern(pdes),
+                name=intern(name) if name else None,
                 diameter=diameter,
-                hazardous=pha
+                hazardous=pha == 'Y',
+                extras=dict(zip(extra_fields, map(_convert_extra, extras)))
             )
             neos.append(neo)
 
     return neos
 
 
-def load_approaches(cad_json_path):
+def _convert_extra(value):
+    """Convert the value of an extra NEO column from its CSV text.
+
+    :param value: The text of the column.
+    :return: A float if the text is numeric, `None` if it's empty, and the text otherwise.
+    """
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def load_approaches(cad_json_path, workers=None):
     """Read close approach data from a JSON file.
 
+    With more than one worker, ranges of the file are decoded by a pool of
+    processes (see `load_approach_table`), and the `CloseApproach`es are built
+    from their columns in the order of the file, so the result is the same as
+    with a single worker.
+
     :param cad_json_path: A path to a JSON file containing data about close approaches.
+    :param workers: The number of processes used to decode the file.
     :return: A collection of `CloseApproach`es.
     """
+    if not workers or workers <= 1:
+        return list(iter_approaches(cad_json_path))
+
+    close_approaches = []
+    for designations, times, distances, velocities in _map_ranges(cad_json_path, _fields_from_rows, workers):
+        close_approaches.extend(
+            CloseApproach(designation=designation, time=time, distance=distance, velocity=velocity)
+            for designation, time, distance, velocity in zip(designations, times, distances, velocities)
+        )
+    return close_approaches
+
+
+def load_approach_table(cad_json_path, workers=None):
+    """Read close approach data from a JSON file into an `ApproachTable`.
+
+    The rows are converted in chunks, straight into the typed columns of the
+    table, without creating a `CloseApproach` for each of them.
+
+    With more than one worker, the `data` array is cut into ranges of bytes,
+    which a pool of processes decode and convert into columns (see
+    `_map_ranges`).
+
+    :param cad_json_path: A path to a JSON file containing data about close approaches.
+    :param workers: The number of processes used to decode and convert the rows.
+    :return: An `ApproachTable` of the close approaches, in the order of the file.
+    """
+    table = ApproachTable()
+    if workers and workers > 1:
+        chunks = _map_ranges(cad_json_path, _columns_from_rows, workers)
+    else:
+        chunks = _map_chunks(cad_json_path, _columns_from_rows)
+    for columns in chunks:
+        table.extend(*columns)
+    return table
+
+
+def iter_approaches(cad_json_path):
+    """Stream close approach data from a JSON file.
+
+    Rows of the `data` array are decoded one at a time and turned straight into
+    `CloseApproach` objects, so the whole JSON document is never held in memory.
+
+    :param cad_json_path: A path to a JSON file containing data about close approaches.
+    :yield: The `CloseApproach`es, in the order of the file.
+    """
     with open(cad_json_path, 'r') as in_json:
-        json_data = json.load(in_json)
-        list_of_close_approaches = [
-            dict(zip(json_data['fields'], data)) for data in json_data['data']]
-        close_approaches = []
+        rows = _stream_cad_rows(in_json)
+        columns = _cad_columns(next(rows))
+        for row in rows:
+            yield _approach_from_row(row, *columns)
+
+
+def _cad_columns(fields):
+    """Find the indexes of the fields needed to build a `CloseApproach`.
+
+    :param fields: The `fields` list of the JSON file.
+    :return: The indexes of the `des`, `cd`, `dist` and `v_rel` fields.
+    """
+    try:
+        return tuple(fields.index(field) for field in ('des', 'cd', 'dist', 'v_rel'))
+    except ValueError:
+        raise ValueError('Close approach data must have des, cd, dist and v_rel fields')
+
+
+def _map_chunks(cad_json_path, convert):
+    """Convert the rows of a JSON file of close approaches, one chunk at a time, in this process.
+
+    :param cad_json_path: A path to a JSON file containing data about close approaches.
+    :param convert: A function of a list of rows and the indexes of the `des`, `cd`, `dist` and `v_rel` fields.
+    :yield: The result of `convert` for each chunk, in the order of the file.
+    """
+    with open(cad_json_path, 'r') as in_json:
+        rows = _stream_cad_rows(in_json)
+        columns = _cad_columns(next(rows))
+        for chunk in iter(lambda: list(islice(rows, _ROWS_PER_CHUNK)), []):
+            yield convert(chunk, *columns)
+
+
+def _map_ranges(cad_json_path, convert, workers):
+    """Decode and convert the rows of a JSON file of close approaches, one range of bytes at a time, in a pool of processes.
+
+    The `data` array is cut into ranges of about `_BYTES_PER_RANGE` bytes (and at
+    least one per worker); a bounded number of ranges is in flight at a time. If
+    the `data` array can't be located (see `_locate_data`), the rows are
+    converted by `_map_chunks` instead.
+
+    The ranges are cut at arbitrary bytes, and each worker finds the rows of its
+    range by their brackets (see `_convert_range`). This assumes that no string
+    within a row contains a `[` or a `]`, as is the case of the fields of the
+    close approach data API.
+
+    :param cad_json_path: A path to a JSON file containing data about close approaches.
+    :param convert: A function of a list of rows and the indexes of the `des`, `cd`, `dist` and `v_rel` fields.
+    :param workers: The number of processes used to decode and convert the ranges.
+    :yield: The result of `convert` for each range, in the order of the file.
+    """
+    located = _locate_data(cad_json_path)
+    if located is None:
+        yield from _map_chunks(cad_json_path, convert)
+        return
+    fields, start, stop = located
+    columns = _cad_columns(fields)
+    count = max(workers, -(-(stop - start) // _BYTES_PER_RANGE))
+    bounds = [start + (stop - start) * i // count for i in range(count + 1)]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for lo, hi in zip(bounds, bounds[1:]):
+            pending.append(executor.submit(_convert_range, cad_json_path, lo, hi, convert, columns))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _locate_data(cad_json_path):
+    """Find the `fields` of a JSON file of close approaches, and the bytes of its `data` array.
+
+    The members before `data` must fit in the first `_HEAD_SIZE` bytes of the
+    file. The rows hold no arrays, so the `data` array ends at the first `]`
+    that follows the `]` of a row; the members after it are read from there.
+
+    :param cad_json_path: A path to a JSON file containing data about close approaches.
+    :return: A tuple of the `fields` list, the offset just after the `[` that opens the `data` array and the offset of the `]` that closes it; or None if they can't be found.
+    """
+    members = {}
+    try:
+        with open(cad_json_path, 'rb') as in_json, \
+                mmap.mmap(in_json.fileno(), 0, access=mmap.ACCESS_READ) as contents:
+            # Latin-1 maps each byte to one character, so positions in the text are offsets in the file.
+            head = contents[:_HEAD_SIZE].decode('latin-1')
+            pos = _skip_whitespace(head, 0)
+            if head[pos] != '{':
+                return None
+            pos = _read_members(head, pos + 1, members, False)
+            if pos is None or head[pos] != '[':
+                return None
+            start = pos + 1
+            end = _EMPTY_DATA.match(contents, start) or _DATA_END.search(contents, start)
+            if end is None:
+                return None
+            stop = end.end() - 1
+            if _read_members(contents[stop + 1:].decode('latin-1'), 0, members, True) is not None:
+                return None
+    except (ValueError, IndexError):
+        return None
+    fields = members.get('fields')
+    if not isinstance(fields, list):
+        return None
+    return fields, start, stop
+
+
+def _read_members(text, pos, members, after_value):
+    """Read the members of a JSON object, up to its `data` member or its end.
+
+    :param text: The text of the JSON document, or of a part of it.
+    :param pos: A position just after the `{` of the object, or after the value of one of its members.
+    :param members: A dictionary that the members that are read are added to.
+    :param after_value: Whether `pos` is after the value of a member.
+    :return: The position of the value of the `data` member, or None at the end of the object.
+    :raises ValueError: If the text is malformed, or ends too soon.
+    :raises IndexError: If the text ends too soon.
+    """
+    while True:
+        pos = _skip_whitespace(text, pos)
+        if text[pos] == '}':
+            return None
+        if after_value:
+            if text[pos] != ',':
+                raise ValueError(f"Malformed close approach data: expected ',', found {text[pos]!r}")
+            pos = _skip_whitespace(text, pos + 1)
+        key, pos = _decoder.raw_decode(text, pos)
+        pos = _skip_whitespace(text, pos)
+        if text[pos] != ':':
+            raise ValueError(f"Malformed close approach data: expected ':', found {text[pos]!r}")
+        pos = _skip_whitespace(text, pos + 1)
+        if key == 'data':
+            return pos
+        members[key], pos = _decoder.raw_decode(text, pos)
+        after_value = True
+
+
+def _skip_whitespace(text, pos):
+    """Return the position of the first character of `text`, from `pos`, that isn't JSON whitespace."""
+    while pos < len(text) and text[pos] in ' \t\r\n':
+        pos += 1
+    return pos
+
+
+def _convert_range(cad_json_path, start, stop, convert, columns):
+    """Decode and convert the rows of the `data` array that start within a range of bytes.
+
+    The rows hold no arrays (nor brackets within their strings), so each `[`
+    within the `data` array opens a row, and the next `]` closes it. The rows
+    that start within the range run from its first `[` to the `]` that closes
+    its last `[`, which may be after the end of the range; they are decoded
+    all at once.
+
+    :param cad_json_path: A path to a JSON file containing data about close approaches.
+    :param start: The offset of the first byte of the range.
+    :param stop: The offset just after the last byte of the range.
+    :param convert: A function of a list of rows and the indexes of the `des`, `cd`, `dist` and `v_rel` fields.
+    :param columns: The indexes of the `des`, `cd`, `dist` and `v_rel` fields.
+    :return: The result of `convert` for the rows.
+    """
+    with open(cad_json_path, 'rb') as in_json:
+        in_json.seek(start)
+        buf = in_json.read(stop - start)
+        first = buf.find(b'[')
+        if first < 0:
+            return convert([], *columns)
+        last = buf.rfind(b'[')
+        end = buf.find(b']', last)
+        while end < 0:
+            more = in_json.read(_CHUNK_SIZE)
+            if not more:
+                raise ValueError("Malformed close approach data: a row isn't closed")
+            buf += more
+            end = buf.find(b']', last)
+
+    rows = json.loads(b'[' + buf[first:end + 1] + b']')
+    if not all(type(row) is list for row in rows):
+        raise ValueError("Malformed close approach data: rows must be arrays")
+    return convert(rows, *columns)
 
-        for approach in list_of_close_approaches:
-            des = str(approach['des'])
-            cd = str(approach['cd'])
 
+def _fields_from_rows(rows, des, cd, dist, v_rel):
+    """Pull the fields needed to build a `CloseApproach` out of a chunk of rows.
+
+    :param rows: A list of rows of the `data` array.
+    :param des, cd, dist, v_rel: The indexes of those fields within each row.
+    :return: The designations, times (as in the file), distances and velocities of the rows.
+    """
+    designations = []
+    times = []
+    distances = array('d')
+    velocities = array('d')
+    for row in rows:
+        try:
+            distance = float(row[dist]) if row[dist] else float('nan')
+            velocity = float(row[v_rel]) if row[v_rel] else float('nan')
+        except ValueError:
+            raise ValueError('Close approach distance and velocity must be numbers')
+        designations.append(intern(str(row[des])))
+        times.append(str(row[cd]))
+        distances.append(distance)
+        velocities.append(velocity)
+    return designations, times, distances, velocities
+
+
+def _columns_from_rows(rows, des, cd, dist, v_rel):
+    """Convert a chunk of rows into columns for an `ApproachTable`.
+
+    :param rows: A list of rows of the `data` array.
+    :param des, cd, dist, v_rel: The indexes of those fields within each row.
+    :return: The designations, times (in minutes), distances and velocities of the rows.
+    """
+    designations = []
+    minutes = array('q')
+    distances = array('d')
+    velocities = array('d')
+    for row in rows:
+        try:
+            distance = float(row[dist]) if row[dist] else float('nan')
+            velocity = float(row[v_rel]) if row[v_rel] else float('nan')
+        except ValueError:
+            raise ValueError('Close approach distance and velocity must be numbers')
+        designations.append(intern(str(row[des])))
+        minutes.append(datetime_to_minutes(cd_to_datetime(row[cd])))
+        distances.append(distance)
+        velocities.append(velocity)
+    return designations, minutes, distances, velocities
+
+
+def _approach_from_row(row, des, cd, dist, v_rel):
+    """Build a `CloseApproach` from one row of the `data` array.
+
+    :param row: A list of values, ordered as the `fields` of the JSON file.
+    :param des, cd, dist, v_rel: The indexes of those fields within `row`.
+    :return: A `CloseApproach`.
+    """
+    try:
+        distance = float(row[dist]) if row[dist] else float('nan')
+        velocity = float(row[v_rel]) if row[v_rel] else float('nan')
+    except ValueError:
+        raise ValueError('Close approach distance and velocity must be numbers')
+
+    return CloseApproach(
+        designation=intern(str(row[des])),
+        time=str(row[cd]),
+        distance=distance,
+        velocity=velocity
+    )
+
+
+def _stream_cad_rows(in_json):
+    """Incrementally parse a close approach JSON document.
+
+    The first value generated is the list of `fields`; every value after that is
+    one row of the `data` array. NASA's API writes `fields` before `data`, in
+    which case rows are generated as soon as they are decoded. If `data` comes
+    first, its rows are held back until `fields` has been read.
+
+    :param in_json: A text file object positioned at the start of the document.
+    :yield: The `fields` list, then each row of `data`.
+    """
+    buf = ''
+    pos = 0
+    eof = False
+
+    def fill():
+        # Drop what has been consumed and append the next chunk of the file.
+        nonlocal buf, pos, eof
+        chunk = in_json.read(_CHUNK_SIZE)
+        buf = buf[pos:] + chunk
+        pos = 0
+        eof = not chunk
+
+    def skip_whitespace():
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in ' \t\r\n':
+                pos += 1
+            if pos < len(buf) or eof:
+                return
+            fill()
+
+    def expect(chars):
+        nonlocal pos
+        skip_whitespace()
+        if pos >= len(buf) or buf[pos] not in chars:
+            found = buf[pos] if pos < len(buf) else 'end of file'
+            raise ValueError(f"Malformed close approach data: expected {chars!r}, found {found!r}")
+        pos += 1
+        return buf[pos - 1]
+
+    def value():
+        nonlocal pos
+        skip_whitespace()
+        while True:
             try:
-                dist = float(approach['dist']) if approach['dist'] else float('nan')
-                v_rel = float(approach['v_rel']) if approach['v_rel'] else float('nan')
-            except ValueError:
-                raise ValueError('Close approach distance and velocity must be numbers')
+                obj, end = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                # The value may just be cut off at the end of the buffer.
+                if eof:
+                    raise
+                fill()
+                continue
+            # A number at the very end of the buffer might continue in the next chunk.
+            if end == len(buf) and not eof:
+                fill()
+                continue
+            pos = end
+            return obj
 
-            ca = CloseApproach(
-                designation=des,
-                time=cd,
-                distance=dist,
-                velocity=v_rel
-            )
-            close_approaches.append(ca)
+    fields = None
+    pending = []
+    fill()
+    expect('{')
+    skip_whitespace()
+    if buf[pos:pos + 1] == '}':
+        pos += 1
+    else:
+        while True:
+            key = value()
+            expect(':')
+            if key == 'data':
+                expect('[')
+                skip_whitespace()
+                if buf[pos:pos + 1] == ']':
+                    pos += 1
+                else:
+                    while True:
+                        row = value()
+                        if fields is None:
+                            pending.append(row)
+                        else:
+                            yield row
+                        if expect(',]') == ']':
+                            break
+            elif key == 'fields':
+                fields = value()
+                yield fields
+                yield from pending
+                pending = []
+            else:
+                value()
+            if expect(',}') == '}':
+                break
 
-    return close_approaches
+    if fields is None:
+        raise ValueError('Close approach data must have a list of fields')
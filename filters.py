@@ -11,14 +11,30 @@ from a comparator (from the `operator` module), a reference value, and a class
 method `get` that subclasses can override to fetch an attribute of interest from
 the supplied `CloseApproach`.
 
+The minimum and maximum criteria on an attribute are merged into one
+`RangeFilter`, whose bounds can be looked up directly in a `SortedIndex` and
+which knows when no value can satisfy it.
+
+A date `around` which to look, with a `window` of days on either side of it, is
+one more range of dates, merged with the others.
+
+The `compile_filters` function turns such a collection into a single predicate:
+the source of a function that inlines every comparison is generated (once per
+combination of filter types and operators) and the reference values are bound
+to it, so that evaluating the filters on a close approach costs one call.
+
 The `limit` function simply limits the maximum number of values produced by an
 iterator.
 
 You'll edit this file in Tasks 3a and 3c.
 """
+import datetime
+import functools
 from itertools import islice
 import operator
 
+from helpers import minutes_to_datetime, datetime_to_str
+
 
 class UnsupportedCriterionError(NotImplementedError):
     """A filter criterion is unsupported."""
@@ -37,9 +53,15 @@ class AttributeFilter:
     infix notation).
 
     Concrete subclasses can override the `get` classmethod to provide custom
-    behavior to fetch a desired attribute from the given `CloseApproach`.
+    behavior to fetch a desired attribute from the given `CloseApproach`. They
+    can also set `expression` to the equivalent Python expression on a close
+    approach named `a`, so that `compile_filters` can inline it, and set
+    `on_neo` if the attribute is one of the approach's NEO.
     """
 
+    expression = None
+    on_neo = False
+
     def __init__(self, op, value):
         """Construct a new `AttributeFilter` from an binary predicate and a reference value.
 
@@ -70,6 +92,18 @@ class AttributeFilter:
         """
         raise UnsupportedCriterionError
 
+    def comparisons(self):
+        """Return the comparisons that this filter makes, as a list of `(op, value)` pairs.
+
+        A close approach satisfies the filter if `get(approach) OP value` for
+        every pair. This is what `compile_filters` inlines.
+        """
+        return [(self.op, self.value)]
+
+    def key(self):
+        """Return a hashable value that identifies this filter: equal keys select the same approaches."""
+        return (type(self), self.op, self.value)
+
     def __repr__(self):
         """Return `repr(self)`, a computer-readable string representation of this object."""
         return f"{self.__class__.__name__}(op=operator.{self.op.__name__}, value={self.value})"
@@ -80,7 +114,7 @@ def create_filters(
         distance_min=None, distance_max=None,
         velocity_min=None, velocity_max=None,
         diameter_min=None, diameter_max=None,
-        hazardous=None
+        hazardous=None, around=None, window=None
 ):
     """Create a collection of filters from user-specified criteria.
 
@@ -99,6 +133,11 @@ def create_filters(
     because the main module directly passes this result to that method. For now,
     this can be thought of as a collection of `AttributeFilter`s.
 
+    The criteria on each of the dates, distances, velocities and diameters are
+    merged into a single `RangeFilter`. If the criteria contradict each other
+    (say, a minimum distance above the maximum distance), that filter is empty:
+    see `RangeFilter.is_empty`.
+
     :param date: A `date` on which a matching `CloseApproach` occurs.
     :param start_date: A `date` on or after which a matching `CloseApproach` occurs.
     :param end_date: A `date` on or before which a matching `CloseApproach` occurs.
@@ -109,46 +148,35 @@ def create_filters(
     :param diameter_min: A minimum diameter of the NEO of a matching `CloseApproach`.
     :param diameter_max: A maximum diameter of the NEO of a matching `CloseApproach`.
     :param hazardous: Whether the NEO of a matching `CloseApproach` is potentially hazardous.
+    :param around: A `date` within `window` days of which a matching `CloseApproach` occurs.
+    :param window: A number of days before and after `around` (0, if not given).
     :return: A collection of filters for use with `query`.
     """
     filters = []
 
-    if date:
-        f = DateFilter(operator.eq, date)
-        filters.append(f)
-    if start_date:
-        f = DateFilter(operator.ge, start_date)
-        filters.append(f)
-    if end_date:
-        f = DateFilter(operator.le, end_date)
+    # An exact date is a range of dates too: it's merged with the other bounds.
+    first_day = max((day for day in (date, start_date) if day), default=None)
+    last_day = min((day for day in (date, end_date) if day), default=None)
+    if around:
+        if window is not None and window < 0:
+            raise ValueError("Window must not be negative")
+        days = datetime.timedelta(days=window or 0)
+        first_day = max(first_day or around - days, around - days)
+        last_day = min(last_day or around + days, around + days)
+    if first_day or last_day:
+        f = RangeFilter.for_dates(first_day, last_day)
         filters.append(f)
 
-    if distance_min:
-        f = DistanceFilter(operator.ge, distance_min)
-        filters.append(f)
-    if distance_max and distance_max > 0:
-        f = DistanceFilter(operator.le, distance_max)
-        filters.append(f)
-    if type(distance_max) is float and distance_max <= 0:
-        raise ValueError("Max distance must be greater than zero")
-
-    if velocity_min:
-        f = VelocityFilter(operator.ge, velocity_min)
-        filters.append(f)
-    if velocity_max and velocity_max > 0:
-        f = VelocityFilter(operator.le, velocity_max)
-        filters.append(f)
-    if type(velocity_max) is float and velocity_max <= 0:
-        raise ValueError("Max velocity must be greater than zero")
-
-    if diameter_min:
-        f = DiameterFilter(operator.ge, diameter_min)
-        filters.append(f)
-    if diameter_max and diameter_max > 0:
-        f = DiameterFilter(operator.le, diameter_max)
-        filters.append(f)
-    if type(diameter_max) is float and diameter_max <= 0:
-        raise ValueError("Max diameter must be greater than zero")
+    for attribute, minimum, maximum in (('distance', distance_min, distance_max),
+                                        ('velocity', velocity_min, velocity_max),
+                                        ('diameter', diameter_min, diameter_max)):
+        if type(maximum) is float and maximum <= 0:
+            raise ValueError(f"Max {attribute} must be greater than zero")
+        lo = minimum if minimum else None
+        hi = maximum if maximum and maximum > 0 else None
+        if lo is not None or hi is not None:
+            f = RangeFilter(attribute, lo, hi)
+            filters.append(f)
 
     if hazardous is not None:
         f = HazardousFilter(operator.eq, hazardous)
@@ -157,6 +185,92 @@ def create_filters(
     return filters
 
 
+# The infix notation of the operators that `compile_filters` can inline.
+_OPERATOR_SYMBOLS = {
+    operator.eq: '==',
+    operator.ne: '!=',
+    operator.lt: '<',
+    operator.le: '<=',
+    operator.gt: '>',
+    operator.ge: '>=',
+}
+_LOWER_BOUNDS = {operator.ge, operator.gt}
+_UPPER_BOUNDS = {operator.le, operator.lt}
+
+
+def compile_filters(filters):
+    """Compile a collection of filters into a single predicate on a close approach.
+
+    The predicate is equivalent to `all(f(approach) for f in filters)`, with
+    the filters evaluated in order, but the comparisons of filters that have an
+    `expression` are inlined into one generated function. A lower and an upper
+    bound on the same expression become one chained comparison, such as
+    `v0 <= a.distance <= v1`. Other filters are called as usual.
+
+    :param filters: A collection of filters capturing user-specified criteria.
+    :return: A 1-argument callable (on a `CloseApproach`) that returns whether it matches all the filters.
+    """
+    signature = []
+    arguments = []
+    for f in filters:
+        comparisons = f.comparisons()
+        if f.expression and all(op in _OPERATOR_SYMBOLS for op, _ in comparisons):
+            # Inlined comparisons take their reference value as argument.
+            signature.extend((f.expression, op) for op, _ in comparisons)
+            arguments.extend(value for _, value in comparisons)
+        else:
+            # Other filters are passed, and called, as they are.
+            signature.append(None)
+            arguments.append(f)
+    return _compile_signature(tuple(signature))(*arguments)
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_signature(signature):
+    """Generate a factory of predicates for filters with a given signature.
+
+    :param signature: A tuple with an `(expression, op)` pair for each filter that can be inlined, and None for others.
+    :return: A function that takes the argument of each filter and returns the predicate.
+    """
+    names = [f'v{i}' for i in range(len(signature))]
+    terms = []
+    paired = set()
+    for i, inlined in enumerate(signature):
+        if i in paired:
+            continue
+        if inlined is None:
+            terms.append(f'{names[i]}(a)')
+            continue
+        expression, op = inlined
+        # Look for the opposite bound on the same expression, to chain the comparisons.
+        for j in range(i + 1, len(signature)):
+            other = signature[j]
+            if j in paired or other is None or other[0] != expression:
+                continue
+            if op in _LOWER_BOUNDS and other[1] in _UPPER_BOUNDS:
+                lower, upper = (i, op), (j, other[1])
+            elif op in _UPPER_BOUNDS and other[1] in _LOWER_BOUNDS:
+                lower, upper = (j, other[1]), (i, op)
+            else:
+                continue
+            paired.add(j)
+            # `x >= lo` is `lo <= x`, and `x > lo` is `lo < x`.
+            lower_symbol = '<=' if lower[1] is operator.ge else '<'
+            terms.append(f'{names[lower[0]]} {lower_symbol} {expression} '
+                         f'{_OPERATOR_SYMBOLS[upper[1]]} {names[upper[0]]}')
+            break
+        else:
+            terms.append(f'{expression} {_OPERATOR_SYMBOLS[op]} {names[i]}')
+
+    source = (f"def make_predicate({', '.join(names)}):\n"
+              f"    def predicate(a):\n"
+              f"        return {' and '.join(terms) or 'True'}\n"
+              f"    return predicate\n")
+    namespace = {}
+    exec(compile(source, '<compiled filters>', 'exec'), namespace)
+    return namespace['make_predicate']
+
+
 def limit(iterator, n=None):
     """Produce a limited stream of values from an iterator.
 
@@ -173,31 +287,45 @@ def limit(iterator, n=None):
 
 
 class DateFilter(AttributeFilter):
-    """A subclass that extends AttributeFilter to filter close approaches by datetime."""
+    """A subclass that extends AttributeFilter to filter close approaches by datetime.
+
+    Dates are compared as integer ordinals: the reference date is converted
+    once, when the filter is created, and each close approach already carries
+    the ordinal of its date.
+    """
+
+    expression = 'a.day_ordinal'
 
     def __init__(self, op, value):
         """Construct a new DateFilter from a binary predicate and a reference value.
 
         :param op: A 2-argument predicate comparator (such as `operator.le`).
-        :param value: The reference value to compare against.
+        :param value: The reference `date` to compare against.
         """
-        super().__init__(op, value)
+        super().__init__(op, value.toordinal())
+        self.date = value
 
     @classmethod
     def get(cls, approach):
         """Get a time attribute from a close approach.
 
-        Overriden superclass method to get time from the supplied `CloseApproach`.
+        Overriden superclass method to get the ordinal of the date of the supplied `CloseApproach`.
 
         :param approach: A `CloseApproach` on which to evaluate this filter.
-        :return: The value of time, comparable to `self.value` via `self.op`.
+        :return: The ordinal of the date, comparable to `self.value` via `self.op`.
         """
-        return approach.time.date()
+        return approach.day_ordinal
+
+    def __repr__(self):
+        """Return `repr(self)`, a computer-readable string representation of this object."""
+        return f"{self.__class__.__name__}(op=operator.{self.op.__name__}, value={self.date!r})"
 
 
 class DistanceFilter(AttributeFilter):
     """A subclass that extends AttributeFilter to filter close approaches by distance."""
 
+    expression = 'a.distance'
+
     def __init__(self, op, value):
         """Construct a new DistanceFilter from a binary predicate and a reference value.
 
@@ -221,6 +349,8 @@ class DistanceFilter(AttributeFilter):
 class VelocityFilter(AttributeFilter):
     """A subclass that extends AttributeFilter to filter close approaches by velocity."""
 
+    expression = 'a.velocity'
+
     def __init__(self, op, value):
         """Construct a new VelocityFilter from a binary predicate and a reference value.
 
@@ -244,6 +374,9 @@ class VelocityFilter(AttributeFilter):
 class DiameterFilter(AttributeFilter):
     """A subclass that extends AttributeFilter to filter close approaches by diameter."""
 
+    expression = 'a.neo.diameter'
+    on_neo = True
+
     def __init__(self, op, value):
         """Construct a new DiameterFilter from a binary predicate and a reference value.
 
@@ -267,6 +400,9 @@ class DiameterFilter(AttributeFilter):
 class HazardousFilter(AttributeFilter):
     """A subclass that extends AttributeFilter to filter close approaches by hazardous."""
 
+    expression = "getattr(a.neo, 'hazardous', None)"
+    on_neo = True
+
     def __init__(self, op, value):
         """Construct a new HazardousFilter from a binary predicate and a reference value.
 
@@ -284,5 +420,100 @@ class HazardousFilter(AttributeFilter):
         :param approach: A `CloseApproach` on which to evaluate this filter.
         :return: The value of hazardous, comparable to `self.value` via `self.op`.
         """
-        return approach.neo.hazardous
+        return getattr(approach.neo, 'hazardous', None)
+
+
+# The expression on a close approach `a` that a `RangeFilter` bounds, by attribute.
+_RANGE_EXPRESSIONS = {
+    'time': 'a.time_minutes',
+    'distance': 'a.distance',
+    'velocity': 'a.velocity',
+    'diameter': 'a.neo.diameter',
+}
+# The attributes bounded by a `RangeFilter` that are attributes of NEOs, rather than of close approaches.
+_NEO_ATTRIBUTES = {'diameter'}
+
+
+class RangeFilter(AttributeFilter):
+    """A subclass that extends AttributeFilter to filter close approaches by a range of values.
 
+    A `RangeFilter` bounds one attribute - 'time', 'distance', 'velocity' or
+    'diameter' - from below, above, or both. The bounds are in the units of
+    the sorted index of that attribute, so `index.span(*f.bounds())` finds the
+    rows that satisfy the filter. In particular, times are in minutes (see
+    `CloseApproach.time_minutes`): the range of a day covers the minutes from
+    the start of that day up to, but excluding, the start of the next one.
+    """
+
+    def __init__(self, attribute, lo=None, hi=None, lo_inclusive=True, hi_inclusive=True):
+        """Construct a new RangeFilter from an attribute and the bounds of its values.
+
+        :param attribute: The name of the attribute: 'time' (in minutes), 'distance', 'velocity' or 'diameter'.
+        :param lo: The lower bound of the range, or None for no lower bound.
+        :param hi: The upper bound of the range, or None for no upper bound.
+        :param lo_inclusive: Whether a value equal to `lo` is in the range.
+        :param hi_inclusive: Whether a value equal to `hi` is in the range.
+        """
+        self.attribute = attribute
+        self.expression = _RANGE_EXPRESSIONS[attribute]
+        self.on_neo = attribute in _NEO_ATTRIBUTES
+        self._get = operator.attrgetter(self.expression[len('a.'):])
+        self.lo = lo
+        self.hi = hi
+        self.lo_inclusive = lo_inclusive
+        self.hi_inclusive = hi_inclusive
+
+    @classmethod
+    def for_dates(cls, first_day=None, last_day=None):
+        """Construct a new RangeFilter on the times of the days from `first_day` to `last_day`, inclusive.
+
+        :param first_day: The first `date` of the range, or None for no lower bound.
+        :param last_day: The last `date` of the range, or None for no upper bound.
+        :return: A `RangeFilter` on 'time'.
+        """
+        lo = first_day.toordinal() * 1440 if first_day else None
+        hi = (last_day.toordinal() + 1) * 1440 if last_day else None
+        return cls('time', lo, hi, hi_inclusive=False)
+
+    def __call__(self, approach):
+        """Invoke `self(approach)`."""
+        value = self._get(approach)
+        lo, hi = self.lo, self.hi
+        # Written as `not (value >= lo)` rather than `value < lo` so that NaN is out of every range.
+        if lo is not None and not (value >= lo if self.lo_inclusive else value > lo):
+            return False
+        if hi is not None and not (value <= hi if self.hi_inclusive else value < hi):
+            return False
+        return True
+
+    def bounds(self):
+        """Return the range of this filter, as the arguments `(lo, hi, lo_inclusive, hi_inclusive)` of `SortedIndex.span`."""
+        return self.lo, self.hi, self.lo_inclusive, self.hi_inclusive
+
+    def key(self):
+        """Return a hashable value that identifies this filter: equal keys select the same approaches."""
+        return (type(self), self.attribute) + self.bounds()
+
+    def is_empty(self):
+        """Return whether no value can satisfy this filter, because its bounds contradict each other."""
+        if self.lo is None or self.hi is None:
+            return False
+        return self.lo > self.hi or (self.lo == self.hi and not (self.lo_inclusive and self.hi_inclusive))
+
+    def comparisons(self):
+        """Return the comparisons that this filter makes, as a list of `(op, value)` pairs."""
+        comparisons = []
+        if self.lo is not None:
+            comparisons.append((operator.ge if self.lo_inclusive else operator.gt, self.lo))
+        if self.hi is not None:
+            comparisons.append((operator.le if self.hi_inclusive else operator.lt, self.hi))
+        return comparisons
+
+    def __repr__(self):
+        """Return `repr(self)`, a computer-readable string representation of this object."""
+        lo, hi = self.lo, self.hi
+        if self.attribute == 'time':
+            lo = lo if lo is None else datetime_to_str(minutes_to_datetime(lo))
+            hi = hi if hi is None else datetime_to_str(minutes_to_datetime(hi))
+        return (f"{self.__class__.__name__}({self.attribute!r}, lo={lo!r}, hi={hi!r}, "
+                f"lo_inclusive={self.lo_inclusive}, hi_inclusive={self.hi_inclusive})")
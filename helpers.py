@@ -9,8 +9,31 @@ The `datetime_to_str` function converts a Python `datetime` into a string.
 Although `datetime`s already have human-readable string representations, those
 representations display seconds, but NASA's data (and our datetimes!) don't
 provide that level of resolution, so the output format also will not.
+
+Both functions run once per close approach while loading and writing data, so
+they avoid `strptime` and `strftime`: `cd_to_datetime` slices the fixed layout
+of the `cd` field, looks up month names and times of day in tables, remembers
+the dates it has already parsed, and only falls back to `strptime` (and its
+error messages) for input it doesn't recognize.
+
+The `datetime_to_minutes` and `minutes_to_datetime` functions convert between
+datetimes and plain integers, which is how close approach times are stored in
+an `ApproachTable`.
 """
 import datetime
+import functools
+
+
+# The English abbreviations of month names, as used by NASA's `cd` field.
+MONTHS = {
+    'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Jun': 6,
+    'Jul': 7, 'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12,
+}
+
+# Every valid ` hh:mm` suffix of NASA's `cd` field, with its hour and minute.
+_TIMES = {f" {hour:02d}:{minute:02d}": (hour, minute) for hour in range(24) for minute in range(60)}
+
+_CD_FORMAT = "%Y-%b-%d %H:%M"
 
 
 def cd_to_datetime(calendar_date):
@@ -26,7 +49,36 @@ def cd_to_datetime(calendar_date):
     :param calendar_date: A calendar date in YYYY-bb-DD hh:mm format.
     :return: A naive `datetime` corresponding to the given calendar date and time.
     """
-    return datetime.datetime.strptime(calendar_date, "%Y-%b-%d %H:%M")
+    # The fast path only accepts exactly `YYYY-bbb-DD hh:mm`; anything else is
+    # left to `strptime`, which either parses it or raises the usual error.
+    hour_minute = _TIMES.get(calendar_date[11:])
+    if hour_minute is not None:
+        try:
+            year, month, day = _parse_cd_date(calendar_date[:11])
+        except ValueError:
+            pass
+        else:
+            return datetime.datetime(year, month, day, *hour_minute)
+    return datetime.datetime.strptime(calendar_date, _CD_FORMAT)
+
+
+@functools.lru_cache(maxsize=1 << 17)
+def _parse_cd_date(date):
+    """Split the `YYYY-bbb-DD` part of a NASA-formatted calendar date.
+
+    Close approaches cluster on the same days, so the results are cached.
+
+    :param date: The date part of a calendar date, such as '2020-Dec-31'.
+    :return: A tuple of the year, month and day, which make a valid date.
+    """
+    if not (date[4] == '-' and date[8] == '-' and date[:4].isdigit() and date[9:].isdigit()):
+        raise ValueError(date)
+    year, month, day = int(date[:4]), MONTHS.get(date[5:8], 0), int(date[9:])
+    if not year or not month or not 1 <= day <= 31:
+        raise ValueError(date)
+    # Raises for days past the end of the month, like `strptime` does.
+    datetime.date(year, month, day)
+    return year, month, day
 
 
 def datetime_to_str(dt):
@@ -41,4 +93,27 @@ def datetime_to_str(dt):
     :param dt: A naive Python datetime.
     :return: That datetime, as a human-readable string without seconds.
     """
-    return datetime.datetime.strftime(dt, "%Y-%m-%d %H:%M")
+    return dt.isoformat(' ', 'minutes')
+
+
+def datetime_to_minutes(dt):
+    """Convert a naive Python datetime into an integer number of minutes.
+
+    The count starts from midnight of the day before January 1st of year 1, so
+    that `minutes // 1440` is the proleptic Gregorian ordinal of the date (as
+    returned by `date.toordinal`). Seconds are dropped, as elsewhere.
+
+    :param dt: A naive Python datetime.
+    :return: The number of minutes, as an int.
+    """
+    return dt.toordinal() * 1440 + dt.hour * 60 + dt.minute
+
+
+def minutes_to_datetime(minutes):
+    """Convert a number of minutes produced by `datetime_to_minutes` back into a datetime.
+
+    :param minutes: A number of minutes, as an int.
+    :return: The corresponding naive Python datetime.
+    """
+    # `datetime.min` is the first minute of ordinal day 1, that is minute 1440.
+    return datetime.datetime.min + datetime.timedelta(minutes=minutes - 1440)
@@ -0,0 +1,81 @@
+"""Index the rows of an `ApproachTable` to answer range queries without a full scan.
+
+A `SortedIndex` holds the row numbers of a table sorted by the value of one of
+its columns, along with those values. A range of values - such as every time
+within a given day - then corresponds to a contiguous run of the index, which
+is found by binary search (`bisect`) in O(log n). Reading the k row numbers of
+that run costs O(k).
+
+Rows whose value is NaN (an unknown distance, say) can never satisfy a range,
+so they are left out of the index.
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+
+
+class SortedIndex:
+    """The rows of a table, sorted by the value of one column.
+
+    If the column is already sorted, the index doesn't store row numbers at
+    all: position `i` of the index is row `i` of the table.
+    """
+
+    def __init__(self, values, typecode='d'):
+        """Build a sorted index over a column of values.
+
+        :param values: A sequence with the value of each row.
+        :param typecode: The `array` typecode for the values ('d' for floats, 'q' for ints).
+        """
+        n = len(values)
+        rows = [row for row in range(n) if values[row] == values[row]]
+        if len(rows) == n and all(values[i] <= values[i + 1] for i in range(n - 1)):
+            self.rows = None
+            # A column of the right type can be shared rather than copied.
+            if isinstance(values, array) and values.typecode == typecode:
+                self.keys = values
+            else:
+                self.keys = array(typecode, values)
+        else:
+            rows.sort(key=values.__getitem__)
+            self.rows = array('l', rows)
+            self.keys = array(typecode, map(values.__getitem__, rows))
+
+    def __len__(self):
+        """Return `len(self)`, the number of indexed rows."""
+        return len(self.keys)
+
+    def span(self, lo=None, hi=None, lo_inclusive=True, hi_inclusive=True, first=0):
+        """Find the positions, within this index, of the rows whose value is in a range.
+
+        :param lo: The lower bound of the range, or None for no lower bound.
+        :param hi: The upper bound of the range, or None for no upper bound.
+        :param lo_inclusive: Whether a value equal to `lo` is in the range.
+        :param hi_inclusive: Whether a value equal to `hi` is in the range.
+        :param first: A position before which no value is in the range, to search from.
+        :return: A pair `(start, stop)` of positions; the range is empty if `start >= stop`.
+        """
+        keys = self.keys
+        if lo is None:
+            start = first
+        else:
+            start = (bisect_left if lo_inclusive else bisect_right)(keys, lo, first)
+        if hi is None:
+            stop = len(keys)
+        else:
+            stop = (bisect_right if hi_inclusive else bisect_left)(keys, hi, start)
+        return start, max(start, stop)
+
+    def rows_in(self, start, stop):
+        """Return the row numbers at positions `start` to `stop` of this index, in index order.
+
+        :param start: The first position, as returned by `span`.
+        :param stop: The position after the last one, as returned by `span`.
+        :return: A sequence of row numbers.
+        """
+        if self.rows is None:
+            return range(start, stop)
+        return self.rows[start:stop]
+
+    def is_identity(self):
+        """Return whether the rows of the table are already in index order."""
+        return self.rows is None
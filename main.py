@@ -5,7 +5,7 @@ See `README.md` for a detailed discussion of this project.
 
 This script can be invoked from the command line::
 
-    $ python3 main.py {inspect,query,interactive} [args]
+    $ python3 main.py {inspect,query,aggregate,conjunctions,interactive} [args]
 
 The `inspect` subcommand looks up an NEO by name or by primary designation, and
 optionally lists all of that NEO's known close approaches:
@@ -14,6 +14,12 @@ optionally lists all of that NEO's known close approaches:
     $ python3 main.py inspect --name Halley
     $ python3 main.py inspect --verbose --name Halley
 
+It can also list the approaches of the NEO in a range of dates, or find its
+next or previous approach (after or before today, if no date is given):
+
+    $ python3 main.py inspect --name Eros --start-date 2020-01-01 --end-date 2029-12-31
+    $ python3 main.py inspect --name Apophis --next 2029-01-01 --previous
+
 The `query` subcommand searches for close approaches that match given criteria:
 
     $ python3 main.py query --date 1969-07-29
@@ -23,30 +29,64 @@ The `query` subcommand searches for close approaches that match given criteria:
     $ python3 main.py query --start-date 2000-01-01 --max-diameter 0.1 --not-hazardous
     $ python3 main.py query --hazardous --max-distance 0.05 --min-velocity 30
 
+To look at the days around an event, `--around` a date selects the approaches
+up to `--window` days before or after it:
+
+    $ python3 main.py query --around 2029-04-13 --window 3 --max-distance 0.05
+
 The set of results can be limited in size and/or saved to an output file in CSV
 or JSON format:
 
     $ python3 main.py query --limit 5 --outfile results.csv
     $ python3 main.py query --limit 15 --outfile results.json
 
+The results can also be sorted by time, distance, velocity or diameter, in
+ascending or (with `--desc`) descending order:
+
+    $ python3 main.py query --start-date 2020-01-01 --sort-by distance --limit 5
+    $ python3 main.py query --hazardous --sort-by diameter --desc
+
+Only the number of matches is printed with `--count`. The `aggregate` subcommand
+summarizes the matches instead - their number, and the minimum, mean and maximum
+of their distances and velocities - optionally grouped by year, month or NEO:
+
+    $ python3 main.py query --hazardous --max-distance 0.05 --count
+    $ python3 main.py aggregate --hazardous --max-distance 0.05 --group-by year --metrics count
+    $ python3 main.py aggregate --start-date 2020-01-01 --group-by month
+
+The `conjunctions` subcommand takes the same filters, and finds groups of matching
+close approaches of two or more NEOs within a few hours (`--within`) of each
+other:
+
+    $ python3 main.py conjunctions --max-distance 0.02 --within 6
+    $ python3 main.py conjunctions --start-date 2020-01-01 --within 24 --min-neos 3
+
 The `interactive` subcommand loads the NEO database and spawns an interactive
-command shell that can repeatedly execute `inspect` and `query` commands without
-having to wait to reload the database each time. However, it doesn't hot-reload.
+command shell that can repeatedly execute `inspect`, `query`, `aggregate` and
+`conjunctions` commands without having to wait to reload the database each time. However, it
+doesn't hot-reload.
 
 If needed, the script can load data from data files other than the default with
 `--neofile` or `--cadfile`.
+
+The linked database is cached in a snapshot file (`--snapshot`), which is used
+instead of the data files as long as they haven't changed. Pass `--no-snapshot`
+to always read the data files. Close approaches can be loaded by several
+processes at once with `--load-workers`, and large queries can be evaluated by
+several processes at once with `--query-workers`.
 """
 import argparse
 import cmd
 import datetime
+import math
 import pathlib
 import shlex
 import sys
 import time
 
-from extract import load_neos, load_approaches
-from database import NEODatabase
+from aggregate import GROUPINGS, METRICS
 from filters import create_filters, limit
+from snapshot import load_database
 from write import write_to_csv, write_to_json
 
 
@@ -57,6 +97,15 @@ DATA_ROOT = PROJECT_ROOT / 'data'
 # The current time, for use with the kill-on-change feature of the interactive shell.
 _START = time.time()
 
+# The number of NEOs suggested by `inspect` when a name is ambiguous.
+_MAX_SUGGESTIONS = 5
+
+# The number of days before and after `--around` selected by default.
+_DEFAULT_WINDOW = 1
+
+# Stands for the date of the day `inspect` runs on, given to `--next` or `--previous` without a date.
+TODAY = object()
+
 
 def date_fromisoformat(date_string):
     """Return a `datetime.date` corresponding to a string in YYYY-MM-DD format.
@@ -74,10 +123,86 @@ def date_fromisoformat(date_string):
             f"'{date_string}' is not a valid date. Use YYYY-MM-DD.")
 
 
+def days_fromstring(days_string):
+    """Return a number of days, which can't be negative, corresponding to a string.
+
+    :param days_string: A whole number of days, such as 3.
+    :return: The number of days, as an `int`.
+    """
+    try:
+        days = int(days_string)
+    except ValueError:
+        days = -1
+    if days < 0:
+        raise argparse.ArgumentTypeError(
+            f"'{days_string}' is not a valid number of days. Use a whole number, 0 or more.")
+    return days
+
+
+def workers_fromstring(workers_string):
+    """Return a number of worker processes, which must be at least 1, corresponding to a string.
+
+    :param workers_string: A whole number of processes, such as 4.
+    :return: The number of processes, as an `int`.
+    """
+    try:
+        workers = int(workers_string)
+    except ValueError:
+        workers = 0
+    if workers < 1:
+        raise argparse.ArgumentTypeError(
+            f"'{workers_string}' is not a valid number of processes. Use a whole number, 1 or more.")
+    return workers
+
+
+def hours_fromstring(hours_string):
+    """Return a number of hours, which can't be negative, corresponding to a string.
+
+    :param hours_string: A number of hours, such as 6 or 0.5.
+    :return: The number of hours, as a `float`.
+    """
+    try:
+        hours = float(hours_string)
+    except ValueError:
+        hours = -1.0
+    if not 0 <= hours < math.inf:
+        raise argparse.ArgumentTypeError(
+            f"'{hours_string}' is not a valid number of hours. Use a number, 0 or more.")
+    return hours
+
+
+def neo_count_fromstring(count_string):
+    """Return a number of NEOs in a group, which must be at least 2, corresponding to a string.
+
+    :param count_string: A whole number of NEOs, such as 3.
+    :return: The number of NEOs, as an `int`.
+    """
+    try:
+        count = int(count_string)
+    except ValueError:
+        count = 0
+    if count < 2:
+        raise argparse.ArgumentTypeError(
+            f"'{count_string}' is not a valid number of NEOs. Use a whole number, 2 or more.")
+    return count
+
+
+def check_filter_args(parser, args):
+    """Reject combinations of filter arguments that don't make sense, as `parser` rejects invalid arguments.
+
+    `--window` is only meaningful with `--around`.
+
+    :param parser: The `argparse.ArgumentParser` that parsed the arguments.
+    :param args: The arguments, as parsed by `parser`.
+    """
+    if getattr(args, 'window', None) is not None and getattr(args, 'around', None) is None:
+        parser.error("argument --window: not allowed without argument --around")
+
+
 def make_parser():
     """Create an ArgumentParser for this script.
 
-    :return: A tuple of the top-level, inspect, and query parsers.
+    :return: A tuple of the top-level, inspect, query, aggregate and conjunctions parsers.
     """
     parser = argparse.ArgumentParser(
         description="Explore past and future close approaches of near-Earth objects."
@@ -90,6 +215,18 @@ def make_parser():
     parser.add_argument('--cadfile', default=(DATA_ROOT / 'cad.json'),
                         type=pathlib.Path,
                         help="Path to JSON file of close approach data.")
+    parser.add_argument('--snapshot', default=(DATA_ROOT / 'neodb.snapshot'),
+                        type=pathlib.Path,
+                        help="Path to a snapshot of the parsed data, rebuilt whenever "
+                             "the data files change.")
+    parser.add_argument('--no-snapshot', dest='snapshot', action='store_const', const=None,
+                        help="Always parse the data files, without reading or writing a snapshot.")
+    parser.add_argument('--load-workers', type=workers_fromstring, default=None,
+                        help="Number of processes used to load close approach data "
+                             "(e.g. the number of CPU cores). Defaults to loading in this process.")
+    parser.add_argument('--query-workers', type=workers_fromstring, default=None,
+                        help="Number of processes used to evaluate filters on large numbers of "
+                             "close approaches. Defaults to evaluating them in this process.")
     subparsers = parser.add_subparsers(dest='cmd')
 
     # Add the `inspect` subcommand parser.
@@ -102,14 +239,28 @@ def make_parser():
                             help="The primary designation of the NEO to inspect (e.g. '433').")
     inspect_id.add_argument('-n', '--name',
                             help="The IAU name of the NEO to inspect (e.g. 'Halley').")
-
-    # Add the `query` subcommand parser.
-    query = subparsers.add_parser('query',
-                                  description="Query for close approaches that "
-                                              "match a collection of filters.")
-    filters = query.add_argument_group('Filters',
-                                       description="Filter close approaches by their attributes "
-                                                   "or the attributes of their NEOs.")
+    inspect_timeline = inspect.add_argument_group('Approaches',
+                                                  description="List the close approaches of the NEO "
+                                                              "in a range of dates, or find its next "
+                                                              "or previous approach.")
+    inspect_timeline.add_argument('-s', '--start-date', type=date_fromisoformat,
+                                  help="List the close approaches on or after the given date, "
+                                       "in YYYY-MM-DD format (e.g. 2020-12-31).")
+    inspect_timeline.add_argument('-e', '--end-date', type=date_fromisoformat,
+                                  help="List the close approaches on or before the given date, "
+                                       "in YYYY-MM-DD format (e.g. 2020-12-31).")
+    inspect_timeline.add_argument('--next', type=date_fromisoformat, nargs='?', const=TODAY, metavar='DATE',
+                                  help="Print the first close approach on or after the given date "
+                                       "(today, if no date is given).")
+    inspect_timeline.add_argument('--previous', type=date_fromisoformat, nargs='?', const=TODAY, metavar='DATE',
+                                  help="Print the last close approach before the given date "
+                                       "(today, if no date is given).")
+
+    # Add the filters shared by the `query` and `aggregate` subcommand parsers.
+    filter_parser = argparse.ArgumentParser(add_help=False)
+    filters = filter_parser.add_argument_group('Filters',
+                                               description="Filter close approaches by their attributes "
+                                                           "or the attributes of their NEOs.")
     filters.add_argument('-d', '--date', type=date_fromisoformat,
                          help="Only return close approaches on the given date, "
                               "in YYYY-MM-DD format (e.g. 2020-12-31).")
@@ -119,6 +270,12 @@ def make_parser():
     filters.add_argument('-e', '--end-date', type=date_fromisoformat,
                          help="Only return close approaches on or before the given date, "
                               "in YYYY-MM-DD format (e.g. 2020-12-31).")
+    filters.add_argument('--around', type=date_fromisoformat, metavar='DATE',
+                         help="Only return close approaches within --window days of the given date, "
+                              "in YYYY-MM-DD format (e.g. 2020-12-31).")
+    filters.add_argument('--window', type=days_fromstring, metavar='DAYS',
+                         help="With --around, the number of days before and after the date. "
+                              "Defaults to 1.")
     filters.add_argument('--min-distance', dest='distance_min', type=float,
                          help="In astronomical units. Only return close approaches that "
                               "pass as far or farther away from Earth as the given distance.")
@@ -145,22 +302,57 @@ def make_parser():
     filters.add_argument('--not-hazardous', dest='hazardous', default=None, action='store_false',
                          help="If specified, only return close approaches of NEOs that "
                               "are not potentially hazardous.")
+
+    # Add the `query` subcommand parser.
+    query = subparsers.add_parser('query', parents=[filter_parser],
+                                  description="Query for close approaches that "
+                                              "match a collection of filters.")
     query.add_argument('-l', '--limit', type=int,
                        help="The maximum number of matches to return. "
                             "Defaults to 10 if no --outfile is given.")
+    query.add_argument('--sort-by', choices=('time', 'distance', 'velocity', 'diameter'),
+                       help="If specified, sort the matches by this attribute. "
+                            "Matches with an unknown value are listed last.")
+    query.add_argument('--desc', action='store_true',
+                       help="If specified with --sort-by, sort the matches in descending order.")
+    query.add_argument('-c', '--count', action='store_true',
+                       help="If specified, only print the number of matching close approaches.")
     query.add_argument('-o', '--outfile', type=pathlib.Path,
                        help="File in which to save structured results. "
                             "If omitted, results are printed to standard output.")
 
+    # Add the `aggregate` subcommand parser.
+    aggregate = subparsers.add_parser('aggregate', parents=[filter_parser],
+                                      description="Summarize the close approaches that "
+                                                  "match a collection of filters.")
+    aggregate.add_argument('-g', '--group-by', choices=GROUPINGS,
+                           help="If specified, summarize the matches of each year, month or NEO.")
+    aggregate.add_argument('-m', '--metrics', nargs='+', choices=METRICS, default=list(METRICS),
+                           help="The metrics to compute. Defaults to all of them.")
+
+    # Add the `conjunctions` subcommand parser.
+    conjunctions = subparsers.add_parser('conjunctions', parents=[filter_parser],
+                                         description="Find groups of close approaches of different "
+                                                     "NEOs, among those that match a collection of "
+                                                     "filters, at nearly the same time.")
+    conjunctions.add_argument('-w', '--within', type=hours_fromstring, default=6.0, metavar='HOURS',
+                              help="The longest time between the first and the last close approach "
+                                   "of a group, in hours. Defaults to 6.")
+    conjunctions.add_argument('-n', '--min-neos', type=neo_count_fromstring, default=2,
+                              help="The least number of different NEOs in a group. Defaults to 2.")
+    conjunctions.add_argument('-l', '--limit', type=int,
+                              help="The maximum number of groups to print. Defaults to 10.")
+
     repl = subparsers.add_parser('interactive',
                                  description="Start an interactive command session "
                                              "to repeatedly run `interact` and `query` commands.")
     repl.add_argument('-a', '--aggressive', action='store_true',
                       help="If specified, kill the session whenever a project file is modified.")
-    return parser, inspect, query
+    return parser, inspect, query, aggregate, conjunctions
 
 
-def inspect(database, pdes=None, name=None, verbose=False):
+def inspect(database, pdes=None, name=None, verbose=False,
+            start_date=None, end_date=None, next_date=None, previous_date=None):
     """Perform the `inspect` subcommand.
 
     This function fetches an NEO by designation or by name. If a matching NEO is
@@ -169,12 +361,25 @@ def inspect(database, pdes=None, name=None, verbose=False):
     Otherwise, a message is printed noting that there are no matching NEOs.
 
     At least one of `pdes` and `name` must be given. If both are given, prefer
-    to look up the NEO by the primary designation.
+    to look up the NEO by the primary designation. If no NEO has exactly the
+    given name, the one NEO whose name matches it in any case, starts with it or
+    is a few edits away from it is used instead; if there are several, they are
+    suggested.
+
+    If `start_date` or `end_date` is given, only the NEO's close approaches
+    between those dates (inclusive) are printed, verbose or not. If `next_date`
+    or `previous_date` is given, the NEO's first close approach on or after that
+    date, or its last close approach before it, is printed. Either can be `TODAY`,
+    for the date on which this function is called.
 
     :param database: The `NEODatabase` containing data on NEOs and their close approaches.
     :param pdes: The primary designation of an NEO for which to search.
     :param name: The name of an NEO for which to search.
     :param verbose: Whether to additionally print all of a matching NEO's close approaches.
+    :param start_date: A `date` from which to print the NEO's close approaches, or None.
+    :param end_date: A `date` until which to print the NEO's close approaches, or None.
+    :param next_date: A `date` from which to print the NEO's next close approach, or None.
+    :param previous_date: A `date` before which to print the NEO's previous close approach, or None.
     :return: The matching `NearEarthObject`, or None if not found.
     """
     # Fetch the NEO of interest.
@@ -182,6 +387,16 @@ def inspect(database, pdes=None, name=None, verbose=False):
         neo = database.get_neo_by_designation(pdes)
     else:
         neo = database.get_neo_by_name(name)
+        if not neo:
+            # Fall back to the NEOs whose name matches regardless of case, starts with `name`, or is close to it.
+            matches = database.find_neos_by_name(name, limit=_MAX_SUGGESTIONS + 1)
+            if len(matches) == 1:
+                neo = matches[0]
+            elif matches:
+                suggestions = ', '.join(match.name for match in matches[:_MAX_SUGGESTIONS])
+                print(f"No NEO is named {name!r}. Did you mean: {suggestions}"
+                      f"{', ...' if len(matches) > _MAX_SUGGESTIONS else ''}?", file=sys.stderr)
+                return None
 
     # Ensure that we have received an NEO.
     if not neo:
@@ -190,9 +405,24 @@ def inspect(database, pdes=None, name=None, verbose=False):
 
     # Display information about this NEO, and optionally its close approaches if verbose.
     print(neo)
-    if verbose:
+    if start_date or end_date:
+        # Find the approaches in the range by binary search, rather than scanning them all.
+        end = end_date + datetime.timedelta(days=1) if end_date else None
+        for approach in neo.approaches_between(start_date, end):
+            print(f"- {approach}")
+    elif verbose:
         for approach in neo.approaches:
             print(f"- {approach}")
+    if next_date is TODAY or previous_date is TODAY:
+        today = datetime.date.today()
+        next_date = today if next_date is TODAY else next_date
+        previous_date = today if previous_date is TODAY else previous_date
+    if next_date:
+        approach = neo.next_approach(next_date)
+        print(f"Next approach on or after {next_date}: {approach or 'none known'}")
+    if previous_date:
+        approach = neo.previous_approach(previous_date)
+        print(f"Previous approach before {previous_date}: {approach or 'none known'}")
     return neo
 
 
@@ -200,26 +430,33 @@ def query(database, args):
     """Perform the `query` subcommand.
 
     Create a collection of filters with `create_filters` and supply them to the
-    database's `query` method to produce a stream of matching results.
+    database's `query` method to produce a stream of matching results - or, if
+    `--sort-by` was given, to its `query_sorted` method to sort them.
 
     If an output file wasn't given, print these results to stdout, limiting to
     10 entries if no limit was specified. If an output file was given, use the
     file's extension to infer whether the file should hold CSV or JSON data, and
     then write the results to the output file in that format.
 
+    If `--count` was given, only print the number of matches instead.
+
     :param database: The `NEODatabase` containing data on NEOs and their close approaches.
     :param args: All arguments from the command line, as parsed by the top-level parser.
     """
     # Construct a collection of filters from arguments supplied at the command line.
-    filters = create_filters(
-        date=args.date, start_date=args.start_date, end_date=args.end_date,
-        distance_min=args.distance_min, distance_max=args.distance_max,
-        velocity_min=args.velocity_min, velocity_max=args.velocity_max,
-        diameter_min=args.diameter_min, diameter_max=args.diameter_max,
-        hazardous=args.hazardous
-    )
+    filters = filters_from_args(args)
+    if args.count:
+        # Count the matches without generating them.
+        print(database.aggregate(filters)['count'])
+        return
+
     # Query the database with the collection of filters.
-    results = database.query(filters)
+    if args.sort_by:
+        # Only sort the matches that will be output. A limit of 0 is no limit, as with `limit`.
+        count = (args.limit or None) if args.outfile else args.limit or 10
+        results = database.query_sorted(filters, args.sort_by, args.desc, count)
+    else:
+        results = database.query(filters)
 
     if not args.outfile:
         # Write the results to stdout, limiting to 10 entries if not specified.
@@ -236,6 +473,73 @@ def query(database, args):
                 "Please use an output file that ends with `.csv` or `.json`.", file=sys.stderr)
 
 
+def aggregate(database, args):
+    """Perform the `aggregate` subcommand.
+
+    Create a collection of filters with `create_filters` and supply them to the
+    database's `aggregate` method, then print a table of the requested metrics
+    of the matching close approaches - with one line per group, if grouped.
+
+    :param database: The `NEODatabase` containing data on NEOs and their close approaches.
+    :param args: All arguments from the command line, as parsed by the top-level parser.
+    """
+    summary = database.aggregate(filters_from_args(args), args.group_by, args.metrics)
+    groups = summary if args.group_by else {None: summary}
+
+    header = ([args.group_by] if args.group_by else []) + list(args.metrics)
+    lines = [header]
+    for group, metrics in groups.items():
+        line = [_format_metric(group)] if args.group_by else []
+        line.extend(_format_metric(metrics[metric]) for metric in args.metrics)
+        lines.append(line)
+    widths = [max(len(line[column]) for line in lines) for column in range(len(header))]
+    for line in lines:
+        print('  '.join(cell.rjust(width) for cell, width in zip(line, widths)).rstrip())
+
+
+def conjunctions(database, args):
+    """Perform the `conjunctions` subcommand.
+
+    Create a collection of filters with `create_filters` and supply them to the
+    database's `conjunctions` method, then print each group of close approaches
+    as it's found, up to the limit (10, if not specified).
+
+    :param database: The `NEODatabase` containing data on NEOs and their close approaches.
+    :param args: All arguments from the command line, as parsed by the top-level parser.
+    """
+    groups = database.conjunctions(datetime.timedelta(hours=args.within), filters_from_args(args), args.min_neos)
+    for group in limit(groups, args.limit or 10):
+        count = len({approach.neo.designation for approach in group})
+        print(f"{count} NEOs from {group[0].time_str} to {group[-1].time_str}:")
+        for approach in group:
+            print(f"- {approach}")
+
+
+def filters_from_args(args):
+    """Create a collection of filters from the filter arguments supplied at the command line.
+
+    :param args: All arguments from the command line, as parsed by the `query` or `aggregate` parser.
+    :return: A collection of filters, as returned by `create_filters`.
+    """
+    return create_filters(
+        date=args.date, start_date=args.start_date, end_date=args.end_date,
+        distance_min=args.distance_min, distance_max=args.distance_max,
+        velocity_min=args.velocity_min, velocity_max=args.velocity_max,
+        diameter_min=args.diameter_min, diameter_max=args.diameter_max,
+        hazardous=args.hazardous,
+        around=args.around, window=_DEFAULT_WINDOW if args.window is None else args.window
+    )
+
+
+def _format_metric(value):
+    """Format a group label or the value of a metric for the `aggregate` table."""
+    if value is None:
+        return '-'
+    if isinstance(value, float):
+        return f"{value:.4f}"
+    return str(value)
+
+
 class NEOShell(cmd.Cmd):
     """Perform the `interactive` subcommand.
 
@@ -246,14 +550,17 @@ class NEOShell(cmd.Cmd):
 
     The primary purpose of this shell is to allow users to repeatedly perform
     inspect and query commands, while only loading the data (which can be quite
-    slow) once.
+    slow) once. For the same reason, the shell enables the database's query
+    cache, so that rerunning a query (with another `--limit` or `--outfile`,
+    say) doesn't scan the data again.
     """
 
     intro = ("Explore close approaches of near-Earth objects. "
              "Type `help` or `?` to list commands and `exit` to exit.\n")
     prompt = '(neo) '
 
-    def __init__(self, database, inspect_parser, query_parser, aggressive=False, **kwargs):
+    def __init__(self, database, inspect_parser, query_parser, aggregate_parser, conjunctions_parser,
+                 aggressive=False, **kwargs):
         """Create a new `NEOShell`.
 
         Creating this object doesn't start the session - for that, use `.cmdloop()`.
@@ -261,13 +568,19 @@ class NEOShell(cmd.Cmd):
         :param database: The `NEODatabase` containing data on NEOs and their close approaches.
         :param inspect_parser: The subparser for the `inspect` subcommand.
         :param query_parser: The subparser for the `query` subcommand.
+        :param aggregate_parser: The subparser for the `aggregate` subcommand.
+        :param conjunctions_parser: The subparser for the `conjunctions` subcommand.
         :param aggressive: Whether to kill the session whenever a project file is changed.
         :param kwargs: A dictionary of excess keyword arguments passed to the superclass.
         """
         super().__init__(**kwargs)
         self.db = database
+        if database.query_cache is None:
+            database.enable_query_cache()
         self.inspect = inspect_parser
         self.query = query_parser
+        self.aggregate = aggregate_parser
+        self.conjunctions = conjunctions_parser
         self.aggressive = aggressive
 
     @classmethod
@@ -290,7 +603,9 @@ class NEOShell(cmd.Cmd):
 
         # Use the ArgumentParser to parse the shell arguments.
         try:
-            return parser.parse_args(args)
+            args = parser.parse_args(args)
+            check_filter_args(parser, args)
+            return args
         except SystemExit as err:
             # The `parse_args` method doesn't actually surface `ArgumentError`s
             # nor `ArgumentTypeError`s - instead, it calls its own `error`
@@ -312,6 +627,14 @@ class NEOShell(cmd.Cmd):
         Additionally, list all known close approaches:
 
             (neo) inspect --verbose --name Eros
+
+        List the close approaches in a range of dates, or find the next or previous one:
+
+            (neo) inspect --name Apophis --start-date 2020-01-01 --end-date 2029-12-31
+            (neo) inspect --name Apophis --next 2029-01-01 --previous 2029-01-01
+
+        Names are matched regardless of case, and can be abbreviated or slightly
+        misspelt. Press Tab after `--name` to complete a name.
         """
         args = self.parse_arg_with(arg, self.inspect)
         if not args:
@@ -320,7 +643,18 @@ class NEOShell(cmd.Cmd):
         # Run the `inspect` subcommand.
         inspect(self.db,
                 pdes=args.pdes, name=args.name,
-                verbose=args.verbose)
+                verbose=args.verbose,
+                start_date=args.start_date, end_date=args.end_date,
+                next_date=args.next, previous_date=args.previous)
+
+    def complete_inspect(self, text, line, begidx, endidx):
+        """Complete the names of NEOs after `--name` (or `-n`)."""
+        previous = line[:begidx].split()
+        if previous and previous[-1] in ('-n', '--name'):
+            return self.db.complete_name(text)
+        return []
+
+    complete_i = complete_inspect
 
     def do_q(self, arg):
         """Shorthand for `query`."""
@@ -335,18 +669,28 @@ class NEOShell(cmd.Cmd):
             (neo) query --date 2020-01-01
 
         You can use any of the other filters: `--start-date`, `--end-date`,
-        `--min-distance`, `--max-distance`, `--min-velocity`, `--max-velocity`,
+        `--around` (with `--window`), `--min-distance`, `--max-distance`, `--min-velocity`, `--max-velocity`,
         `--min-diameter`, `--max-diameter`, `--hazardous`, `--not-hazardous`.
 
         The number of results shown can be limited to a maximum number with `--limit`:
 
             (neo) query --limit 2
 
+        The results can be sorted by `time`, `distance`, `velocity` or `diameter`
+        with `--sort-by`, in descending order with `--desc`:
+
+            (neo) query --date 2020-01-01 --sort-by distance --limit 3
+            (neo) query --hazardous --sort-by diameter --desc
+
         The results can be saved to a file (instead of displayed to stdout) with
         `--outfile`:
 
             (neo) query --limit 5 --outfile results.csv
             (neo) query --limit 5 --outfile results.json
+
+        Only the number of results is shown with `--count`:
+
+            (neo) query --date 2020-01-01 --count
         """
         args = self.parse_arg_with(arg, self.query)
         if not args:
@@ -355,6 +699,56 @@ class NEOShell(cmd.Cmd):
         # Run the `inspect` subcommand.
         query(self.db, args)
 
+    def do_a(self, arg):
+        """Shorthand for `aggregate`."""
+        self.do_aggregate(arg)
+
+    def do_aggregate(self, arg):
+        """Perform the `aggregate` subcommand within the REPL session.
+
+        This command takes the same filters as `query`, and summarizes the matching
+        close approaches - optionally grouped by `year`, `month` or `neo`:
+
+            (neo) aggregate --hazardous --max-distance 0.05 --group-by year
+            (neo) aggregate --start-date 2020-01-01 --metrics count mean_velocity
+        """
+        args = self.parse_arg_with(arg, self.aggregate)
+        if not args:
+            return
+        aggregate(self.db, args)
+
+    def do_c(self, arg):
+        """Shorthand for `conjunctions`."""
+        self.do_conjunctions(arg)
+
+    def do_conjunctions(self, arg):
+        """Perform the `conjunctions` subcommand within the REPL session.
+
+        This command takes the same filters as `query`, and finds groups of matching
+        close approaches of different NEOs within `--within` hours of each other:
+
+            (neo) conjunctions --max-distance 0.02 --within 6
+            (neo) conjunctions --start-date 2020-01-01 --within 24 --min-neos 3
+        """
+        args = self.parse_arg_with(arg, self.conjunctions)
+        if not args:
+            return
+        conjunctions(self.db, args)
+
+    def do_cache(self, arg):
+        """Show how well the query cache is doing, or empty it.
+
+            (neo) cache
+            (neo) cache clear
+        """
+        cache = self.db.query_cache
+        if arg.strip() == 'clear':
+            cache.clear()
+        elif arg.strip():
+            print(f"Unknown cache command: {arg.strip()!r}. Use `cache` or `cache clear`.", file=sys.stderr)
+            return
+        print(cache.stats())
+
     def do_EOF(self, _arg):
         """Exit the interactive session."""
         return True
@@ -383,20 +777,29 @@ class NEOShell(cmd.Cmd):
 
 def main():
     """Run the main script."""
-    parser, inspect_parser, query_parser = make_parser()
+    parser, inspect_parser, query_parser, aggregate_parser, conjunctions_parser = make_parser()
     args = parser.parse_args()
+    check_filter_args({'query': query_parser, 'aggregate': aggregate_parser,
+                       'conjunctions': conjunctions_parser}.get(args.cmd, parser), args)
 
-    # Extract data from the data files into structured Python objects.
-    database = NEODatabase(load_neos(args.neofile),
-                           load_approaches(args.cadfile))
+    # Extract data from the data files (or their snapshot) into structured Python objects.
+    database = load_database(args.neofile, args.cadfile, args.snapshot, args.load_workers)
+    if args.query_workers:
+        database.enable_parallel_queries(args.query_workers)
 
     # Run the chosen subcommand.
     if args.cmd == 'inspect':
-        inspect(database, pdes=args.pdes, name=args.name, verbose=args.verbose)
+        inspect(database, pdes=args.pdes, name=args.name, verbose=args.verbose,
+                start_date=args.start_date, end_date=args.end_date,
+                next_date=args.next, previous_date=args.previous)
     elif args.cmd == 'query':
         query(database, args)
+    elif args.cmd == 'aggregate':
+        aggregate(database, args)
+    elif args.cmd == 'conjunctions':
+        conjunctions(database, args)
     elif args.cmd == 'interactive':
-        NEOShell(database, inspect_parser, query_parser,
+        NEOShell(database, inspect_parser, query_parser, aggregate_parser, conjunctions_parser,
                  aggressive=args.aggressive).cmdloop()
 
 
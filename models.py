@@ -8,8 +8,10 @@ The `CloseApproach` class represents a close approach to Earth by an NEO. Each
 has an approach datetime, a nominal approach distance, and a relative approach
 velocity.
 
-A `NearEarthObject` maintains a collection of its close approaches, and a
-`CloseApproach` maintains a reference to its NEO.
+A `NearEarthObject` maintains a collection of its close approaches, sorted by
+time, and a `CloseApproach` maintains a reference to its NEO. Because they are
+sorted, the approaches of an NEO in a range of times, and its next or previous
+approach, are found by binary search.
 
 The functions that construct these objects use information extracted from the
 data files from NASA, so these objects should be able to handle all of the
@@ -17,7 +19,14 @@ quirks of the data set, such as missing names and unknown diameters.
 
 You'll edit this file in Task 1.
 """
-from helpers import cd_to_datetime, datetime_to_str
+import datetime
+from types import MappingProxyType
+
+from helpers import cd_to_datetime, datetime_to_minutes, datetime_to_str
+
+
+# Shared by every NEO loaded without extra columns.
+_NO_EXTRAS = MappingProxyType({})
 
 
 class NearEarthObject:
@@ -26,13 +35,18 @@ class NearEarthObject:
     An NEO encapsulates semantic and physical parameters about the object, such
     as its primary designation (required, unique), IAU name (optional), diameter
     in kilometers (optional - sometimes unknown), and whether it's marked as
-    potentially hazardous to Earth.
+    potentially hazardous to Earth. Any other columns requested from the data
+    file are kept in the `extras` dictionary.
 
     A `NearEarthObject` also maintains a collection of its close approaches -
     initialized to an empty collection, but eventually populated in the
-    `NEODatabase` constructor.
+    `NEODatabase` constructor, sorted by time (approaches without a time first).
+
+    The attributes are stored in `__slots__`, without a per-instance `__dict__`.
     """
 
+    __slots__ = ('designation', 'name', 'diameter', 'hazardous', '_extras', 'approaches')
+
     def __init__(self, **info):
         """Create a new `NearEarthObject`.
 
@@ -44,8 +58,14 @@ class NearEarthObject:
         self.name = info.get('name')
         self.diameter = info.get('diameter')
         self.hazardous = info.get('hazardous')
+        self._extras = info.get('extras') or None
         self.approaches = []
 
+    @property
+    def extras(self):
+        """Return a dictionary of the extra columns requested for this NEO."""
+        return self._extras or _NO_EXTRAS
+
     @property
     def fullname(self):
         """Return a representation of the full name of this NEO."""
@@ -53,6 +73,44 @@ class NearEarthObject:
             return f"{self.designation} {self.name}"
         return f"{self.designation}"
 
+    def approaches_between(self, start=None, end=None):
+        """Return the close approaches of this NEO from a time (inclusive) to another (exclusive).
+
+        A `date` stands for the start of that day, so that the approaches of a
+        decade are `approaches_between(date(2020, 1, 1), date(2030, 1, 1))`.
+        The approaches are found by binary search, in O(log m) for m approaches
+        (plus the time to build the result).
+
+        :param start: A `datetime` or `date`, or None for no lower bound.
+        :param end: A `datetime` or `date`, or None for no upper bound.
+        :return: A list of `CloseApproach`es, sorted by time.
+        """
+        approaches = self.approaches
+        # Approaches without a time sort first, before minute 0.
+        first = _first_at_or_after(approaches, 0 if start is None else _to_minutes(start))
+        last = len(approaches) if end is None else _first_at_or_after(approaches, _to_minutes(end))
+        return approaches[first:max(first, last)]
+
+    def next_approach(self, time):
+        """Return the first close approach of this NEO at or after a time, or None.
+
+        :param time: A `datetime` or `date` (the start of that day).
+        :return: A `CloseApproach`, or None.
+        """
+        position = _first_at_or_after(self.approaches, _to_minutes(time))
+        return self.approaches[position] if position < len(self.approaches) else None
+
+    def previous_approach(self, time):
+        """Return the last close approach of this NEO before a time, or None.
+
+        :param time: A `datetime` or `date` (the start of that day).
+        :return: A `CloseApproach`, or None.
+        """
+        position = _first_at_or_after(self.approaches, _to_minutes(time))
+        if position == 0 or self.approaches[position - 1].time_minutes is None:
+            return None
+        return self.approaches[position - 1]
+
     def serialize(self):
         """Return a dictionary containing relevant attributes of this NEO for CSV or JSON serialization.
 
@@ -87,9 +145,19 @@ class CloseApproach:
     A `CloseApproach` also maintains a reference to its `NearEarthObject` -
     initially, this information (the NEO's primary designation) is saved in a
     private attribute, but the referenced NEO is eventually replaced in the
-    `NEODatabase` constructor.
+    `NEODatabase` constructor, which also makes `._designation` share the NEO's
+    designation string.
+
+    To make comparisons of times cheap, a `CloseApproach` also carries its time
+    as plain integers: `time_minutes`, the time in minutes (as computed by
+    `helpers.datetime_to_minutes`), and `day_ordinal`, the ordinal of its date
+    (as computed by `date.toordinal`).
+
+    The attributes are stored in `__slots__`, without a per-instance `__dict__`.
     """
 
+    __slots__ = ('_designation', 'time', 'distance', 'velocity', 'neo', 'time_minutes', 'day_ordinal')
+
     def __init__(self, **info):
         """Create a new `CloseApproach`.
 
@@ -100,6 +168,8 @@ class CloseApproach:
         self._designation = info.get('designation')
         self.time = cd_to_datetime(info.get('time')) if info.get(
             'time') else info.get('time')
+        self.time_minutes = datetime_to_minutes(self.time) if self.time else None
+        self.day_ordinal = self.time_minutes // 1440 if self.time else None
         self.distance = info.get('distance')
         self.velocity = info.get('velocity')
         self.neo = info.get('neo')
@@ -131,6 +201,7 @@ class CloseApproach:
             if self._designation == neo.designation:
                 # If they belong together, link them
                 neo.approaches.append(self)
+            self._designation = neo.designation
             self.neo = neo
         return self
 
@@ -154,3 +225,33 @@ class CloseApproach:
         """Return `repr(self)`, a computer-readable string representation of this object."""
         return f"CloseApproach(time={self.time_str!r}, distance={self.distance:.2f}, " \
                f"velocity={self.velocity:.2f}, neo={self.neo!r})"
+
+
+def time_order(approach):
+    """Return the key that sorts close approaches by time, with approaches without a time first."""
+    minutes = approach.time_minutes
+    return -1 if minutes is None else minutes
+
+
+def _to_minutes(time):
+    """Convert a `datetime`, or a `date` (the start of that day), to minutes."""
+    if not isinstance(time, datetime.datetime):
+        time = datetime.datetime.combine(time, datetime.time())
+    return datetime_to_minutes(time)
+
+
+def _first_at_or_after(approaches, minutes):
+    """Find the position of the first of a time-sorted sequence of close approaches at or after a time.
+
+    :param approaches: A sequence of `CloseApproach`es, sorted by `time_order`.
+    :param minutes: A time, in minutes.
+    :return: A position between 0 and `len(approaches)`.
+    """
+    lo, hi = 0, len(approaches)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if time_order(approaches[mid]) < minutes:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
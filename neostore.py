@@ -0,0 +1,160 @@
+"""Store the near-Earth objects of a database once each, with indexes on their attributes.
+
+An `NEOStore` is the sequence of the NEOs of an `ApproachTable` (`table.neos`),
+including those without any close approach, in the order of the data. It
+answers criteria on the attributes of NEOs - diameter and hazardousness - with
+indexes over the NEOs rather than over their approaches:
+
+- A `SortedIndex` of the NEOs by diameter, for ranges of diameters.
+- A bitmap (see `bitmap`) of the potentially hazardous NEOs.
+
+It also groups the rows of the table by NEO, as one array of row numbers
+sorted by NEO (and then by row) along with the offset of each NEO's run, so
+that the approaches of a set of NEOs can be gathered without a scan.
+
+The indexes are built when first needed, or by `build_indexes`; the grouped
+rows are rebuilt whenever the rows of the table change.
+"""
+from array import array
+from collections.abc import Sequence
+import operator
+
+from bitmap import bitmap_from_flags, bitmap_from_rows, bitmap_rows, bitmap_span
+from filters import RangeFilter, HazardousFilter, compile_filters
+from index import SortedIndex
+from table import NO_NEO
+
+
+class NEOStore(Sequence):
+    """The NEOs of a table, each once, with indexes by diameter and hazardousness."""
+
+    def __init__(self, table):
+        """Create a new `NEOStore` of the NEOs of a linked `ApproachTable`.
+
+        :param table: An `ApproachTable`, linked to its NEOs.
+        """
+        self.table = table
+        self.neos = table.neos
+        self.all = bitmap_span(0, len(self.neos))
+        self._diameters = None
+        self._hazardous = None
+        self._offsets = None
+        self._rows = None
+        self._rows_version = None
+
+    def __len__(self):
+        """Return `len(self)`, the number of NEOs."""
+        return len(self.neos)
+
+    def __getitem__(self, position):
+        """Return `self[position]`, the NEO at a position (or a list of them, for a slice)."""
+        return self.neos[position]
+
+    def build_indexes(self):
+        """Build every index that hasn't been built yet."""
+        self._diameter_index()
+        self._hazardous_bits()
+        self._approach_runs()
+
+    def query(self, filters=()):
+        """Find the positions of the NEOs that match a collection of criteria on NEOs.
+
+        Ranges of diameters are answered with the diameter index, and criteria on
+        hazardousness with its bitmap; any other criterion on NEOs is evaluated
+        on each of the NEOs that match those.
+
+        :param filters: A collection of filters on the attributes of NEOs (such as `DiameterFilter`s).
+        :return: A list of positions, in increasing order.
+        :raises ValueError: If a filter isn't a criterion on the attributes of NEOs.
+        """
+        filters = list(filters)
+        for f in filters:
+            if not is_neo_filter(f):
+                raise ValueError(f"{f!r} is not a criterion on the attributes of NEOs")
+
+        bits = self.all
+        remaining = []
+        for f in filters:
+            if isinstance(f, RangeFilter):
+                index = self._diameter_index()
+                start, stop = index.span(*f.bounds())
+                bits &= bitmap_from_rows(index.rows_in(start, stop), len(self))
+            elif type(f) is HazardousFilter and f.op is operator.eq:
+                bits &= self._hazardous_bits() if f.value else self.all ^ self._hazardous_bits()
+            else:
+                remaining.append(f)
+
+        positions = bitmap_rows(bits)
+        if remaining:
+            predicate = compile_filters(remaining)
+            neos = self.neos
+            positions = [position for position in positions if predicate(_NEOProbe(neos[position]))]
+        return positions
+
+    def approach_count(self, positions):
+        """Return the number of close approaches of the NEOs at some positions."""
+        offsets = self._approach_runs()[0]
+        return sum(offsets[position + 1] - offsets[position] for position in positions)
+
+    def approach_rows(self, positions):
+        """Gather the rows of the close approaches of the NEOs at some positions.
+
+        :param positions: An iterable of NEO positions.
+        :return: A list of row numbers, in internal order.
+        """
+        offsets, rows = self._approach_runs()
+        gathered = []
+        for position in positions:
+            gathered.extend(rows[offsets[position]:offsets[position + 1]])
+        # Each NEO's run is already sorted, which Python's sort takes advantage of.
+        gathered.sort()
+        return gathered
+
+    def _diameter_index(self):
+        """Return the `SortedIndex` of the NEOs by diameter, building it if needed."""
+        if self._diameters is None:
+            self._diameters = SortedIndex([neo.diameter for neo in self.neos])
+        return self._diameters
+
+    def _hazardous_bits(self):
+        """Return the bitmap of the potentially hazardous NEOs, building it if needed."""
+        if self._hazardous is None:
+            self._hazardous = bitmap_from_flags([bool(neo.hazardous) for neo in self.neos])
+        return self._hazardous
+
+    def _approach_runs(self):
+        """Return the offsets of each NEO's run of rows, and the rows sorted by NEO, building them if needed."""
+        if self._rows is None or self._rows_version != self.table.version:
+            neo_indexes = self.table.neo_indexes
+            # A counting sort of the rows by NEO, which keeps each NEO's rows in order.
+            offsets = [0] * (len(self.neos) + 1)
+            for index in neo_indexes:
+                if index != NO_NEO:
+                    offsets[index + 1] += 1
+            for position in range(len(self.neos)):
+                offsets[position + 1] += offsets[position]
+            rows = array('l', bytes(offsets[-1] * array('l').itemsize))
+            next_slot = offsets[:-1]
+            for row, index in enumerate(neo_indexes):
+                if index != NO_NEO:
+                    rows[next_slot[index]] = row
+                    next_slot[index] += 1
+            self._offsets = array('l', offsets)
+            self._rows = rows
+            self._rows_version = self.table.version
+        return self._offsets, self._rows
+
+
+def is_neo_filter(f):
+    """Return whether a filter is a criterion on the attributes of NEOs (rather than of approaches)."""
+    return getattr(f, 'on_neo', False)
+
+
+class _NEOProbe:
+    """A stand-in for a close approach of an NEO, to evaluate filters on NEOs with."""
+
+    __slots__ = ('neo',)
+
+    def __init__(self, neo):
+        """Create a new `_NEOProbe` of an NEO."""
+        self.neo = neo
@@ -0,0 +1,68 @@
+"""Order the rows that match a query by the value of one of their attributes.
+
+Sorted results follow the same rules whichever way they are produced:
+
+- Rows are ordered by their value, ascending or descending.
+- Rows with equal values stay in internal order, in both directions.
+- Rows whose value is unknown (NaN, such as an unknown diameter) come last, in
+  internal order.
+
+`top_rows` sorts a collection of matching rows - fully, or, when only the first
+`k` are wanted, with a bounded heap in O(n log k) time and O(k) memory.
+`walk_index` instead reads the rows of a `SortedIndex` in order, so that a
+query with a limit can stop as soon as it has found enough matches.
+"""
+from bisect import bisect_left
+import heapq
+
+
+def top_rows(rows, keys, k=None, descending=False):
+    """Sort rows by their keys, keeping only the first `k` if given.
+
+    :param rows: A sequence of row numbers, in internal order.
+    :param keys: A sequence with the value of each row of the table.
+    :param k: The maximum number of rows to return, or None for all of them.
+    :param descending: Whether to sort the largest values first.
+    :return: A list of row numbers.
+    """
+    key = keys.__getitem__
+    known = [row for row in rows if key(row) == key(row)]
+    if k is None:
+        ordered = sorted(known, key=key, reverse=descending)
+    elif descending:
+        ordered = heapq.nlargest(k, known, key=key)
+    else:
+        ordered = heapq.nsmallest(k, known, key=key)
+    if len(known) < len(rows) and (k is None or len(ordered) < k):
+        ordered.extend(row for row in rows if key(row) != key(row))
+    return ordered if k is None else ordered[:k]
+
+
+def walk_index(index, descending=False, start=0, stop=None):
+    """Generate the rows of a `SortedIndex` in the order of their values.
+
+    Runs of equal values are generated in internal order, in both directions.
+    Rows left out of the index (because their value is NaN) aren't generated.
+
+    :param index: A `SortedIndex`.
+    :param descending: Whether to generate the largest values first.
+    :param start: The first position of the index to walk, as returned by `SortedIndex.span`.
+    :param stop: The position after the last one to walk, or None for the end of the index.
+    :yield: Row numbers.
+    """
+    keys = index.keys
+    if stop is None:
+        stop = len(keys)
+    if not descending:
+        # Read the rows a block at a time, so that a consumer that stops early doesn't copy them all.
+        for position in range(start, stop, _WALK_BLOCK):
+            yield from index.rows_in(position, min(position + _WALK_BLOCK, stop))
+        return
+    while stop > start:
+        run = bisect_left(keys, keys[stop - 1], start, stop)
+        yield from index.rows_in(run, stop)
+        stop = run
+
+
+# The number of rows read from an index at a time, in an ascending walk.
+_WALK_BLOCK = 1024
@@ -0,0 +1,420 @@
+"""Plan how a query for close approaches is evaluated.
+
+Given the filters produced by `create_filters`, a `QueryPlanner` decides which
+rows of an `NEODatabase` to look at, and in which order to evaluate the filters
+on each of them. The plan never changes which approaches match - only how much
+work it takes to find them.
+
+The planner relies on `ColumnStats`, collected when the database is built, to
+estimate the selectivity of each criterion (the fraction of approaches that
+satisfy it):
+
+- If a `RangeFilter` is empty, no approach can match: nothing is scanned.
+- The filters on each indexed attribute (time, distance, velocity and diameter)
+  are folded into one range of values. The exact number of rows in a range is
+  then counted with the attribute's `SortedIndex`, as long as the index exists
+  or is estimated to be worth building.
+- If the narrowest range is small enough, its rows are the candidates, and the
+  rows of other small ranges are intersected with them. Otherwise, every row is
+  scanned.
+- If the query has a criterion on hazardousness or diameter, the bitmaps of a
+  `BitmapIndex` (hazardous, known diameter, time span or years) are combined
+  and used instead, if they leave fewer candidates. Alternatively, if the
+  statistics estimate that it's cheaper still, the NEOs that satisfy those
+  criteria are found in the database's `NEOStore`, and their approaches are
+  the candidates.
+- The remaining filters are ordered so that cheap filters that reject many rows
+  come first: by cost divided by the estimated fraction of rows they reject.
+"""
+from bisect import bisect_left, bisect_right
+import operator
+
+from bitmap import bitmap_count, bitmap_rows, bitmap_span
+from filters import RangeFilter, DateFilter, DistanceFilter, VelocityFilter, DiameterFilter, HazardousFilter
+
+
+# Per-row costs, relative to evaluating a simple filter on one row. Sorting the
+# candidate rows back into internal order costs about as much as a filter.
+SORT_COST = 1.0
+# A range of an index that is not built yet is only built if it's estimated to
+# hold at most this fraction of the rows.
+BUILD_THRESHOLD = 0.5
+# The rows of another index range are intersected with the candidates if that
+# range is at most this many times larger than the candidates.
+INTERSECT_FACTOR = 4
+# Costs of reading the rows of a bitmap back: per row of the table (to skip
+# over its bytes), and per row that is read.
+BITMAP_TABLE_COST = 0.02
+BITMAP_ROW_COST = 0.5
+# The cost of a filter evaluated over NumPy columns, per row.
+VECTOR_FILTER_COST = 0.01
+
+# The attribute whose index can answer each kind of filter, and the relative
+# cost of evaluating such a filter (NEO attributes need one more lookup).
+_INDEXED_FILTERS = {
+    DateFilter: 'time',
+    DistanceFilter: 'distance',
+    VelocityFilter: 'velocity',
+    DiameterFilter: 'diameter',
+}
+_FILTER_COSTS = {
+    DateFilter: 1.0,
+    DistanceFilter: 1.0,
+    VelocityFilter: 1.0,
+    DiameterFilter: 2.0,
+    HazardousFilter: 2.0,
+}
+_RANGE_COSTS = {'time': 1.0, 'distance': 1.0, 'velocity': 1.0, 'diameter': 2.0}
+_UNKNOWN_FILTER_COST = 3.0
+
+# The range of values that satisfies a filter, as `(lo, lo_inclusive, hi, hi_inclusive)`, by its operator.
+_RANGE_OPS = {
+    operator.eq: lambda value: (value, True, value, True),
+    operator.ge: lambda value: (value, True, None, True),
+    operator.gt: lambda value: (value, False, None, True),
+    operator.le: lambda value: (None, True, value, True),
+    operator.lt: lambda value: (None, True, value, False),
+}
+
+
+class ColumnStats:
+    """Statistics about the values of one column: bounds, missing values and a histogram.
+
+    The histogram is equi-depth: it's a sorted sample of the known values,
+    so the fraction of the sample within a range estimates the fraction of all
+    values within that range.
+    """
+
+    def __init__(self, values, sample_size=1024):
+        """Collect statistics about a column of values.
+
+        :param values: A sequence with the value of each row.
+        :param sample_size: The number of values kept in the histogram.
+        """
+        # Neither None (an NEO built without a diameter) nor NaN is a known value.
+        present = [value for value in values if value is not None and value == value]
+        self.count = len(values)
+        self.present = len(present)
+        self.min = min(present) if present else None
+        self.max = max(present) if present else None
+        step = max(1, len(present) // sample_size)
+        self.histogram = sorted(present[::step])
+
+    def selectivity(self, lo=None, hi=None, lo_inclusive=True, hi_inclusive=True):
+        """Estimate the fraction of rows whose value is within a range.
+
+        :return: A fraction between 0 and 1.
+        """
+        if not self.count or not self.histogram:
+            return 0.0
+        histogram = self.histogram
+        if lo is None:
+            start = 0
+        else:
+            start = (bisect_left if lo_inclusive else bisect_right)(histogram, lo)
+        if hi is None:
+            stop = len(histogram)
+        else:
+            stop = (bisect_right if hi_inclusive else bisect_left)(histogram, hi)
+        if stop <= start:
+            if (lo is not None and lo > self.max) or (hi is not None and hi < self.min):
+                return 0.0
+            # Don't rule a range out just because no sampled value falls in it.
+            stop = start + 0.5
+        return (stop - start) / len(histogram) * self.present / self.count
+
+
+class QueryPlan:
+    """How to evaluate a query: the candidate rows, and the filters to evaluate on each of them, in order."""
+
+    def __init__(self, rows, filters, strategy):
+        """Create a new `QueryPlan`.
+
+        :param rows: A sequence of candidate row numbers, in internal order.
+        :param filters: A list of the filters that remain to be evaluated on each candidate.
+        :param strategy: A human-readable description of how the candidates were found.
+        """
+        self.rows = rows
+        self.filters = filters
+        self.strategy = strategy
+
+    def __repr__(self):
+        """Return `repr(self)`, a computer-readable string representation of this object."""
+        return f"QueryPlan(rows={len(self.rows)}, filters={self.filters!r}, strategy={self.strategy!r})"
+
+
+class QueryPlanner:
+    """Plans queries against the rows of an `NEODatabase`."""
+
+    def __init__(self, database):
+        """Create a new `QueryPlanner`, collecting statistics about the database's approaches.
+
+        :param database: The `NEODatabase` to plan queries for.
+        """
+        self.database = database
+        self.stats = {attribute: ColumnStats(database._column(attribute))
+                      for attribute in ('time', 'distance', 'velocity', 'diameter')}
+        hazardous = database._column('hazardous')
+        self.hazardous_fraction = sum(hazardous) / len(hazardous) if hazardous else 0.0
+
+    def plan(self, filters):
+        """Plan the evaluation of a collection of filters.
+
+        :param filters: A collection of filters capturing user-specified criteria.
+        :return: A `QueryPlan`.
+        """
+        database = self.database
+        n = len(database._approaches)
+        filters = list(filters)
+        ranges = {}
+        remaining = []
+        for f in filters:
+            if isinstance(f, RangeFilter):
+                if f.is_empty():
+                    return QueryPlan((), [], 'empty')
+                attribute = f.attribute
+            else:
+                attribute = _INDEXED_FILTERS.get(type(f))
+                if attribute is None or f.op not in _RANGE_OPS:
+                    remaining.append(f)
+                    continue
+            bounds = ranges.setdefault(attribute, [None, True, None, True, []])
+            _tighten(bounds, *_filter_range(f))
+            bounds[4].append(f)
+
+        # Count the rows of each range that has (or deserves) an index.
+        candidates = []
+        for attribute, (lo, lo_inclusive, hi, hi_inclusive, _) in ranges.items():
+            estimate = self.stats[attribute].selectivity(lo, hi, lo_inclusive, hi_inclusive)
+            if not database._has_index(attribute) and estimate > BUILD_THRESHOLD:
+                continue
+            index = database._index(attribute)
+            start, stop = index.span(lo, hi, lo_inclusive, hi_inclusive)
+            candidates.append((stop - start, attribute, index, start, stop))
+        candidates.sort(key=lambda candidate: candidate[0])
+
+        rows = range(n)
+        used = set()
+        # The cost of finding the candidates, before evaluating the filters that remain.
+        cost = 0
+        if candidates:
+            count, attribute, index, start, stop = candidates[0]
+            sort_cost = 0 if index.is_identity() else SORT_COST
+            if count == 0 or count * (1 + sort_cost) < n:
+                cost = count * sort_cost
+                rows = index.rows_in(start, stop)
+                used.add(attribute)
+                for other_count, other, other_index, other_start, other_stop in candidates[1:]:
+                    if other_count > INTERSECT_FACTOR * max(count, 1):
+                        break
+                    keep = set(other_index.rows_in(other_start, other_stop))
+                    rows = [row for row in rows if row in keep]
+                    used.add(other)
+                # Intersecting keeps the order of the first index's rows.
+                if not index.is_identity():
+                    rows = sorted(rows)
+        strategy = f"index scan on {' and '.join(sorted(used))}" if used else 'full scan'
+        filter_cost = VECTOR_FILTER_COST if database._vectorize else 1.0
+        current = len(rows) * filter_cost * self._residuals(filters, used) + cost
+
+        # Combining bitmaps may narrow the candidates down further, without touching any row.
+        bitmap = self._combine_bitmaps(ranges, remaining) if len(rows) else None
+        if bitmap is not None:
+            bits, labels, answered, exact = bitmap
+            count = bitmap_count(bits)
+            bitmap_cost = (n * BITMAP_TABLE_COST + count * BITMAP_ROW_COST
+                           + count * filter_cost * self._residuals(filters, exact, answered))
+            if bitmap_cost < current:
+                rows = bitmap_rows(bits)
+                used = exact
+                remaining = [f for f in remaining if f not in answered]
+                strategy = f"bitmap scan on {' and '.join(sorted(labels))}"
+                current = bitmap_cost
+        # So may gathering the approaches of the NEOs that satisfy the criteria on NEOs, but
+        # those NEOs are only looked up if the statistics suggest that it could be cheaper.
+        neos = None
+        if len(rows) and self._neo_cost(filters, ranges, remaining, filter_cost) < current:
+            neos = self._match_neos(ranges, remaining)
+        if neos is not None:
+            positions, answered, exact = neos
+            count = database._neos.approach_count(positions)
+            neo_cost = len(positions) + count * (SORT_COST + filter_cost * self._residuals(filters, exact, answered))
+            if neo_cost < current:
+                rows = database._neos.approach_rows(positions)
+                used = exact
+                remaining = [f for f in remaining if f not in answered]
+                labels = (['diameter'] if exact else []) + (['hazardous'] if answered else [])
+                strategy = f"neo scan on {' and '.join(labels)}"
+
+        for attribute, bounds in ranges.items():
+            if attribute not in used:
+                remaining.extend(bounds[4])
+        remaining.sort(key=self._rank)
+        return QueryPlan(rows, remaining, strategy)
+
+    def selectivity(self, filters):
+        """Estimate the fraction of rows that match a collection of filters, assuming they're independent.
+
+        :param filters: A collection of filters capturing user-specified criteria.
+        :return: A fraction between 0 and 1.
+        """
+        fraction = 1.0
+        for f in filters:
+            fraction *= self._pass_rate(f)
+        return fraction
+
+    @staticmethod
+    def _residuals(filters, attributes, answered=()):
+        """Count the filters that remain to be evaluated on each candidate.
+
+        :param filters: The filters of a query.
+        :param attributes: The attributes whose ranges the candidates satisfy exactly.
+        :param answered: Other filters that the candidates satisfy exactly.
+        """
+        count = 0
+        for f in filters:
+            attribute = f.attribute if isinstance(f, RangeFilter) else _INDEXED_FILTERS.get(type(f))
+            if attribute not in attributes and f not in answered:
+                count += 1
+        return count
+
+    def _combine_bitmaps(self, ranges, remaining):
+        """Intersect the bitmaps that apply to a query, if it has a low-cardinality criterion.
+
+        Bitmaps are only used for queries on hazardousness or on diameter; the
+        range of times of such a query is then turned into a bitmap too.
+
+        :param ranges: The folded ranges of the query, by attribute.
+        :param remaining: The filters of the query that aren't on a range.
+        :return: A tuple of the combined bitmap, the labels of the bitmaps, the filters that it answers exactly and the attributes whose range it answers exactly; or None.
+        """
+        hazardous = [f for f in remaining if type(f) is HazardousFilter and f.op is operator.eq]
+        if not hazardous and 'diameter' not in ranges:
+            return None
+        bitmaps = self.database._bitmaps()
+        bits = bitmaps.all
+        labels, answered, exact = set(), [], set()
+        for f in hazardous:
+            # An approach without a known NEO is neither hazardous nor not hazardous.
+            bits &= bitmaps.hazardous if f.value else bitmaps.linked ^ bitmaps.hazardous
+            labels.add('hazardous')
+            answered.append(f)
+        if 'diameter' in ranges:
+            # Only approaches of NEOs with a known diameter can satisfy a diameter criterion.
+            bits &= bitmaps.diameter_known
+            labels.add('known diameter')
+        if 'time' in ranges:
+            lo, lo_inclusive, hi, hi_inclusive, _ = ranges['time']
+            index = self.database._index('time')
+            if index.is_identity():
+                # The rows of a range of times are contiguous.
+                bits &= bitmap_span(*index.span(lo, hi, lo_inclusive, hi_inclusive))
+                labels.add('time')
+                exact.add('time')
+            else:
+                if lo is not None and not lo_inclusive:
+                    lo += 1
+                if hi is not None and hi_inclusive:
+                    hi += 1
+                years, is_exact = bitmaps.years_between(lo, hi)
+                bits &= years
+                labels.add('year')
+                if is_exact:
+                    exact.add('time')
+        return bits, labels, answered, exact
+
+    def _neo_cost(self, filters, ranges, remaining, filter_cost):
+        """Estimate the cost of gathering the approaches of the NEOs that satisfy the criteria of a query on NEOs.
+
+        The estimate only relies on the column statistics: nothing is looked up.
+
+        :param filters: The filters of a query.
+        :param ranges: The folded ranges of the query, by attribute.
+        :param remaining: The filters of the query that aren't on a range.
+        :param filter_cost: The cost of evaluating a filter on a row.
+        :return: The estimated cost, or infinity if the query has no criterion on NEOs.
+        """
+        hazardous = [f for f in remaining if type(f) is HazardousFilter and f.op is operator.eq]
+        if not hazardous and 'diameter' not in ranges:
+            return float('inf')
+        fraction = self.selectivity(hazardous)
+        exact = set()
+        if 'diameter' in ranges:
+            lo, lo_inclusive, hi, hi_inclusive, _ = ranges['diameter']
+            fraction *= self.stats['diameter'].selectivity(lo, hi, lo_inclusive, hi_inclusive)
+            exact.add('diameter')
+        # About as many of the NEOs as of their approaches satisfy the criteria.
+        count = fraction * len(self.database._approaches)
+        return (fraction * len(self.database._neos)
+                + count * (SORT_COST + filter_cost * self._residuals(filters, exact, hazardous)))
+
+    def _match_neos(self, ranges, remaining):
+        """Find the NEOs that satisfy the criteria of a query on NEOs, if it has any.
+
+        :param ranges: The folded ranges of the query, by attribute.
+        :param remaining: The filters of the query that aren't on a range.
+        :return: A tuple of the positions of the NEOs in the database's `NEOStore`, the filters that they answer exactly and the attributes whose range they answer exactly; or None.
+        """
+        hazardous = [f for f in remaining if type(f) is HazardousFilter and f.op is operator.eq]
+        if not hazardous and 'diameter' not in ranges:
+            return None
+        criteria = list(hazardous)
+        exact = set()
+        if 'diameter' in ranges:
+            lo, lo_inclusive, hi, hi_inclusive, _ = ranges['diameter']
+            criteria.append(RangeFilter('diameter', lo, hi, lo_inclusive, hi_inclusive))
+            exact.add('diameter')
+        return self.database._neos.query(criteria), hazardous, exact
+
+    def _rank(self, f):
+        """Rank a filter for evaluation order: lower ranks are evaluated first.
+
+        :param f: A filter.
+        :return: The cost of the filter divided by the estimated fraction of rows it rejects.
+        """
+        if isinstance(f, RangeFilter):
+            cost = _RANGE_COSTS[f.attribute]
+        else:
+            cost = _FILTER_COSTS.get(type(f), _UNKNOWN_FILTER_COST)
+        return cost / max(1.0 - self._pass_rate(f), 1e-6)
+
+    def _pass_rate(self, f):
+        """Estimate the fraction of rows that satisfy a filter."""
+        if isinstance(f, RangeFilter):
+            return self.stats[f.attribute].selectivity(*f.bounds())
+        attribute = _INDEXED_FILTERS.get(type(f))
+        if attribute is not None and f.op in _RANGE_OPS:
+            lo, lo_inclusive, hi, hi_inclusive = _filter_range(f)
+            return self.stats[attribute].selectivity(lo, hi, lo_inclusive, hi_inclusive)
+        if type(f) is HazardousFilter and f.op is operator.eq:
+            return self.hazardous_fraction if f.value else 1.0 - self.hazardous_fraction
+        return 1.0
+
+
+def _filter_range(f):
+    """Return the range of values of an indexed attribute that satisfies a filter.
+
+    Dates are converted to minutes: day `d` covers the minutes from `d * 1440`
+    (inclusive) to `(d + 1) * 1440` (exclusive).
+
+    :param f: A `RangeFilter`, or a filter whose type is in `_INDEXED_FILTERS` and operator is in `_RANGE_OPS`.
+    :return: A tuple `(lo, lo_inclusive, hi, hi_inclusive)`.
+    """
+    if isinstance(f, RangeFilter):
+        return f.lo, f.lo_inclusive, f.hi, f.hi_inclusive
+    lo, lo_inclusive, hi, hi_inclusive = _RANGE_OPS[f.op](f.value)
+    if type(f) is DateFilter:
+        if lo is not None:
+            lo = (lo if lo_inclusive else lo + 1) * 1440
+        if hi is not None:
+            hi = (hi + 1 if hi_inclusive else hi) * 1440
+        return lo, True, hi, False
+    return lo, lo_inclusive, hi, hi_inclusive
+
+
+def _tighten(bounds, lo, lo_inclusive, hi, hi_inclusive):
+    """Narrow a mutable range `[lo, lo_inclusive, hi, hi_inclusive, ...]` to its intersection with another."""
+    if lo is not None and (bounds[0] is None or lo > bounds[0] or (lo == bounds[0] and not lo_inclusive)):
+        bounds[0:2] = lo, lo_inclusive
+    if hi is not None and (bounds[2] is None or hi < bounds[2] or (hi == bounds[2] and not hi_inclusive)):
+        bounds[2:4] = hi, hi_inclusive
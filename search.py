@@ -0,0 +1,282 @@
+"""Find NEOs by approximate names, and by designations written in any of their usual forms.
+
+A `NameIndex` indexes the names of a collection of NEOs, case-insensitively
+(names are compared by their `str.casefold`), in two structures:
+
+- A sorted array of the folded names, in which the names that start with a
+  prefix form one contiguous run, found with two binary searches.
+- A trigram index, from each three-character substring of the folded names
+  (padded at both ends) to the names that contain it. A name within edit
+  distance `k` of a query shares all but at most `3 * k` of the query's
+  trigrams, so only the names that share enough of them are compared with the
+  query, with a Levenshtein distance computation that stops as soon as the
+  distance is known to exceed `k`.
+
+`NameIndex.find` combines these lookups to resolve what a user typed - an exact
+name in any case, a prefix of a name, or a misspelt name - and `complete`
+suggests names for tab completion.
+
+A `DesignationIndex` maps the canonical form of each NEO's primary designation
+(see `normalize_designation`) to the NEO, so that a designation can be found
+however a data feed writes it: "2020 AB", "2020AB", "2020 ab", in the packed
+form of the Minor Planet Center ("K20A00B"), or - for numbered NEOs - packed
+("00433", "A0345") or with an SPK-style prefix ("a0000433").
+"""
+from bisect import bisect_left, bisect_right
+import functools
+import re
+
+
+# The characters that pad each end of a name before it is split into trigrams.
+_PAD = '\0\0'
+
+
+# The centuries of packed provisional designations, by their letter.
+_PACKED_CENTURIES = {'I': 18, 'J': 19, 'K': 20}
+
+# A packed provisional designation: century, year, half-month, packed cycle count and letter ("K20A01B").
+_PACKED_PROVISIONAL = re.compile(r'([IJK])(\d\d)([A-Z])([0-9A-Za-z])(\d)([A-Z])')
+
+# A packed number: five digits, or a letter standing for the ten-thousands and four digits ("A0345").
+_PACKED_NUMBER = re.compile(r'[0-9A-Za-z]\d{4}')
+
+# A packed number of 620000 or more: a tilde and four base-62 digits ("~0000").
+_PACKED_LARGE_NUMBER = re.compile(r'~[0-9A-Za-z]{4}')
+
+# A number with an SPK-style prefix ("a0000433").
+_SPK_NUMBER = re.compile(r'[aA]\d{6,}')
+
+# An unpacked provisional designation, with or without its space ("2020 AB1", "2020AB1").
+_PROVISIONAL = re.compile(r'(\d{4}) *([A-Z])([A-Z])(\d*)')
+
+# The digits of packed numbers and cycle counts, by value.
+_BASE62 = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+
+
+@functools.lru_cache(maxsize=65536)
+def normalize_designation(designation):
+    """Return the canonical form of a designation: unpacked, in upper case and without spaces.
+
+    For example, "2020 AB1", "2020ab1" and "K20A01B" all become "2020AB1", and
+    "433", "00433" and "a0000433" all become "433". Other designations (such as
+    those of comets) are only converted to upper case and stripped of spaces.
+
+    :param designation: A designation, in any of its usual forms.
+    :return: The canonical form of the designation, as a string.
+    """
+    text = designation.strip()
+    if text.startswith('(') and text.endswith(')'):
+        text = text[1:-1].strip()
+
+    # Unpack packed designations first, since their case is significant.
+    match = _PACKED_PROVISIONAL.fullmatch(text)
+    if match:
+        century, year, half_month, tens, units, letter = match.groups()
+        cycle = _BASE62.index(tens) * 10 + int(units)
+        return f"{_PACKED_CENTURIES[century]}{year}{half_month}{letter}{cycle or ''}"
+    if _PACKED_NUMBER.fullmatch(text):
+        return str(_BASE62.index(text[0]) * 10000 + int(text[1:]))
+    if _PACKED_LARGE_NUMBER.fullmatch(text):
+        value = 0
+        for digit in text[1:]:
+            value = value * 62 + _BASE62.index(digit)
+        return str(620000 + value)
+    if _SPK_NUMBER.fullmatch(text):
+        return str(int(text[1:]))
+
+    text = text.upper()
+    match = _PROVISIONAL.fullmatch(text)
+    if match:
+        year, half_month, letter, cycle = match.groups()
+        return f"{year}{half_month}{letter}{int(cycle) if cycle and int(cycle) else ''}"
+    if text.isdigit():
+        return str(int(text))
+    return ''.join(text.split())
+
+
+def trigrams(text):
+    """Return the set of trigrams of a (folded) name, padded at both ends."""
+    padded = _PAD + text + _PAD
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, bound):
+    """Compute the Levenshtein distance between two strings, up to a bound.
+
+    :param a: A string.
+    :param b: Another string.
+    :param bound: The largest distance of interest.
+    :return: The distance between `a` and `b`, or `bound + 1` if it's larger than `bound`.
+    """
+    if abs(len(a) - len(b)) > bound:
+        return bound + 1
+    previous = list(range(len(b) + 1))
+    for i, char in enumerate(a, 1):
+        current = [i]
+        for j, other in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char != other)))
+        if min(current) > bound:
+            return bound + 1
+        previous = current
+    return min(previous[-1], bound + 1)
+
+
+class NameIndex:
+    """A case-insensitive index of the names of a collection of NEOs, by prefix and by trigram."""
+
+    def __init__(self, neos):
+        """Index the names of a collection of NEOs. NEOs without a name are left out.
+
+        :param neos: A collection of `NearEarthObject`s.
+        """
+        named = sorted(((neo.name.casefold(), neo.name, neo) for neo in neos if neo.name),
+                       key=lambda entry: entry[:2])
+        self.keys = [key for key, _, _ in named]
+        self.names = [name for _, name, _ in named]
+        self.neos = [neo for _, _, neo in named]
+        self._trigrams = {}
+        for position, key in enumerate(self.keys):
+            for gram in trigrams(key):
+                self._trigrams.setdefault(gram, []).append(position)
+
+    def __len__(self):
+        """Return `len(self)`, the number of indexed names."""
+        return len(self.keys)
+
+    def exact(self, name):
+        """Find the NEOs with a name, in any case.
+
+        :param name: A name.
+        :return: A list of `NearEarthObject`s.
+        """
+        start, stop = self._span(name.casefold(), exact=True)
+        return self.neos[start:stop]
+
+    def prefix(self, prefix, limit=None):
+        """Find the NEOs whose name starts with a prefix, in any case, ordered by name.
+
+        :param prefix: The start of a name.
+        :param limit: The maximum number of NEOs to return, or None for all of them.
+        :return: A list of `NearEarthObject`s.
+        """
+        start, stop = self._span(prefix.casefold())
+        if limit is not None:
+            stop = min(stop, start + limit)
+        return self.neos[start:stop]
+
+    def fuzzy(self, name, max_distance=2, limit=None):
+        """Find the NEOs whose name is within an edit distance of a name, in any case.
+
+        :param name: A name, possibly misspelt.
+        :param max_distance: The largest number of inserted, deleted or substituted characters.
+        :param limit: The maximum number of NEOs to return, or None for all of them.
+        :return: A list of `NearEarthObject`s, the closest first (and then by name).
+        """
+        key = name.casefold()
+        grams = trigrams(key)
+        needed = len(grams) - 3 * max_distance
+        if needed > 0:
+            # Count the query's trigrams in each name; only names with enough of them can be close enough.
+            shared = {}
+            for gram in grams:
+                for position in self._trigrams.get(gram, ()):
+                    shared[position] = shared.get(position, 0) + 1
+            candidates = [position for position, count in shared.items() if count >= needed]
+        else:
+            candidates = range(len(self.keys))
+
+        matches = []
+        for position in candidates:
+            distance = edit_distance(key, self.keys[position], max_distance)
+            if distance <= max_distance:
+                matches.append((distance, position))
+        matches.sort()
+        if limit is not None:
+            matches = matches[:limit]
+        return [self.neos[position] for _, position in matches]
+
+    def find(self, name, max_distance=2, limit=None):
+        """Resolve a name as typed by a user to the NEOs it most likely refers to.
+
+        The NEOs whose name is `name` in any case are preferred, then those whose
+        name starts with `name`, then those whose name is within `max_distance`
+        edits of `name`: only the first of these lookups that finds any NEO counts.
+
+        :param name: A name, a prefix of a name, or a misspelt name.
+        :param max_distance: The largest edit distance of a misspelt name.
+        :param limit: The maximum number of NEOs to return, or None for all of them.
+        :return: A list of `NearEarthObject`s, possibly empty.
+        """
+        return (self.exact(name)[:limit] or self.prefix(name, limit)
+                or self.fuzzy(name, max_distance, limit))
+
+    def complete(self, prefix):
+        """Return the names that start with a prefix, in any case, for tab completion.
+
+        :param prefix: The start of a name.
+        :return: A list of names, in their original case.
+        """
+        start, stop = self._span(prefix.casefold())
+        return self.names[start:stop]
+
+    def _span(self, key, exact=False):
+        """Find the positions of the folded names that are (or start with) a folded key.
+
+        :return: A pair `(start, stop)` of positions in `self.keys`.
+        """
+        keys = self.keys
+        start = bisect_left(keys, key)
+        if exact:
+            return start, bisect_right(keys, key, start)
+        # Every key that starts with `key` sorts before `key` followed by the largest character.
+        return start, bisect_left(keys, key + '\U0010ffff', start)
+
+
+class DesignationIndex:
+    """A mapping from the canonical form of each NEO's primary designation to the NEO."""
+
+    def __init__(self, neos):
+        """Index the designations of a collection of NEOs.
+
+        If the designations of several NEOs have the same canonical form, the
+        first of them is kept.
+
+        :param neos: A collection of `NearEarthObject`s.
+        """
+        self.exact = {}
+        self.canonical = {}
+        for neo in neos:
+            self.exact.setdefault(neo.designation, neo)
+            self.canonical.setdefault(normalize_designation(neo.designation), neo)
+
+    def __len__(self):
+        """Return `len(self)`, the number of indexed NEOs."""
+        return len(self.exact)
+
+    def get(self, designation):
+        """Find an NEO by its primary designation, in any of its usual forms.
+
+        :param designation: A designation.
+        :return: The matching `NearEarthObject`, or None.
+        """
+        neo = self.exact.get(designation)
+        if neo is None:
+            neo = self.canonical.get(normalize_designation(designation))
+        return neo
+
+    def get_many(self, designations):
+        """Find the NEOs of many designations at once, in any of their usual forms.
+
+        Designations that are written exactly as in the data are resolved by a
+        single pass of dictionary lookups; only the others are normalized.
+
+        :param designations: An iterable of designations.
+        :return: A list with the matching `NearEarthObject` (or None) of each designation, in order.
+        """
+        designations = list(designations)
+        neos = list(map(self.exact.get, designations))
+        canonical = self.canonical
+        for position, neo in enumerate(neos):
+            if neo is None:
+                neos[position] = canonical.get(normalize_designation(designations[position]))
+        return neos
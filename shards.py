@@ -0,0 +1,133 @@
+"""Evaluate the filters of a query on shards of the candidate approaches, in parallel.
+
+A `ShardedExecutor` splits the candidate rows of a query into contiguous shards
+and has a pool of processes find the rows of each shard that match the query's
+filters. Each result is a compact array of row numbers, and the results are
+yielded in shard order - that is, in the database's internal order - as soon
+as each of them is ready. Only a bounded number of shards is in flight at a
+time, so a consumer that stops early (such as `filters.limit`) doesn't make the
+pool scan every shard.
+
+Sharding takes the place of vectorizing in the owning process: each worker
+evaluates the filters that NumPy can evaluate as masks over its own shard (see
+`vectorized.VectorizedEngine`), and the others one approach at a time.
+
+The worker processes are forked from the process that owns the database, so
+they inherit the database (and its approaches) instead of receiving a copy of
+it. They're forked again whenever the approaches change. Where processes can't
+be forked, the shards are evaluated in this process.
+
+The executor only holds a weak reference to its database; `shutdown` stops
+the worker processes, and an executor can be used as a context manager to do so.
+"""
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import weakref
+
+from filters import compile_filters
+
+
+# The number of candidate rows in each shard.
+SHARD_SIZE = 50000
+
+# The databases that forked workers can evaluate shards of, by key. An entry
+# lasts as long as its database does.
+_DATABASES = weakref.WeakValueDictionary()
+
+
+def can_fork():
+    """Return whether worker processes can be forked on this platform."""
+    return 'fork' in multiprocessing.get_all_start_methods()
+
+
+class ShardedExecutor:
+    """A pool of forked processes that evaluate filters on shards of the approaches of one database."""
+
+    def __init__(self, database, workers, shard_size=SHARD_SIZE):
+        """Create a new `ShardedExecutor`. The processes are started when first needed.
+
+        :param database: An `NEODatabase`.
+        :param workers: The number of worker processes.
+        :param shard_size: The number of candidate rows in each shard.
+        """
+        self.workers = workers
+        self.shard_size = shard_size
+        self._key = id(database)
+        # Register the database before any worker is forked, so that every worker inherits it.
+        _DATABASES[self._key] = database
+        self.parallel = workers > 1 and can_fork()
+        self._pool = None
+        self._version = None
+
+    def __enter__(self):
+        """Use this executor in a `with` statement, which shuts it down at the end."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Shut this executor down."""
+        self.shutdown()
+
+    def _workers(self):
+        """Return the pool of processes, forking it again if the approaches have changed since it was forked."""
+        version = _DATABASES[self._key]._table.version
+        if self._pool is not None and self._version != version:
+            self._pool.shutdown()
+            self._pool = None
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('fork'))
+            self._version = version
+        return self._pool
+
+    def matching_rows(self, rows, filters):
+        """Find the candidate rows that match a collection of filters, shard by shard.
+
+        :param rows: A sequence of candidate row numbers, in internal order.
+        :param filters: A list of filters, to be evaluated on each candidate.
+        :yield: The matching row numbers of each shard, as an `array`, in internal order.
+        """
+        shards = (rows[start:start + self.shard_size] for start in range(0, len(rows), self.shard_size))
+        if not self.parallel:
+            for shard in shards:
+                yield _matching_rows(self._key, shard, filters)
+            return
+
+        pool = self._workers()
+        pending = deque()
+        try:
+            for shard in shards:
+                pending.append(pool.submit(_matching_rows, self._key, shard, filters))
+                if len(pending) >= 2 * self.workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            # If the consumer stopped early, don't evaluate the shards it won't read.
+            for future in pending:
+                future.cancel()
+
+    def shutdown(self):
+        """Stop the worker processes, and forget the database."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        self.parallel = False
+        _DATABASES.pop(self._key, None)
+
+
+def _matching_rows(key, rows, filters):
+    """Find the rows of a shard that match a collection of filters, in a worker.
+
+    :param key: The key of the database in `_DATABASES`.
+    :param rows: A sequence of row numbers.
+    :param filters: A list of filters.
+    :return: An `array` of the matching row numbers.
+    """
+    database = _DATABASES[key]
+    rows, filters = database._vectorized_rows(rows, filters)
+    if not filters:
+        return array('l', rows)
+    approaches = database._approaches
+    predicate = compile_filters(filters)
+    return array('l', [row for row in rows if predicate(approaches[row])])
@@ -0,0 +1,170 @@
+"""Save and restore an already-linked `NEODatabase` to skip re-parsing the data files.
+
+Parsing `neos.csv` and `cad.json` and linking the results together is by far the
+slowest part of every invocation of the main module. A snapshot is a single
+binary file that holds a pickled `NEODatabase` together with a signature of the
+data files it was built from.
+
+A signature records the size, the modification time and a SHA-256 hash of the
+contents of each data file. A snapshot is valid if every data file still has
+the recorded size and either the recorded modification time or, failing that,
+the recorded contents. So an unchanged file is accepted without being read,
+and a file that has been touched but not modified doesn't force a rebuild.
+
+The `load_database` function is what the main module uses: it loads the
+snapshot if it's valid and otherwise extracts the data files, builds a fresh
+`NEODatabase` and rewrites the snapshot. The close approaches are loaded into an
+`ApproachTable`, whose columns are also what makes the snapshot compact, and
+every index of the database is built before it is saved.
+"""
+import hashlib
+import os
+import pickle
+import sys
+
+from database import NEODatabase
+from extract import load_neos, load_approach_table
+
+
+# Written at the start of every snapshot file. Bump the version whenever the
+# pickled classes change in a way that would make older snapshots unusable.
+MAGIC = b'NEODB-SNAPSHOT\x00'
+VERSION = 15
+
+# The keys of a signature, as returned by `file_signature`.
+_SIGNATURE_KEYS = {'size', 'mtime_ns', 'sha256'}
+
+
+def file_signature(path, digest=True):
+    """Describe the current state of a data file.
+
+    :param path: A path to a data file.
+    :param digest: Whether to hash the contents of the file.
+    :return: A dictionary with the size, modification time and (optionally) SHA-256 of the file.
+    """
+    stat = os.stat(path)
+    signature = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': None}
+    if digest:
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha.update(block)
+        signature['sha256'] = sha.hexdigest()
+    return signature
+
+
+def is_fresh(recorded, path):
+    """Check whether a data file still matches the signature recorded for it.
+
+    :param recorded: A signature produced by `file_signature`.
+    :param path: A path to the data file.
+    :return: Whether the data file is unchanged.
+    """
+    try:
+        current = file_signature(path, digest=False)
+    except OSError:
+        return False
+    if current['size'] != recorded['size']:
+        return False
+    if current['mtime_ns'] == recorded['mtime_ns']:
+        return True
+    return file_signature(path)['sha256'] == recorded['sha256']
+
+
+def save_snapshot(database, snapshot_path, neo_csv_path, cad_json_path):
+    """Write a snapshot of a database built from the given data files.
+
+    The snapshot is written to a temporary file first and then moved into place,
+    so a concurrent reader never sees a half-written snapshot.
+
+    :param database: The `NEODatabase` to save.
+    :param snapshot_path: A path to the snapshot file.
+    :param neo_csv_path: The CSV file of NEOs that the database was built from.
+    :param cad_json_path: The JSON file of close approaches that the database was built from.
+    """
+    sources = {
+        'neos': file_signature(neo_csv_path),
+        'approaches': file_signature(cad_json_path),
+    }
+    tmp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as out_file:
+            out_file.write(MAGIC)
+            pickle.dump((VERSION, sources), out_file, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(database, out_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, snapshot_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_snapshot(snapshot_path, neo_csv_path, cad_json_path):
+    """Read a snapshot, if it's valid for the given data files.
+
+    :param snapshot_path: A path to the snapshot file.
+    :param neo_csv_path: The CSV file of NEOs that the database should be built from.
+    :param cad_json_path: The JSON file of close approaches that the database should be built from.
+    :return: The saved `NEODatabase`, or `None` if the snapshot is missing or stale.
+    """
+    try:
+        with open(snapshot_path, 'rb') as in_file:
+            if in_file.read(len(MAGIC)) != MAGIC:
+                return None
+            header = pickle.load(in_file)
+            if not _is_current_header(header):
+                return None
+            version, sources = header
+            if not (is_fresh(sources['neos'], neo_csv_path)
+                    and is_fresh(sources['approaches'], cad_json_path)):
+                return None
+            return pickle.load(in_file)
+    except FileNotFoundError:
+        return None
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError,
+            ValueError, TypeError, KeyError, IndexError) as err:
+        print(f"Ignoring unreadable snapshot {snapshot_path}: {err}", file=sys.stderr)
+        return None
+
+
+def _is_current_header(header):
+    """Check that the header of a snapshot is a `(VERSION, sources)` pair, as written by `save_snapshot`.
+
+    :param header: The first object unpickled from a snapshot file.
+    :return: Whether the header has the current version, and a signature of each data file.
+    """
+    if not (isinstance(header, tuple) and len(header) == 2):
+        return False
+    version, sources = header
+    if version != VERSION or not isinstance(sources, dict):
+        return False
+    return all(isinstance(sources.get(name), dict) and _SIGNATURE_KEYS <= sources[name].keys()
+               for name in ('neos', 'approaches'))
+
+
+def load_database(neo_csv_path, cad_json_path, snapshot_path=None, workers=None):
+    """Build an `NEODatabase`, going through a snapshot when possible.
+
+    If `snapshot_path` is None, always extract the data files. Otherwise use the
+    snapshot if it's valid, and rebuild it if it's missing or stale. Failing to
+    write the snapshot isn't an error - the database is still returned.
+
+    :param neo_csv_path: A path to a CSV file containing data about near-Earth objects.
+    :param cad_json_path: A path to a JSON file containing data about close approaches.
+    :param snapshot_path: A path to the snapshot file, or None.
+    :param workers: The number of processes used to load close approaches.
+    :return: A linked `NEODatabase`.
+    """
+    if snapshot_path is not None:
+        database = load_snapshot(snapshot_path, neo_csv_path, cad_json_path)
+        if database is not None:
+            return database
+
+    database = NEODatabase(load_neos(neo_csv_path), load_approach_table(cad_json_path, workers))
+
+    if snapshot_path is not None:
+        database.build_indexes()
+        try:
+            save_snapshot(database, snapshot_path, neo_csv_path, cad_json_path)
+        except OSError as err:
+            print(f"Could not write snapshot {snapshot_path}: {err}", file=sys.stderr)
+    return database
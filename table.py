@@ -0,0 +1,264 @@
+"""Store close approaches column by column, in compact typed arrays.
+
+An `ApproachTable` keeps one row per close approach, split across parallel
+columns (a "struct of arrays"): the approach time in minutes (see
+`helpers.datetime_to_minutes`), the distance, the velocity and the index of the
+approaching NEO in the table's list of NEOs. Each column is an `array.array`,
+so a row takes a few dozen bytes instead of a full Python object with a
+`__dict__`, a `datetime` and three floats.
+
+A table is also a sequence of `ApproachView`s: lightweight, `CloseApproach`
+compatible objects that are only created when a row is actually requested, and
+that read their attributes from the table's columns. An `ApproachList` is a
+sequence of views for a subset of rows, such as the approaches of one NEO.
+
+The `extract.load_approach_table` function builds a table straight from a JSON
+file, and an `NEODatabase` built from a table links it to the NEOs with `link`.
+An `NEODatabase` built from `CloseApproach` objects also keeps a table of them,
+built with `from_approaches`, to help speed up queries.
+"""
+from array import array
+from collections.abc import Sequence
+from itertools import repeat
+
+from helpers import minutes_to_datetime
+from models import CloseApproach
+
+
+# The value of a missing time in the `minutes` column, and of a missing NEO in
+# the `neo_indexes` column.
+NO_TIME = -1
+NO_NEO = -1
+
+
+class ApproachTable(Sequence):
+    """A table of close approaches, with one typed array per attribute.
+
+    Rows are appended with `append` (or `extend`) while the designations of the
+    approaching NEOs are still strings. Linking the table to a collection of
+    NEOs with `link` replaces those designations with indexes into `self.neos`.
+    """
+
+    def __init__(self):
+        """Create a new, empty `ApproachTable`."""
+        self.minutes = array('q')
+        self.distances = array('d')
+        self.velocities = array('d')
+        self.neo_indexes = array('l')
+        self.neos = []
+        # Designations of each row until the table is linked; afterwards, only
+        # the designations of rows without a known NEO, by row.
+        self._designations = []
+        self._unlinked = {}
+        # Incremented whenever the rows change, so that cached results can tell they are stale.
+        self.version = 0
+
+    @classmethod
+    def from_approaches(cls, approaches, neos=()):
+        """Build a table holding the same data as a collection of `CloseApproach`es.
+
+        :param approaches: A collection of `CloseApproach`es.
+        :param neos: A collection of `NearEarthObject`s, to link the table to.
+        :return: A new `ApproachTable`, linked to `neos`.
+        """
+        table = cls()
+        for approach in approaches:
+            table.append(approach._designation, approach.time_minutes, approach.distance, approach.velocity)
+        table.link(neos, attach=False)
+        return table
+
+    def append(self, designation, minutes, distance, velocity):
+        """Append a close approach to this table.
+
+        :param designation: The primary designation of the approaching NEO.
+        :param minutes: The approach time, in minutes (or None).
+        :param distance: The nominal approach distance, in astronomical units.
+        :param velocity: The relative approach velocity, in kilometers per second.
+        """
+        self.version += 1
+        self._designations.append(designation)
+        self.minutes.append(NO_TIME if minutes is None else minutes)
+        self.distances.append(distance)
+        self.velocities.append(velocity)
+
+    def extend(self, designations, minutes, distances, velocities):
+        """Append whole columns of close approaches to this table.
+
+        :param designations: A list of primary designations.
+        :param minutes: An `array('q')` of approach times, in minutes.
+        :param distances: An `array('d')` of approach distances.
+        :param velocities: An `array('d')` of approach velocities.
+        """
+        self.version += 1
+        self._designations.extend(designations)
+        self.minutes.extend(minutes)
+        self.distances.extend(distances)
+        self.velocities.extend(velocities)
+
+    def link(self, neos, attach=True):
+        """Resolve the designation of each row to an index into a collection of NEOs.
+
+        If `attach` is true, the `.approaches` attribute of each NEO is also set
+        to an `ApproachList` of its rows of this table, sorted by time.
+
+        :param neos: A collection of `NearEarthObject`s.
+        :param attach: Whether to attach the rows of this table to the NEOs.
+        """
+        self.version += 1
+        self.neos = list(neos)
+        index_of = {neo.designation: index for index, neo in enumerate(self.neos)}
+        if self._designations:
+            self.neo_indexes = array('l', (index_of.get(d, NO_NEO) for d in self._designations))
+            self._unlinked = {row: designation for row, designation in enumerate(self._designations)
+                              if self.neo_indexes[row] == NO_NEO}
+            self._designations = []
+
+        if attach:
+            # Distribute the rows to their NEOs in time order, so that each NEO's rows are sorted by time.
+            rows_of = [array('l') for _ in self.neos]
+            for row in self.time_order():
+                index = self.neo_indexes[row]
+                if index != NO_NEO:
+                    rows_of[index].append(row)
+            for neo, rows in zip(self.neos, rows_of):
+                neo.approaches = ApproachList(self, rows)
+
+    def time_order(self):
+        """Return the row numbers sorted by time (rows without a time first), keeping ties in row order."""
+        minutes = self.minutes
+        if all(minutes[row] <= minutes[row + 1] for row in range(len(minutes) - 1)):
+            return range(len(minutes))
+        return sorted(range(len(minutes)), key=minutes.__getitem__)
+
+    def designation(self, row):
+        """Return the primary designation of the NEO of a row."""
+        if self._designations:
+            return self._designations[row]
+        index = self.neo_indexes[row]
+        if index == NO_NEO:
+            return self._unlinked.get(row)
+        return self.neos[index].designation
+
+    def __len__(self):
+        """Return `len(self)`, the number of rows."""
+        return len(self.minutes)
+
+    def __getitem__(self, row):
+        """Return `self[row]`, an `ApproachView` of a row (or a list of views, for a slice)."""
+        if isinstance(row, slice):
+            return [ApproachView(self, i) for i in range(*row.indices(len(self)))]
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError('ApproachTable index out of range')
+        return ApproachView(self, row)
+
+    def __iter__(self):
+        """Return `iter(self)`, generating a view of each row in order."""
+        return map(ApproachView, repeat(self), range(len(self)))
+
+
+class ApproachList(Sequence):
+    """A sequence of the `ApproachView`s of some rows of an `ApproachTable`."""
+
+    __slots__ = ('table', 'rows')
+
+    def __init__(self, table, rows):
+        """Create a new `ApproachList`.
+
+        :param table: The `ApproachTable` holding the rows.
+        :param rows: An `array('l')` of row numbers.
+        """
+        self.table = table
+        self.rows = rows
+
+    def __len__(self):
+        """Return `len(self)`."""
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        """Return `self[index]`, a view of the `index`-th row of this list."""
+        if isinstance(index, slice):
+            return [ApproachView(self.table, row) for row in self.rows[index]]
+        return ApproachView(self.table, self.rows[index])
+
+    def __iter__(self):
+        """Return `iter(self)`."""
+        table = self.table
+        return (ApproachView(table, row) for row in self.rows)
+
+    def __repr__(self):
+        """Return `repr(self)`."""
+        return f"ApproachList({list(self)!r})"
+
+
+class ApproachView(CloseApproach):
+    """A `CloseApproach` whose attributes are read from a row of an `ApproachTable`.
+
+    A view stores nothing but its table and row number. Two views are equal if
+    they are views of the same row of the same table.
+    """
+
+    __slots__ = ('_table', '_row')
+
+    def __init__(self, table, row):
+        """Create a new `ApproachView`.
+
+        :param table: The `ApproachTable` holding the data.
+        :param row: The row number of this close approach.
+        """
+        self._table = table
+        self._row = row
+
+    @property
+    def _designation(self):
+        """Return the primary designation of the NEO of this close approach."""
+        return self._table.designation(self._row)
+
+    @property
+    def time(self):
+        """Return the approach time, as a naive `datetime`."""
+        minutes = self._table.minutes[self._row]
+        return None if minutes == NO_TIME else minutes_to_datetime(minutes)
+
+    @property
+    def time_minutes(self):
+        """Return the approach time, in minutes."""
+        minutes = self._table.minutes[self._row]
+        return None if minutes == NO_TIME else minutes
+
+    @property
+    def day_ordinal(self):
+        """Return the ordinal of the approach date."""
+        minutes = self._table.minutes[self._row]
+        return None if minutes == NO_TIME else minutes // 1440
+
+    @property
+    def distance(self):
+        """Return the nominal approach distance, in astronomical units."""
+        return self._table.distances[self._row]
+
+    @property
+    def velocity(self):
+        """Return the relative approach velocity, in kilometers per second."""
+        return self._table.velocities[self._row]
+
+    @property
+    def neo(self):
+        """Return the approaching `NearEarthObject`, or None if it is unknown."""
+        index = self._table.neo_indexes[self._row] if self._table.neo_indexes else NO_NEO
+        return None if index == NO_NEO else self._table.neos[index]
+
+    def __eq__(self, other):
+        """Return `self == other`."""
+        if not isinstance(other, ApproachView):
+            return NotImplemented
+        return self._table is other._table and self._row == other._row
+
+    def __hash__(self):
+        """Return `hash(self)`."""
+        return hash((id(self._table), self._row))
+
+    def __reduce__(self):
+        """Pickle a view as its table and row number."""
+        return ApproachView, (self._table, self._row)
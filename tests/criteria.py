@@ -0,0 +1,24 @@
+"""Make random criteria for the tests that compare queries against scans of the close approaches."""
+import datetime
+
+
+def random_criteria(rng):
+    """Make a random combination of arguments to `create_filters`."""
+    criteria = {}
+    day = datetime.date(2020, 1, 1) + datetime.timedelta(days=rng.randint(-10, 375))
+    choice = rng.random()
+    if choice < 0.2:
+        criteria['date'] = day
+    elif choice < 0.6:
+        if rng.random() < 0.7:
+            criteria['start_date'] = day
+        if rng.random() < 0.7:
+            criteria['end_date'] = day + datetime.timedelta(days=rng.randint(-30, 200))
+    for name, scale in (('distance', 0.5), ('velocity', 40.0), ('diameter', 3.0)):
+        if rng.random() < 0.4:
+            criteria[f'{name}_min'] = round(rng.random() * scale, 3)
+        if rng.random() < 0.4:
+            criteria[f'{name}_max'] = round(rng.random() * scale, 3) + 0.001
+    if rng.random() < 0.3:
+        criteria['hazardous'] = rng.random() < 0.5
+    return criteria
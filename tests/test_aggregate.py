@@ -0,0 +1,137 @@
+"""Check that aggregations summarize exactly the close approaches that a query generates.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_aggregate
+"""
+import datetime
+import math
+import pathlib
+import random
+import unittest
+
+from aggregate import METRICS, group_totals, merge_totals, summarize
+from database import NEODatabase
+from extract import load_neos, load_approaches, load_approach_table
+from filters import create_filters
+import vectorized
+
+from tests.criteria import random_criteria
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+GROUP_KEYS = {
+    None: lambda approach: None,
+    'year': lambda approach: approach.time.year,
+    'month': lambda approach: approach.time.strftime('%Y-%m'),
+    'neo': lambda approach: approach._designation,
+}
+
+
+def summarize_scan(approaches, group_by):
+    """Summarize a collection of close approaches, one group at a time."""
+    groups = {}
+    for approach in approaches:
+        groups.setdefault(GROUP_KEYS[group_by](approach), []).append(approach)
+    summary = {}
+    for group in sorted(groups):
+        summary[group] = {'count': len(groups[group])}
+        for attribute in ('distance', 'velocity'):
+            # Unknown (NaN) values are left out of every metric but the count.
+            values = [getattr(approach, attribute) for approach in groups[group]]
+            values = [value for value in values if value == value]
+            summary[group].update({
+                f'min_{attribute}': min(values) if values else None,
+                f'mean_{attribute}': sum(values) / len(values) if values else None,
+                f'max_{attribute}': max(values) if values else None,
+            })
+    return summary
+
+
+class TestAggregate(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE), vectorize=False)
+        cls.table_db = NEODatabase(load_neos(TEST_NEO_FILE), load_approach_table(TEST_CAD_FILE))
+
+    def assertSummariesEqual(self, received, expected, msg=None):
+        self.assertEqual(list(received), list(expected), msg=msg)
+        for group, metrics in expected.items():
+            for metric, value in metrics.items():
+                self.assertAlmostEqual(received[group][metric], value, places=9, msg=msg)
+
+    def test_aggregations_match_summaries_of_queries(self):
+        rng = random.Random(19)
+        for _ in range(60):
+            criteria = random_criteria(rng)
+            filters = create_filters(**criteria)
+            for database in (self.db, self.table_db):
+                approaches = list(database.query(filters))
+                for group_by in GROUP_KEYS:
+                    expected = summarize_scan(approaches, group_by)
+                    received = database.aggregate(filters, group_by, METRICS)
+                    if group_by is None:
+                        received = {None: received} if received['count'] else {}
+                    self.assertSummariesEqual(received, expected, msg=f"{criteria} by {group_by}")
+
+    def test_empty_aggregations(self):
+        filters = create_filters(distance_min=0.3, distance_max=0.1)
+        self.assertEqual(self.db.aggregate(filters, metrics=['count', 'mean_velocity']),
+                         {'count': 0, 'mean_velocity': None})
+        self.assertEqual(self.db.aggregate(filters, 'year'), {})
+
+    def test_rows_without_a_time_or_an_neo_are_grouped_apart(self):
+        table = load_approach_table(TEST_CAD_FILE)
+        table.append('NOT-AN-NEO', None, 0.25, 12.5)
+        database = NEODatabase(load_neos(TEST_NEO_FILE), table)
+        summary = database.aggregate(group_by='year')
+        self.assertEqual(list(summary)[-1], None)
+        self.assertEqual(summary[None]['count'], 1)
+        self.assertEqual(database.aggregate(group_by='neo')['NOT-AN-NEO']['count'], 1)
+        self.assertEqual(database.aggregate()['count'], len(table))
+
+    def test_unknown_distances_and_velocities_are_left_out(self):
+        databases = []
+        for vectorize in (False, True):
+            table = load_approach_table(TEST_CAD_FILE)
+            first = table.designation(0)
+            for row in range(len(table)):
+                # One NEO has no known distance at all, and many groups start with an unknown velocity.
+                if table.designation(row) == first:
+                    table.distances[row] = math.nan
+                if row % 7 == 0:
+                    table.velocities[row] = math.nan
+            databases.append(NEODatabase(load_neos(TEST_NEO_FILE), table, vectorize=vectorize))
+        # Without a filter, every row is totalled with NumPy (if it's installed); by date, too few rows are.
+        for filters in (create_filters(), create_filters(date=datetime.date(2020, 1, 1))):
+            expected = summarize_scan(databases[0].query(filters), 'neo')
+            self.assertIsNone(expected[first]['min_distance'])
+            for database in databases:
+                self.assertSummariesEqual(database.aggregate(filters, 'neo', METRICS), expected)
+                by_month = database.aggregate(filters, 'month', METRICS)
+                self.assertSummariesEqual(by_month, summarize_scan(databases[0].query(filters), 'month'))
+
+    def test_totals_of_disjoint_rows_merge(self):
+        table = self.db._table
+        rows = range(len(table))
+        totals = merge_totals(group_totals(table, rows[:1000], 'month'), group_totals(table, rows[1000:], 'month'))
+        self.assertSummariesEqual(summarize(totals, METRICS), summarize(group_totals(table, rows, 'month'), METRICS))
+
+    def test_unknown_groupings_and_metrics_are_rejected(self):
+        with self.assertRaises(ValueError):
+            self.db.aggregate(group_by='week')
+        with self.assertRaises(ValueError):
+            self.db.aggregate(metrics=['median_distance'])
+
+    @unittest.skipIf(not vectorized.available(), "NumPy isn't installed")
+    def test_vectorized_totals_match_totals_of_each_row(self):
+        engine = vectorized.VectorizedEngine(self.db)
+        rows = list(range(0, len(self.db._table), 3))
+        for group_by in GROUP_KEYS:
+            totals, left_out = engine.group_totals(rows, group_by)
+            self.assertEqual(left_out, [])
+            expected = summarize(group_totals(self.db._table, rows, group_by), METRICS)
+            self.assertSummariesEqual(summarize(totals, METRICS), expected, msg=group_by)
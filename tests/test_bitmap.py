@@ -0,0 +1,101 @@
+"""Check that bitmaps hold the right rows, and that bitmap scans find the same approaches as a full scan.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_bitmap
+"""
+import datetime
+import pathlib
+import random
+import unittest
+import unittest.mock
+
+from bitmap import bitmap_from_flags, bitmap_from_rows, bitmap_rows, bitmap_span, bitmap_count
+from database import NEODatabase
+from extract import load_neos, load_approaches, load_approach_table
+from filters import create_filters, compile_filters
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+class TestBitmaps(unittest.TestCase):
+    def test_rows_round_trip(self):
+        rows = sorted(random.Random(16).sample(range(1000), 100))
+        bits = bitmap_from_rows(rows, 1000)
+        self.assertEqual(bitmap_rows(bits), rows)
+        self.assertEqual(bitmap_count(bits), 100)
+        self.assertEqual(bitmap_rows(0), [])
+
+    def test_flags(self):
+        flags = [False, True, True, False, False, False, False, False, True]
+        self.assertEqual(bitmap_rows(bitmap_from_flags(flags)), [1, 2, 8])
+
+    def test_span(self):
+        self.assertEqual(bitmap_rows(bitmap_span(3, 7)), [3, 4, 5, 6])
+        self.assertEqual(bitmap_span(7, 3), 0)
+
+
+class TestBitmapIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.approaches = load_approaches(TEST_CAD_FILE)
+        random.Random(16).shuffle(cls.approaches)
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), cls.approaches, vectorize=False)
+        cls.bitmaps = cls.db._bitmaps()
+
+    def test_hazardous_and_known_diameter(self):
+        self.assertEqual(bitmap_rows(self.bitmaps.hazardous),
+                         [row for row, approach in enumerate(self.approaches) if approach.neo.hazardous])
+        self.assertEqual(bitmap_rows(self.bitmaps.diameter_known),
+                         [row for row, approach in enumerate(self.approaches)
+                          if approach.neo.diameter == approach.neo.diameter])
+
+    def test_years(self):
+        rows = [row for row, approach in enumerate(self.approaches) if approach.time.year == 2020]
+        self.assertEqual(bitmap_rows(self.bitmaps.years[2020]), rows)
+
+        new_year = datetime.date(2020, 1, 1).toordinal() * 1440
+        bits, exact = self.bitmaps.years_between(lo=new_year)
+        self.assertTrue(exact)
+        self.assertEqual(bitmap_rows(bits), sorted(bitmap_rows(bits)))
+        bits, exact = self.bitmaps.years_between(lo=new_year + 1440)
+        self.assertFalse(exact)
+        self.assertEqual(bitmap_count(bits), bitmap_count(self.bitmaps.years_between(lo=new_year)[0]))
+
+    def test_bitmap_scans_match_full_scans(self):
+        for criteria in ({'hazardous': True}, {'hazardous': False, 'start_date': datetime.date(2020, 2, 1)},
+                         {'hazardous': True, 'start_date': datetime.date(2020, 1, 1)},
+                         {'diameter_max': 0.5, 'hazardous': True, 'end_date': datetime.date(2020, 7, 1)},
+                         {'hazardous': True, 'end_date': datetime.date(2020, 7, 1)}):
+            filters = create_filters(**criteria)
+            expected = [approach for approach in self.approaches if all(f(approach) for f in filters)]
+            self.assertEqual(list(self.db.query(filters)), expected, msg=criteria)
+            # A neo scan may answer the same criteria: rule it out, so that the bitmap scan is used.
+            with unittest.mock.patch.object(self.db._planner, '_neo_cost', return_value=float('inf')):
+                self.assertTrue(self.db.explain(filters).strategy.startswith('bitmap scan'), msg=criteria)
+                self.assertEqual(list(self.db.query(filters)), expected, msg=criteria)
+
+    def test_approaches_without_a_known_neo_are_neither_hazardous_nor_not(self):
+        table = load_approach_table(TEST_CAD_FILE)
+        table.append('NOT-AN-NEO', None, 0.25, 12.5)
+        table.append('NOT-AN-NEO', None, 0.35, 8.5)
+        for vectorize in (False, True):
+            db = NEODatabase(load_neos(TEST_NEO_FILE), table, vectorize=vectorize)
+            approaches = list(db.query())
+            for hazardous in (False, True):
+                filters = create_filters(hazardous=hazardous)
+                expected = [approach for approach in approaches
+                            if approach.neo is not None and approach.neo.hazardous == hazardous]
+                self.assertEqual(list(filter(compile_filters(filters), approaches)), expected)
+                self.assertEqual(list(db.query(filters)), expected, msg=db.explain(filters))
+                if not vectorize:
+                    with unittest.mock.patch.object(db._planner, '_neo_cost', return_value=float('inf')):
+                        self.assertTrue(db.explain(filters).strategy.startswith('bitmap scan'))
+                        self.assertEqual(list(db.query(filters)), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+"""Check that the query cache returns the same results as uncached queries, and stays bounded.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_cache
+"""
+import contextlib
+import datetime
+import io
+import pathlib
+import unittest
+
+from cache import QueryCache, cache_key
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from filters import create_filters
+import main
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+class TestQueryCache(unittest.TestCase):
+    def test_keys_ignore_the_order_of_filters(self):
+        filters = create_filters(distance_max=0.1, velocity_min=10, hazardous=True)
+        self.assertEqual(cache_key(filters), cache_key(reversed(filters)))
+        self.assertNotEqual(cache_key(filters), cache_key(create_filters(distance_max=0.2, velocity_min=10)))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = QueryCache(max_bytes=2000)
+        cache.get('a', 0)
+        cache.put('a', 0, range(100))
+        cache.put('b', 0, range(100))
+        self.assertIsNotNone(cache.get('a', 0))
+        cache.put('c', 0, range(100))
+        self.assertIsNone(cache.get('b', 0))
+        self.assertEqual(list(cache.get('a', 0)), list(range(100)))
+        self.assertEqual(cache.evictions, 1)
+        self.assertLessEqual(cache.bytes, cache.max_bytes)
+
+    def test_results_larger_than_the_cache_are_not_cached(self):
+        cache = QueryCache(max_bytes=100)
+        cache.get('a', 0)
+        self.assertEqual(list(cache.put('a', 0, range(1000))), list(range(1000)))
+        self.assertEqual(len(cache), 0)
+
+    def test_new_versions_of_the_data_empty_the_cache(self):
+        cache = QueryCache()
+        cache.get('a', 0)
+        cache.put('a', 0, [1, 2, 3])
+        self.assertIsNone(cache.get('a', 1))
+        self.assertEqual(len(cache), 0)
+
+
+class TestCachedQuery(unittest.TestCase):
+    def setUp(self):
+        self.db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+        self.cache = self.db.enable_query_cache()
+
+    def test_repeated_queries_hit_the_cache(self):
+        filters = create_filters(start_date=datetime.date(2020, 3, 1), distance_max=0.1, hazardous=False)
+        first = list(self.db.query(filters))
+        second = list(self.db.query(create_filters(hazardous=False, distance_max=0.1,
+                                                   start_date=datetime.date(2020, 3, 1))))
+        self.assertEqual(first, second)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_cached_results_match_uncached_results(self):
+        uncached = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+        for criteria in ({}, {'date': datetime.date(2020, 3, 2)}, {'velocity_min': 20, 'diameter_max': 0.5},
+                         {'distance_min': 0.3, 'distance_max': 0.1}):
+            expected = [str(approach) for approach in uncached.query(create_filters(**criteria))]
+            for _ in range(2):
+                self.assertEqual([str(approach) for approach in self.db.query(create_filters(**criteria))], expected)
+
+    def test_limited_queries_in_the_shell_are_cached(self):
+        shell = main.NEOShell(self.db, *main.make_parser()[1:])
+        outputs = []
+        for _ in range(2):
+            with contextlib.redirect_stdout(io.StringIO()) as output:
+                shell.onecmd('query --date 2020-01-01 --limit 5')
+            outputs.append(output.getvalue())
+        self.assertEqual(len(outputs[0].splitlines()), 5)
+        self.assertEqual(outputs[1], outputs[0])
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_changes_to_the_table_invalidate_the_cache(self):
+        filters = create_filters(distance_max=0.1)
+        list(self.db.query(filters))
+        version = self.db._table.version
+        self.db._table.append('2101', None, 0.01, 1.0)
+        self.assertGreater(self.db._table.version, version)
+        list(self.db.query(filters))
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+"""Check that conjunctions are exactly the largest groups of approaches of different NEOs within a window.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_conjunction
+"""
+import contextlib
+import datetime
+import io
+import pathlib
+import random
+import unittest
+
+from database import NEODatabase
+from extract import load_neos, load_approaches, load_approach_table
+from filters import create_filters
+import main
+from models import time_order
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+def brute_force_conjunctions(approaches, window, min_neos):
+    """Find the largest groups of approaches within a window by comparing every pair of approaches."""
+    approaches = sorted(approaches, key=time_order)
+    groups = []
+    for first in range(len(approaches)):
+        last = max(position for position in range(first, len(approaches))
+                   if approaches[position].time - approaches[first].time <= window)
+        # A group that could take in an earlier approach is part of a larger one.
+        if first > 0 and approaches[last].time - approaches[first - 1].time <= window:
+            continue
+        group = approaches[first:last + 1]
+        if len({approach.neo.designation for approach in group}) >= min_neos:
+            groups.append(group)
+    return groups
+
+
+class TestConjunctions(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.approaches = list(load_approaches(TEST_CAD_FILE))
+        random.Random(25).shuffle(cls.approaches)
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), cls.approaches)
+        cls.table_db = NEODatabase(load_neos(TEST_NEO_FILE), load_approach_table(TEST_CAD_FILE))
+
+    def test_conjunctions_match_a_brute_force_search(self):
+        for criteria, window, min_neos in (({'distance_max': 0.05}, datetime.timedelta(hours=6), 2),
+                                           ({'distance_max': 0.1}, datetime.timedelta(hours=12), 3),
+                                           ({'hazardous': True}, datetime.timedelta(days=2), 2),
+                                           ({'start_date': datetime.date(2020, 5, 1),
+                                             'end_date': datetime.date(2020, 5, 10)}, datetime.timedelta(0), 2)):
+            filters = create_filters(**criteria)
+            for db in (self.db, self.table_db):
+                expected = brute_force_conjunctions(db.query(filters), window, min_neos)
+                self.assertTrue(expected, msg=criteria)
+                self.assertEqual(list(db.conjunctions(window, filters, min_neos)), expected, msg=criteria)
+
+    def test_windows_can_be_numbers_of_days(self):
+        filters = create_filters(distance_max=0.05)
+        self.assertEqual(list(self.db.conjunctions(0.25, filters)),
+                         list(self.db.conjunctions(datetime.timedelta(hours=6), filters)))
+
+    def test_bad_arguments_are_rejected(self):
+        with self.assertRaises(ValueError):
+            self.db.conjunctions(-1)
+        with self.assertRaises(ValueError):
+            self.db.conjunctions(1, min_neos=1)
+
+    def test_bad_arguments_are_rejected_by_the_parser(self):
+        conjunctions_parser = main.make_parser()[4]
+        args = main.NEOShell.parse_arg_with('--within 0 --min-neos 3', conjunctions_parser)
+        self.assertEqual((args.within, args.min_neos), (0.0, 3))
+        for arg in ('--within -1', '--within nan', '--within inf', '--min-neos 1', '--min-neos 2.5'):
+            with contextlib.redirect_stderr(io.StringIO()) as errors:
+                self.assertIsNone(main.NEOShell.parse_arg_with(arg, conjunctions_parser), msg=arg)
+            self.assertIn(arg.split()[0], errors.getvalue(), msg=arg)
+
+
+if __name__ == '__main__':
+    unittest.main()
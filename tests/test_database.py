@@ -54,6 +54,14 @@ class TestDatabase(unittest.TestCase):
                     self.fail(f"{approach} appears in the approaches of multiple NEOs.")
                 seen.add(approach)
 
+    def test_database_construction_shares_designations_with_neos(self):
+        for approach in self.approaches:
+            self.assertIs(approach._designation, approach.neo.designation)
+
+    def test_models_have_no_instance_dict(self):
+        self.assertFalse(hasattr(self.neos[0], '__dict__'))
+        self.assertFalse(hasattr(self.approaches[0], '__dict__'))
+
     def test_get_neo_by_designation(self):
         cerberus = self.db.get_neo_by_designation('1865')
         self.assertIsNotNone(cerberus)
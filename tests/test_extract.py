@@ -11,12 +11,18 @@ To run these tests from the project root, run:
 These tests should pass when Task 2 is complete.
 """
 import collections.abc
+import contextlib
 import datetime
+import io
+import json
 import pathlib
 import math
+import tempfile
 import unittest
+import unittest.mock
 
-from extract import load_neos, load_approaches
+from extract import load_neos, load_approaches, load_approach_table, iter_approaches, _locate_data
+import main
 from models import NearEarthObject, CloseApproach
 
 
@@ -77,6 +83,36 @@ class TestLoadNEOs(unittest.TestCase):
         self.assertEqual(neo.diameter, 0.6)
         self.assertEqual(neo.hazardous, True)
 
+    def test_neos_without_extra_fields_have_no_extras(self):
+        neo = self.neos_by_designation['2101']
+        self.assertEqual(neo.extras, {})
+
+    def test_load_neos_with_extra_fields(self):
+        neos = {neo.designation: neo for neo in load_neos(TEST_NEO_FILE, extra_fields=('H', 'albedo', 'class'))}
+        toro = neos['1685']
+        self.assertEqual(toro.extras, {'H': 14.3, 'albedo': 0.31, 'class': 'APO'})
+        self.assertEqual(toro.name, 'Toro')
+        self.assertEqual(toro.diameter, 3.4)
+
+        no_albedo = neos['2019 SC8']
+        self.assertIsNone(no_albedo.extras['albedo'])
+
+    def test_load_neos_with_unknown_extra_field(self):
+        with self.assertRaises(ValueError):
+            load_neos(TEST_NEO_FILE, extra_fields=('not-a-column',))
+
+    def test_load_neos_with_required_or_repeated_extra_field(self):
+        with self.assertRaises(ValueError):
+            load_neos(TEST_NEO_FILE, extra_fields=('diameter',))
+        with self.assertRaises(ValueError):
+            load_neos(TEST_NEO_FILE, extra_fields=('H', 'H'))
+
+    def test_load_neos_skips_blank_lines(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp) / 'neos.csv'
+            path.write_text(TEST_NEO_FILE.read_text() + '\n\n')
+            self.assertEqual(len(load_neos(path)), len(self.neos))
+
 
 class TestLoadApproaches(unittest.TestCase):
     @classmethod
@@ -107,6 +143,12 @@ class TestLoadApproaches(unittest.TestCase):
         self.assertIsNotNone(approach)
         self.assertIsInstance(approach.time, datetime.datetime)
 
+    def test_approach_time_keys_are_ints(self):
+        for approach in self.approaches:
+            self.assertIsInstance(approach.time_minutes, int)
+            self.assertEqual(approach.day_ordinal, approach.time.date().toordinal())
+            self.assertEqual(approach.time_minutes % 1440, approach.time.hour * 60 + approach.time.minute)
+
     def test_approach_distance_is_float(self):
         approach = self.get_first_approach_or_none()
         self.assertIsNotNone(approach)
@@ -118,5 +160,88 @@ class TestLoadApproaches(unittest.TestCase):
         self.assertIsInstance(approach.velocity, float)
 
 
+class TestIterApproaches(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.approaches = load_approaches(TEST_CAD_FILE)
+
+    @staticmethod
+    def as_tuples(approaches):
+        return [(a._designation, a.time, a.distance, a.velocity) for a in approaches]
+
+    def test_iter_approaches_is_a_lazy_iterator(self):
+        stream = iter_approaches(TEST_CAD_FILE)
+        self.assertIsInstance(stream, collections.abc.Iterator)
+        self.assertIsInstance(next(stream), CloseApproach)
+
+    def test_iter_approaches_matches_load_approaches(self):
+        self.assertEqual(self.as_tuples(iter_approaches(TEST_CAD_FILE)), self.as_tuples(self.approaches))
+
+    def test_iter_approaches_with_fields_before_data(self):
+        with open(TEST_CAD_FILE) as f:
+            document = json.load(f)
+        reordered = {'fields': document['fields'], 'data': document['data']}
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp) / 'cad.json'
+            path.write_text(json.dumps(reordered))
+            received = self.as_tuples(iter_approaches(path))
+        self.assertEqual(received, self.as_tuples(self.approaches))
+
+    def test_load_approaches_with_workers_matches_serial_load(self):
+        received = load_approaches(TEST_CAD_FILE, workers=2)
+        self.assertIsInstance(received, collections.abc.Collection)
+        self.assertEqual(self.as_tuples(received), self.as_tuples(self.approaches))
+
+
+class TestLoadInRanges(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open(TEST_CAD_FILE) as f:
+            cls.document = json.load(f)
+        cls.expected = cls.as_rows(load_approach_table(TEST_CAD_FILE))
+
+    @staticmethod
+    def as_rows(table):
+        return [(table.designation(row), table.minutes[row], table.distances[row], table.velocities[row])
+                for row in range(len(table))]
+
+    def load_in_ranges(self, document, indent=None):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp) / 'cad.json'
+            path.write_text(json.dumps(document, indent=indent))
+            # Small ranges, so that many rows straddle the end of a range.
+            with unittest.mock.patch('extract._BYTES_PER_RANGE', 5000):
+                return self.as_rows(load_approach_table(path, workers=2))
+
+    def test_ranges_match_serial_load_in_any_layout(self):
+        document = self.document
+        self.assertEqual(self.load_in_ranges(document, indent=2), self.expected)
+        self.assertEqual(self.load_in_ranges({'fields': document['fields'], 'data': document['data']}),
+                         self.expected)
+        self.assertEqual(self.load_in_ranges({'signature': document['signature'], 'data': document['data'],
+                                              'count': document['count'], 'fields': document['fields']}),
+                         self.expected)
+        self.assertEqual(self.load_in_ranges({'fields': document['fields'], 'data': []}), [])
+
+    def test_data_is_located_exactly(self):
+        document = {'fields': self.document['fields'], 'data': self.document['data'][:3], 'count': 3}
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp) / 'cad.json'
+            path.write_text(json.dumps(document))
+            fields, start, stop = _locate_data(path)
+            contents = path.read_bytes()
+        self.assertEqual(fields, document['fields'])
+        self.assertEqual(json.loads(contents[start - 1:stop + 1]), document['data'])
+
+    def test_numbers_of_workers_are_checked_by_the_parser(self):
+        parser = main.make_parser()[0]
+        self.assertEqual(parser.parse_args(['--load-workers', '2', 'query']).load_workers, 2)
+        for option in ('--load-workers', '--query-workers'):
+            for workers in ('0', '-2', 'two'):
+                with contextlib.redirect_stderr(io.StringIO()) as errors, self.assertRaises(SystemExit):
+                    parser.parse_args([option, workers, 'query'])
+                self.assertIn(option, errors.getvalue())
+
+
 if __name__ == '__main__':
     unittest.main()
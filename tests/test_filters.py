@@ -0,0 +1,88 @@
+"""Check that compiled filters agree with the filters they are compiled from.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_filters
+"""
+import datetime
+import operator
+import pathlib
+import unittest
+
+from extract import load_neos, load_approaches
+from database import NEODatabase
+from filters import create_filters, compile_filters, AttributeFilter, RangeFilter, DistanceFilter, VelocityFilter
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+class DesignationFilter(AttributeFilter):
+    """A filter without an `expression`, which can't be inlined."""
+
+    @classmethod
+    def get(cls, approach):
+        return approach._designation
+
+
+class TestRangeFilters(unittest.TestCase):
+    def test_bounds_are_merged(self):
+        filters = create_filters(distance_min=0.1, distance_max=0.3, velocity_max=20)
+        self.assertEqual([f.attribute for f in filters], ['distance', 'velocity'])
+        self.assertEqual(filters[0].bounds(), (0.1, 0.3, True, True))
+        self.assertEqual(filters[1].bounds(), (None, 20, True, True))
+
+    def test_dates_are_merged_into_minutes(self):
+        march = datetime.date(2020, 3, 1)
+        filters = create_filters(date=datetime.date(2020, 3, 2), start_date=march, end_date=datetime.date(2020, 3, 31))
+        self.assertEqual(len(filters), 1)
+        self.assertEqual(filters[0].bounds(), ((march.toordinal() + 1) * 1440, (march.toordinal() + 2) * 1440,
+                                               True, False))
+
+    def test_contradictions_are_empty(self):
+        self.assertTrue(create_filters(distance_min=0.3, distance_max=0.1)[0].is_empty())
+        self.assertTrue(create_filters(date=datetime.date(2020, 3, 2), end_date=datetime.date(2020, 3, 1))[0].is_empty())
+        self.assertTrue(RangeFilter('velocity', 5, 5, lo_inclusive=False).is_empty())
+        self.assertFalse(RangeFilter('velocity', 5, 5).is_empty())
+        self.assertFalse(create_filters(start_date=datetime.date(2020, 3, 2), end_date=datetime.date(2020, 3, 2))[0].is_empty())
+
+
+class TestCompileFilters(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.approaches = list(NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE)).query())
+
+    def assertCompiledMatches(self, filters):
+        predicate = compile_filters(filters)
+        for approach in self.approaches:
+            self.assertEqual(bool(predicate(approach)), all(f(approach) for f in filters))
+
+    def test_no_filters(self):
+        self.assertTrue(compile_filters([])(self.approaches[0]))
+
+    def test_criteria(self):
+        self.assertCompiledMatches(create_filters(date=datetime.date(2020, 3, 2)))
+        self.assertCompiledMatches(create_filters(start_date=datetime.date(2020, 3, 1), end_date=datetime.date(2020, 5, 31),
+                                                  distance_min=0.1, distance_max=0.3, velocity_max=20))
+        self.assertCompiledMatches(create_filters(diameter_min=0.1, diameter_max=1.5, hazardous=True))
+        self.assertCompiledMatches(create_filters(hazardous=False))
+
+    def test_strict_and_unpaired_bounds(self):
+        self.assertCompiledMatches([DistanceFilter(operator.lt, 0.2), VelocityFilter(operator.gt, 10),
+                                    DistanceFilter(operator.gt, 0.05), DistanceFilter(operator.le, 0.15)])
+
+    def test_filters_without_expressions_are_called(self):
+        self.assertCompiledMatches([DesignationFilter(operator.eq, '2101'), DistanceFilter(operator.le, 0.3)])
+
+    def test_compiled_code_is_shared_by_equivalent_filters(self):
+        near = compile_filters(create_filters(distance_max=0.1))
+        far = compile_filters(create_filters(distance_max=0.4))
+        self.assertIs(near.__code__, far.__code__)
+        self.assertEqual(sum(map(near, self.approaches)), sum(approach.distance <= 0.1 for approach in self.approaches))
+        self.assertEqual(sum(map(far, self.approaches)), sum(approach.distance <= 0.4 for approach in self.approaches))
+
+
+if __name__ == '__main__':
+    unittest.main()
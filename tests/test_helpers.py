@@ -0,0 +1,55 @@
+"""Check that NASA-formatted calendar dates are converted to and from datetimes.
+
+`cd_to_datetime` must agree with `datetime.strptime` - including the errors it
+raises - and `datetime_to_str` must agree with `datetime.strftime`.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_helpers
+"""
+import datetime
+import unittest
+
+from helpers import cd_to_datetime, datetime_to_str
+
+
+class TestCalendarDates(unittest.TestCase):
+    def assertSameAsStrptime(self, calendar_date):
+        try:
+            expected = datetime.datetime.strptime(calendar_date, "%Y-%b-%d %H:%M")
+        except ValueError as err:
+            with self.assertRaises(ValueError) as context:
+                cd_to_datetime(calendar_date)
+            self.assertEqual(str(context.exception), str(err))
+        else:
+            self.assertEqual(cd_to_datetime(calendar_date), expected)
+
+    def test_cd_to_datetime(self):
+        self.assertEqual(cd_to_datetime('2020-Dec-31 12:00'), datetime.datetime(2020, 12, 31, 12, 0))
+        self.assertEqual(cd_to_datetime('1900-Jan-01 00:11'), datetime.datetime(1900, 1, 1, 0, 11))
+
+    def test_cd_to_datetime_every_month(self):
+        for month in ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'):
+            self.assertSameAsStrptime(f'2020-{month}-15 23:59')
+
+    def test_cd_to_datetime_leap_days(self):
+        self.assertSameAsStrptime('2020-Feb-29 06:30')
+        self.assertSameAsStrptime('2021-Feb-29 06:30')
+        self.assertSameAsStrptime('2100-Feb-29 06:30')
+
+    def test_cd_to_datetime_agrees_with_strptime_on_unusual_input(self):
+        for calendar_date in ('2020-dec-31 12:00', '2020-Dec-1 12:00', '2020-Dec-31 1:00',
+                              '2020-Dec-00 12:00', '2020-Dec-32 12:00', '2020-Dec-31 24:00',
+                              '2020-Dec-31 12:60', '0000-Dec-31 12:00', '2020-Foo-31 12:00',
+                              '2020-Dec-31T12:00', '2020-Dec-31 12:00:00', ''):
+            with self.subTest(calendar_date=calendar_date):
+                self.assertSameAsStrptime(calendar_date)
+
+    def test_datetime_to_str(self):
+        for dt in (datetime.datetime(2020, 12, 31, 12, 0), datetime.datetime(1900, 1, 1, 0, 11, 59),
+                   datetime.datetime(2200, 7, 4, 9, 5)):
+            self.assertEqual(datetime_to_str(dt), datetime.datetime.strftime(dt, "%Y-%m-%d %H:%M"))
+
+
+if __name__ == '__main__':
+    unittest.main()
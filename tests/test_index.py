@@ -0,0 +1,103 @@
+"""Check that sorted indexes find the same rows as a full scan.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_index
+"""
+import datetime
+import pathlib
+import random
+import unittest
+
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from filters import create_filters
+from index import SortedIndex
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+class TestSortedIndex(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(42)
+        self.values = [rng.choice([rng.randint(0, 20) / 2, float('nan')]) for _ in range(500)]
+        self.index = SortedIndex(self.values)
+
+    def rows_between(self, *args, **kwargs):
+        return set(self.index.rows_in(*self.index.span(*args, **kwargs)))
+
+    def test_nan_rows_are_not_indexed(self):
+        self.assertEqual(len(self.index), sum(1 for value in self.values if value == value))
+
+    def test_closed_range(self):
+        expected = {row for row, value in enumerate(self.values) if 2 <= value <= 5}
+        self.assertEqual(self.rows_between(2, 5), expected)
+
+    def test_open_range(self):
+        expected = {row for row, value in enumerate(self.values) if 2 < value < 5}
+        self.assertEqual(self.rows_between(2, 5, lo_inclusive=False, hi_inclusive=False), expected)
+
+    def test_half_open_ranges(self):
+        self.assertEqual(self.rows_between(lo=7), {row for row, value in enumerate(self.values) if value >= 7})
+        self.assertEqual(self.rows_between(hi=3), {row for row, value in enumerate(self.values) if value <= 3})
+
+    def test_empty_range(self):
+        self.assertEqual(self.rows_between(5, 2), set())
+        self.assertEqual(self.rows_between(5, 5, lo_inclusive=False), set())
+
+    def test_sorted_column_is_not_copied(self):
+        index = SortedIndex(sorted(value for value in self.values if value == value))
+        self.assertTrue(index.is_identity())
+        self.assertEqual(list(index.rows_in(*index.span(2, 3))), sorted(index.rows_in(*index.span(2, 3))))
+
+
+class TestIndexedQuery(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Shuffle the approaches so that the internal order isn't chronological.
+        cls.approaches = load_approaches(TEST_CAD_FILE)
+        random.Random(7).shuffle(cls.approaches)
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), cls.approaches)
+
+    def assertQueryMatchesScan(self, **criteria):
+        filters = create_filters(**criteria)
+        expected = [approach for approach in self.approaches if all(f(approach) for f in filters)]
+        self.assertEqual(list(self.db.query(filters)), expected)
+
+    def test_single_day(self):
+        self.assertQueryMatchesScan(date=datetime.date(2020, 3, 2))
+
+    def test_date_ranges(self):
+        self.assertQueryMatchesScan(start_date=datetime.date(2020, 3, 1))
+        self.assertQueryMatchesScan(end_date=datetime.date(2020, 3, 1))
+        self.assertQueryMatchesScan(start_date=datetime.date(2020, 3, 1), end_date=datetime.date(2020, 5, 31))
+        self.assertQueryMatchesScan(start_date=datetime.date(2020, 5, 31), end_date=datetime.date(2020, 3, 1))
+
+    def test_date_with_other_filters(self):
+        self.assertQueryMatchesScan(date=datetime.date(2020, 3, 2), distance_max=0.2, hazardous=False)
+
+    def test_distance_and_velocity_ranges(self):
+        self.assertQueryMatchesScan(distance_max=0.05)
+        self.assertQueryMatchesScan(velocity_min=30)
+        self.assertQueryMatchesScan(distance_min=0.1, distance_max=0.2, velocity_max=10)
+        self.assertQueryMatchesScan(distance_min=0.3, distance_max=0.1)
+
+    def test_diameter_ranges(self):
+        self.assertQueryMatchesScan(diameter_min=1.0)
+        self.assertQueryMatchesScan(diameter_max=0.1, hazardous=True)
+        self.assertQueryMatchesScan(diameter_min=0.5, diameter_max=1.5, velocity_min=15)
+
+    def test_all_indexed_attributes_together(self):
+        self.assertQueryMatchesScan(start_date=datetime.date(2020, 3, 1), end_date=datetime.date(2020, 6, 30),
+                                    distance_max=0.3, velocity_min=10, diameter_min=0.1)
+
+    def test_build_indexes(self):
+        self.db.build_indexes()
+        self.assertQueryMatchesScan(velocity_min=20, diameter_max=2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+"""Check that NEOs are stored once each, and that NEO-level queries match a scan of the NEOs.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_neostore
+"""
+import datetime
+import operator
+import pathlib
+import random
+import types
+import unittest
+
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from filters import create_filters, AttributeFilter
+from models import NearEarthObject
+from neostore import is_neo_filter
+
+from tests.criteria import random_criteria
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+def neo_criteria(rng):
+    """Make a random combination of arguments to `create_filters` on the attributes of NEOs."""
+    criteria = {}
+    if rng.random() < 0.6:
+        criteria['diameter_min'] = round(rng.random() * 3.0, 3)
+    if rng.random() < 0.6:
+        criteria['diameter_max'] = round(rng.random() * 3.0, 3) + 0.001
+    if rng.random() < 0.5:
+        criteria['hazardous'] = rng.random() < 0.5
+    return criteria
+
+
+class TestNEOStore(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.neos = load_neos(TEST_NEO_FILE)
+        cls.neos.append(NearEarthObject(designation='2020 ZZ99', diameter=0.4, hazardous=True))
+        cls.approaches = load_approaches(TEST_CAD_FILE)
+        random.Random(23).shuffle(cls.approaches)
+        cls.db = NEODatabase(cls.neos, cls.approaches, vectorize=False)
+        cls.store = cls.db._neos
+
+    def test_every_neo_is_stored_once(self):
+        self.assertEqual(len(self.store), len(self.neos))
+        self.assertEqual(len({id(neo) for neo in self.store}), len(self.neos))
+        self.assertTrue(any(not neo.approaches for neo in self.store))
+
+    def test_neo_queries_match_a_scan(self):
+        rng = random.Random(23)
+        for _ in range(200):
+            criteria = neo_criteria(rng)
+            filters = create_filters(**criteria)
+            expected = [neo for neo in self.neos if all(f(types.SimpleNamespace(neo=neo)) for f in filters)]
+            self.assertEqual(self.db.query_neos(filters), expected, msg=criteria)
+
+    def test_approach_filters_are_rejected(self):
+        with self.assertRaises(ValueError):
+            self.db.query_neos(create_filters(distance_max=0.1))
+
+    def test_filters_on_neos_are_marked(self):
+        self.assertTrue(all(is_neo_filter(f) for f in create_filters(diameter_min=0.1, hazardous=True)))
+        self.assertFalse(any(is_neo_filter(f) for f in create_filters(date=datetime.date(2020, 1, 1),
+                                                                      distance_max=0.1, velocity_min=1)))
+
+        class NameFilter(AttributeFilter):
+            on_neo = True
+
+            @classmethod
+            def get(cls, approach):
+                return approach.neo.name
+
+        expected = [neo for neo in self.neos if neo.name is not None]
+        self.assertTrue(expected)
+        self.assertEqual(self.db.query_neos([NameFilter(operator.ne, None)]), expected)
+
+    def test_approaches_are_gathered_by_neo(self):
+        positions = self.store.query(create_filters(hazardous=True))
+        expected = [row for row, approach in enumerate(self.approaches) if approach.neo.hazardous]
+        self.assertEqual(self.store.approach_rows(positions), expected)
+        self.assertEqual(self.store.approach_count(positions), len(expected))
+
+    def test_neo_scans_match_full_scans(self):
+        filters = create_filters(diameter_max=0.5, hazardous=True)
+        self.assertTrue(self.db.explain(filters).strategy.startswith('neo scan'))
+        rng = random.Random(23)
+        for criteria in [neo_criteria(rng) for _ in range(50)] + [random_criteria(rng) for _ in range(200)]:
+            filters = create_filters(**criteria)
+            expected = [approach for approach in self.approaches if all(f(approach) for f in filters)]
+            self.assertEqual(list(self.db.query(filters)), expected, msg=criteria)
+
+
+if __name__ == '__main__':
+    unittest.main()
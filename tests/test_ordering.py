@@ -0,0 +1,129 @@
+"""Check that sorted queries return the matches of a brute-force scan, sorted.
+
+Whether the first matches are found with a bounded heap or by walking a sorted
+index, ties stay in internal order and unknown values come last.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_ordering
+"""
+import csv
+import math
+import pathlib
+import random
+import tempfile
+import unittest
+import unittest.mock
+
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from filters import create_filters
+from index import SortedIndex
+import main
+from ordering import top_rows, walk_index
+
+from tests.criteria import random_criteria
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+SORT_KEYS = {
+    'time': lambda approach: approach.time,
+    'distance': lambda approach: approach.distance,
+    'velocity': lambda approach: approach.velocity,
+    'diameter': lambda approach: approach.neo.diameter if approach.neo else math.nan,
+}
+
+
+def sorted_scan(database, filters, sort_by, descending, limit):
+    """Sort the matches of a brute-force scan: known values in order (stably), then unknown values."""
+    key = SORT_KEYS[sort_by]
+    matches = [approach for approach in database._approaches if all(f(approach) for f in filters)]
+    known = sorted((approach for approach in matches if key(approach) == key(approach)), key=key, reverse=descending)
+    unknown = [approach for approach in matches if key(approach) != key(approach)]
+    return (known + unknown)[:limit]
+
+
+class TestTopRows(unittest.TestCase):
+    def test_ties_stay_in_internal_order_and_unknown_values_come_last(self):
+        keys = [3.0, math.nan, 1.0, 3.0, 2.0, math.nan, 1.0]
+        rows = range(len(keys))
+        self.assertEqual(top_rows(rows, keys), [2, 6, 4, 0, 3, 1, 5])
+        self.assertEqual(top_rows(rows, keys, descending=True), [0, 3, 4, 2, 6, 1, 5])
+        self.assertEqual(top_rows(rows, keys, 3), [2, 6, 4])
+        self.assertEqual(top_rows(rows, keys, 3, descending=True), [0, 3, 4])
+        self.assertEqual(top_rows(rows, keys, 6), [2, 6, 4, 0, 3, 1])
+
+    def test_index_walks_match_sorted_rows(self):
+        keys = [3.0, math.nan, 1.0, 3.0, 2.0, math.nan, 1.0]
+        index = SortedIndex(keys)
+        self.assertEqual(list(walk_index(index)), [2, 6, 4, 0, 3])
+        self.assertEqual(list(walk_index(index, descending=True)), [0, 3, 4, 2, 6])
+        self.assertEqual(list(walk_index(index, True, *index.span(1.5, 3.0, True, False))), [4])
+
+
+class TestSortedQueries(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+        # The same data, with every sorted index built so that it can be walked.
+        cls.indexed = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+        cls.indexed.build_indexes()
+
+    def check(self, database, criteria, sort_by, descending, limit):
+        filters = create_filters(**criteria)
+        expected = [str(approach) for approach in sorted_scan(database, filters, sort_by, descending, limit)]
+        received = [str(approach) for approach in database.query_sorted(filters, sort_by, descending, limit)]
+        self.assertEqual(received, expected, msg=f"{criteria} by {sort_by}, descending={descending}, limit={limit}")
+
+    def test_sorted_queries_match_sorted_scans(self):
+        rng = random.Random(18)
+        for _ in range(150):
+            criteria = random_criteria(rng)
+            sort_by = rng.choice(sorted(SORT_KEYS))
+            descending = rng.random() < 0.5
+            limit = rng.choice([None, 1, 5, 50])
+            for database in (self.db, self.indexed):
+                self.check(database, criteria, sort_by, descending, limit)
+
+    def test_unfiltered_queries_walk_the_index(self):
+        for sort_by in SORT_KEYS:
+            for descending in (False, True):
+                self.assertIsNotNone(self.indexed._walk_rows([], sort_by, descending, 5))
+                self.check(self.indexed, {}, sort_by, descending, 5)
+
+    def test_unknown_diameters_come_last_when_walking(self):
+        count = len(self.indexed._approaches)
+        self.check(self.indexed, {}, 'diameter', False, count)
+        self.check(self.indexed, {}, 'diameter', True, count - 1)
+
+    def test_ranges_on_the_sort_attribute_narrow_the_walk(self):
+        for descending in (False, True):
+            self.check(self.indexed, {'distance_min': 0.1, 'distance_max': 0.2}, 'distance', descending, 5)
+            self.check(self.indexed, {'diameter_min': 0.5}, 'diameter', descending, 5)
+            self.check(self.indexed, {'distance_min': 0.3, 'distance_max': 0.1}, 'distance', descending, 5)
+
+    def test_sorted_queries_use_the_query_cache(self):
+        database = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+        cache = database.enable_query_cache()
+        for _ in range(2):
+            self.check(database, {'velocity_min': 20}, 'velocity', True, 5)
+        self.assertEqual(cache.hits, 1)
+
+    def test_limits_of_zero_are_no_limit(self):
+        self.check(self.db, {'velocity_min': 20}, 'distance', False, None)
+        self.assertEqual(self.db.query_sorted([], 'distance', limit=0), self.db.query_sorted([], 'distance'))
+
+        query_parser = main.make_parser()[2]
+        with tempfile.TemporaryDirectory() as directory, unittest.mock.patch('write.out_dir', directory):
+            for sort_by in (None, 'distance'):
+                arguments = ['--limit', '0', '--outfile', f'{sort_by}.csv'] + (['--sort-by', sort_by] if sort_by else [])
+                main.query(self.db, query_parser.parse_args(arguments))
+                with open(pathlib.Path(directory) / f'{sort_by}.csv') as infile:
+                    self.assertEqual(len(list(csv.DictReader(infile))), len(self.db._approaches))
+
+    def test_unknown_attributes_are_rejected(self):
+        with self.assertRaises(ValueError):
+            self.db.query_sorted([], 'name')
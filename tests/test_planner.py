@@ -0,0 +1,138 @@
+"""Check that planned queries produce exactly the results of a brute-force scan.
+
+The planner may pick indexes, intersect their results and reorder filters, but
+none of that should change which close approaches match, nor their order. The
+differential tests compare `query` with a scan over every close approach for
+many randomized combinations of filters.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_planner
+"""
+import datetime
+import pathlib
+import random
+import unittest
+
+from database import NEODatabase
+from extract import load_neos, load_approaches, load_approach_table
+from filters import create_filters, RangeFilter
+from models import NearEarthObject, CloseApproach
+from planner import ColumnStats
+
+from tests.criteria import random_criteria
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+class TestPlannedQueriesMatchScans(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.approaches = load_approaches(TEST_CAD_FILE)
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), cls.approaches)
+
+        # The same data, out of chronological order, and without NumPy.
+        cls.shuffled = list(load_approaches(TEST_CAD_FILE))
+        random.Random(3).shuffle(cls.shuffled)
+        cls.shuffled_db = NEODatabase(load_neos(TEST_NEO_FILE), cls.shuffled, vectorize=False)
+
+        cls.table_db = NEODatabase(load_neos(TEST_NEO_FILE), load_approach_table(TEST_CAD_FILE))
+
+    def assertQueryMatchesScan(self, db, approaches, criteria):
+        filters = create_filters(**criteria)
+        expected = [approach for approach in approaches if all(f(approach) for f in filters)]
+        self.assertEqual(list(db.query(filters)), expected, msg=f"{criteria}: {db.explain(filters)}")
+
+    def test_randomized_filters(self):
+        rng = random.Random(2020)
+        for _ in range(300):
+            criteria = random_criteria(rng)
+            self.assertQueryMatchesScan(self.db, self.approaches, criteria)
+            self.assertQueryMatchesScan(self.shuffled_db, self.shuffled, criteria)
+
+    def test_randomized_filters_on_a_table(self):
+        rng = random.Random(1969)
+        approaches = list(self.table_db.query())
+        for _ in range(100):
+            self.assertQueryMatchesScan(self.table_db, approaches, random_criteria(rng))
+
+
+class TestQueryPlans(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Plans are costed differently when filters are evaluated over NumPy arrays.
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE), vectorize=False)
+
+    def test_no_filters_is_a_full_scan(self):
+        plan = self.db.explain(create_filters())
+        self.assertEqual(plan.strategy, 'full scan')
+        self.assertEqual(len(plan.rows), 4700)
+
+    def test_selective_range_uses_an_index(self):
+        plan = self.db.explain(create_filters(date=datetime.date(2020, 3, 2)))
+        self.assertEqual(plan.strategy, 'index scan on time')
+        self.assertEqual(plan.filters, [])
+
+    def test_unselective_range_is_a_full_scan(self):
+        plan = self.db.explain(create_filters(distance_min=0.0001))
+        self.assertEqual(plan.strategy, 'full scan')
+        self.assertIsInstance(plan.filters[0], RangeFilter)
+        self.assertEqual(plan.filters[0].attribute, 'distance')
+
+    def test_comparable_ranges_are_intersected(self):
+        plan = self.db.explain(create_filters(start_date=datetime.date(2020, 3, 1),
+                                              end_date=datetime.date(2020, 3, 14),
+                                              distance_max=0.01))
+        self.assertEqual(plan.strategy, 'index scan on distance and time')
+        self.assertEqual(plan.filters, [])
+
+    def test_contradictory_filters_scan_nothing(self):
+        plan = self.db.explain(create_filters(distance_min=0.3, distance_max=0.1, hazardous=True))
+        self.assertEqual(plan.strategy, 'empty')
+        self.assertEqual(len(plan.rows), 0)
+        plan = self.db.explain(create_filters(date=datetime.date(2020, 3, 2), start_date=datetime.date(2020, 4, 1)))
+        self.assertEqual(plan.strategy, 'empty')
+
+    def test_selective_filters_are_evaluated_first(self):
+        plan = self.db.explain(create_filters(distance_max=0.45, velocity_min=5))
+        self.assertEqual(plan.strategy, 'full scan')
+        self.assertEqual([f.attribute for f in plan.filters], ['velocity', 'distance'])
+
+    def test_low_cardinality_criteria_combine_bitmaps(self):
+        plan = self.db.explain(create_filters(hazardous=True, start_date=datetime.date(2020, 1, 1)))
+        self.assertEqual(plan.strategy, 'bitmap scan on hazardous and time')
+        self.assertEqual(plan.filters, [])
+        plan = self.db.explain(create_filters(hazardous=False, distance_max=0.45))
+        self.assertEqual(plan.strategy, 'bitmap scan on hazardous')
+        self.assertEqual([type(f) for f in plan.filters], [RangeFilter])
+
+
+class TestColumnStats(unittest.TestCase):
+    def test_selectivity_estimates(self):
+        stats = ColumnStats([float(value) for value in range(10000)] + [float('nan')] * 10000)
+        self.assertEqual(stats.min, 0.0)
+        self.assertEqual(stats.max, 9999.0)
+        self.assertAlmostEqual(stats.selectivity(), 0.5, places=2)
+        self.assertAlmostEqual(stats.selectivity(0, 4999), 0.25, places=2)
+        self.assertEqual(stats.selectivity(lo=10000), 0.0)
+        self.assertGreater(stats.selectivity(100.2, 100.4), 0.0)
+
+    def test_missing_values_are_not_counted(self):
+        stats = ColumnStats([None, 1.0, float('nan'), 3.0])
+        self.assertEqual((stats.min, stats.max, stats.present), (1.0, 3.0, 2))
+        self.assertEqual(ColumnStats([None, None]).selectivity(), 0.0)
+
+    def test_neos_without_a_diameter_attribute(self):
+        neos = [NearEarthObject(designation=designation, hazardous=False) for designation in ('2020 AB', '2020 AC')]
+        approaches = [CloseApproach(designation=neo.designation, time='2020-Jan-01 00:00', distance=0.1, velocity=5.0)
+                      for neo in neos]
+        db = NEODatabase(neos, approaches)
+        self.assertEqual(list(db.query()), approaches)
+        self.assertEqual(list(db.query(create_filters(distance_max=0.2, hazardous=False))), approaches)
+
+
+if __name__ == '__main__':
+    unittest.main()
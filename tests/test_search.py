@@ -0,0 +1,133 @@
+"""Check that NEOs can be found by approximate names, and by designations in any of their usual forms.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_search
+"""
+import pathlib
+import random
+import unittest
+
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from search import NameIndex, edit_distance, normalize_designation
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+def levenshtein(a, b):
+    """Compute the Levenshtein distance between two strings, without any bound."""
+    if not a or not b:
+        return len(a) + len(b)
+    return min(levenshtein(a[1:], b) + 1, levenshtein(a, b[1:]) + 1, levenshtein(a[1:], b[1:]) + (a[0] != b[0]))
+
+
+def misspell(rng, name):
+    """Insert, delete or substitute a random character of a name."""
+    position = rng.randrange(len(name))
+    char = rng.choice('abcdefghijklmnopqrstuvwxyz')
+    edit = rng.randrange(3)
+    if edit == 0:
+        return name[:position] + char + name[position:]
+    if edit == 1:
+        return name[:position] + name[position + 1:]
+    return name[:position] + char + name[position + 1:]
+
+
+class TestEditDistance(unittest.TestCase):
+    def test_bounded_distances_match_unbounded_distances(self):
+        rng = random.Random(20)
+        for _ in range(300):
+            a = ''.join(rng.choice('abc') for _ in range(rng.randrange(6)))
+            b = ''.join(rng.choice('abc') for _ in range(rng.randrange(6)))
+            bound = rng.randrange(4)
+            self.assertEqual(edit_distance(a, b, bound), min(levenshtein(a, b), bound + 1), msg=(a, b, bound))
+
+
+class TestNameIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.neos = load_neos(TEST_NEO_FILE)
+        cls.index = NameIndex(cls.neos)
+        cls.names = sorted(neo.name for neo in cls.neos if neo.name)
+
+    def test_names_match_in_any_case(self):
+        for name in self.names:
+            self.assertIn(name, [neo.name for neo in self.index.exact(name.upper())])
+            self.assertIn(name, [neo.name for neo in self.index.exact(name.lower())])
+        self.assertEqual(self.index.exact('no such name'), [])
+
+    def test_prefixes_match_every_name_that_starts_with_them(self):
+        for name in self.names:
+            for length in range(len(name) + 1):
+                prefix = name[:length].swapcase()
+                expected = [other for other in self.names if other.casefold().startswith(prefix.casefold())]
+                self.assertEqual(sorted(neo.name for neo in self.index.prefix(prefix)), expected)
+        self.assertEqual(self.index.complete('lem'), ['Lemmon'])
+
+    def test_fuzzy_matches_are_exactly_the_names_within_the_distance(self):
+        rng = random.Random(20)
+        for _ in range(200):
+            query = misspell(rng, misspell(rng, rng.choice(self.names)))
+            for max_distance in (0, 1, 2):
+                expected = sorted(name for name in self.names
+                                  if edit_distance(query.casefold(), name.casefold(), max_distance) <= max_distance)
+                received = sorted(neo.name for neo in self.index.fuzzy(query, max_distance))
+                self.assertEqual(received, expected, msg=(query, max_distance))
+
+    def test_find_prefers_exact_names_then_prefixes_then_close_names(self):
+        self.assertEqual([neo.name for neo in self.index.find('LEMMON')], ['Lemmon'])
+        self.assertEqual([neo.name for neo in self.index.find('Lemm')], ['Lemmon'])
+        self.assertEqual([neo.name for neo in self.index.find('Lemnon')], ['Lemmon'])
+        self.assertEqual(self.index.find('Lemnon', max_distance=0), [])
+
+
+class TestFindNEOsByName(unittest.TestCase):
+    def test_database_finds_neos_by_approximate_names(self):
+        db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+        self.assertIsNone(db.get_neo_by_name('lemmon'))
+        self.assertEqual(db.find_neos_by_name('lemmon'), [db.get_neo_by_name('Lemmon')])
+        self.assertEqual(db.find_neos_by_name('Jormungand'), [db.get_neo_by_name('Jormungandr')])
+        self.assertEqual(db.complete_name('jor'), ['Jormungandr'])
+
+
+class TestDesignations(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+
+    def test_usual_forms_of_designations_have_the_same_canonical_form(self):
+        for forms in (('2020 AB', '2020AB', '2020 ab', ' 2020 AB ', 'K20A00B'),
+                      ('2020 PY1', '2020PY1', 'K20P01Y', '2020 PY01'),
+                      ('1995 XA', 'J95X00A'),
+                      ('2019 AZ383', 'K19Ac3Z'),
+                      ('433', '00433', 'a0000433', '(433)'),
+                      ('100345', 'A0345'),
+                      ('620000', '~0000'),
+                      ('P/2019 LD2', 'p/2019 ld2')):
+            self.assertEqual({normalize_designation(form) for form in forms}, {normalize_designation(forms[0])},
+                             msg=forms)
+        self.assertNotEqual(normalize_designation('2020 AB'), normalize_designation('2020 AB1'))
+
+    def test_neos_are_found_by_any_form_of_their_designation(self):
+        py1_2020 = self.db.get_neo_by_designation('2020 PY1')
+        for form in ('2020PY1', '2020 py1', 'K20P01Y'):
+            self.assertIs(self.db.get_neo_by_designation(form), py1_2020)
+        adonis = self.db.get_neo_by_designation('2101')
+        for form in ('02101', 'a0002101', '(2101)'):
+            self.assertIs(self.db.get_neo_by_designation(form), adonis)
+        self.assertIsNone(self.db.get_neo_by_designation('K20P01Z'))
+
+    def test_many_designations_are_resolved_in_order(self):
+        neos = list(self.db._designations_mapping.values())
+        rng = random.Random(21)
+        designations = [rng.choice(neos).designation for _ in range(500)]
+        designations[::7] = [designation.replace(' ', '').lower() for designation in designations[::7]]
+        designations[::11] = ['not-real-designation'] * len(designations[::11])
+        self.assertEqual(self.db.get_neos_by_designations(designations),
+                         [self.db.get_neo_by_designation(designation) for designation in designations])
+        self.assertEqual(self.db.get_neos_by_designations(iter(['2101', 'K20P01Y'])),
+                         [self.db.get_neo_by_designation('2101'), self.db.get_neo_by_designation('2020 PY1')])
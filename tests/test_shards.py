@@ -0,0 +1,113 @@
+"""Check that queries evaluated on shards of the approaches match those evaluated in one piece.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_shards
+"""
+import datetime
+import gc
+import operator
+import pathlib
+import unittest
+
+from database import NEODatabase
+from extract import load_neos, load_approaches, load_approach_table
+from filters import create_filters, limit, DistanceFilter
+import shards
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+CRITERIA = (
+    {'distance_min': 0.01},
+    {'distance_min': 0.01, 'velocity_max': 25, 'hazardous': False},
+    {'start_date': datetime.date(2020, 2, 1), 'diameter_max': 2.0},
+)
+
+
+class TestShardedQuery(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE), vectorize=False)
+        cls.sharded = NEODatabase(load_neos(TEST_NEO_FILE), load_approach_table(TEST_CAD_FILE), vectorize=False)
+        cls.executor = cls.sharded.enable_parallel_queries(workers=2, shard_size=500)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    def test_shards_match_a_single_scan(self):
+        for criteria in CRITERIA:
+            filters = create_filters(**criteria)
+            expected = [str(approach) for approach in self.db.query(filters)]
+            self.assertEqual([str(approach) for approach in self.sharded.query(filters)], expected)
+
+    def test_attribute_filters_are_sent_to_workers(self):
+        filters = [DistanceFilter(operator.ge, 0.01)]
+        self.assertEqual(len(list(self.sharded.query(filters))), len(list(self.db.query(filters))))
+
+    def test_limit_stops_early(self):
+        filters = create_filters(distance_min=0.01)
+        expected = [str(approach) for approach in limit(self.db.query(filters), 5)]
+        results = self.sharded.query(filters)
+        self.assertEqual([str(approach) for approach in limit(results, 5)], expected)
+        results.close()
+
+    def test_shards_without_processes(self):
+        db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE), vectorize=False)
+        executor = db.enable_parallel_queries(workers=1, shard_size=700)
+        self.assertFalse(executor.parallel)
+        filters = create_filters(velocity_min=5, hazardous=True)
+        expected = [approach for approach in db.query() if all(f(approach) for f in filters)]
+        self.assertEqual(list(db.query(filters)), expected)
+        rows = range(len(db._approaches))
+        self.assertEqual([db._approaches[row] for shard in executor.matching_rows(rows, filters) for row in shard],
+                         expected)
+        executor.shutdown()
+
+    @unittest.skipIf(not shards.can_fork(), "Processes can't be forked on this platform")
+    def test_workers_are_forked(self):
+        list(self.sharded.query(create_filters(distance_min=0.01)))
+        self.assertIsNotNone(self.executor._pool)
+
+    @unittest.skipIf(not shards.can_fork(), "Processes can't be forked on this platform")
+    def test_workers_vectorize_their_shards(self):
+        db = NEODatabase(load_neos(TEST_NEO_FILE), load_approach_table(TEST_CAD_FILE))
+        with db.enable_parallel_queries(workers=2, shard_size=500) as executor:
+            for criteria in CRITERIA:
+                filters = create_filters(**criteria)
+                expected = [str(approach) for approach in self.db.query(filters)]
+                self.assertEqual(db._candidates(filters)[1], db.explain(filters).filters)
+                self.assertEqual([str(approach) for approach in db.query(filters)], expected)
+            self.assertTrue(executor.parallel)
+        self.assertFalse(executor.parallel)
+        self.assertIsNone(executor._pool)
+
+    @unittest.skipIf(not shards.can_fork(), "Processes can't be forked on this platform")
+    def test_workers_are_forked_again_when_the_approaches_change(self):
+        db = NEODatabase(load_neos(TEST_NEO_FILE), load_approach_table(TEST_CAD_FILE), vectorize=False)
+        filters = create_filters(distance_min=0.01)
+        with db.enable_parallel_queries(workers=2, shard_size=500) as executor:
+            list(db.query(filters))
+            pool = executor._pool
+            list(db.query(filters))
+            self.assertIs(executor._pool, pool)
+            db._table.append('2101', None, 0.01, 1.0)
+            list(db.query(filters))
+            self.assertIsNot(executor._pool, pool)
+
+    def test_databases_are_not_kept_alive(self):
+        db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE), vectorize=False)
+        executor = db.enable_parallel_queries(workers=1)
+        key = id(db)
+        self.assertIn(key, shards._DATABASES)
+        del db
+        gc.collect()
+        self.assertNotIn(key, shards._DATABASES)
+        executor.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
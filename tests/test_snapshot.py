@@ -0,0 +1,101 @@
+"""Check that a snapshot of an `NEODatabase` is reused only while the data files are unchanged.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_snapshot
+"""
+import os
+import pathlib
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from snapshot import MAGIC, VERSION, load_database, load_snapshot
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = pathlib.Path(self.tmp.name)
+        self.neo_file = root / 'neos.csv'
+        self.cad_file = root / 'cad.json'
+        self.snapshot = root / 'neodb.snapshot'
+        shutil.copy(TEST_NEO_FILE, self.neo_file)
+        shutil.copy(TEST_CAD_FILE, self.cad_file)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def load_snapshot(self):
+        return load_snapshot(self.snapshot, self.neo_file, self.cad_file)
+
+    def test_load_database_writes_a_snapshot(self):
+        self.assertIsNone(self.load_snapshot())
+        load_database(self.neo_file, self.cad_file, self.snapshot)
+        self.assertTrue(self.snapshot.exists())
+        self.assertIsNotNone(self.load_snapshot())
+
+    def test_snapshot_is_linked(self):
+        load_database(self.neo_file, self.cad_file, self.snapshot)
+        db = self.load_snapshot()
+
+        adonis = db.get_neo_by_name('Adonis')
+        self.assertIs(db.get_neo_by_designation('2101'), adonis)
+        self.assertGreater(len(adonis.approaches), 0)
+        for approach in adonis.approaches:
+            self.assertIs(approach.neo, adonis)
+        self.assertEqual(len(list(db.query())), 4700)
+
+    def test_touched_but_unchanged_file_keeps_the_snapshot(self):
+        load_database(self.neo_file, self.cad_file, self.snapshot)
+        stat = self.cad_file.stat()
+        os.utime(self.cad_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertIsNotNone(self.load_snapshot())
+
+    def test_modified_file_invalidates_the_snapshot(self):
+        load_database(self.neo_file, self.cad_file, self.snapshot)
+        with open(self.neo_file, 'a') as f:
+            f.write('\n')
+        self.assertIsNone(self.load_snapshot())
+
+    def test_stale_snapshot_is_rebuilt(self):
+        load_database(self.neo_file, self.cad_file, self.snapshot)
+        with open(self.neo_file, 'a') as f:
+            f.write('\n')
+        load_database(self.neo_file, self.cad_file, self.snapshot)
+        self.assertIsNotNone(self.load_snapshot())
+
+    def test_corrupt_snapshot_is_ignored(self):
+        self.snapshot.write_bytes(b'not a snapshot')
+        self.assertIsNone(self.load_snapshot())
+        db = load_database(self.neo_file, self.cad_file, self.snapshot)
+        self.assertIsNotNone(db.get_neo_by_designation('2101'))
+
+    def test_snapshot_with_a_malformed_header_is_rebuilt(self):
+        for header in (42, (VERSION,), (VERSION, 'sources'), (VERSION, {}),
+                       (VERSION, {'neos': {}, 'approaches': {}}), [VERSION, {'neos': 1}]):
+            with open(self.snapshot, 'wb') as f:
+                f.write(MAGIC)
+                pickle.dump(header, f)
+            self.assertIsNone(self.load_snapshot(), msg=header)
+            load_database(self.neo_file, self.cad_file, self.snapshot)
+            self.assertIsNotNone(self.load_snapshot(), msg=header)
+
+    def test_truncated_snapshot_is_rebuilt(self):
+        load_database(self.neo_file, self.cad_file, self.snapshot)
+        data = self.snapshot.read_bytes()
+        for size in (len(MAGIC) + 5, len(MAGIC) + 40, len(data) // 2):
+            self.snapshot.write_bytes(data[:size])
+            self.assertIsNone(self.load_snapshot(), msg=size)
+        load_database(self.neo_file, self.cad_file, self.snapshot)
+        self.assertIsNotNone(self.load_snapshot())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+"""Check that an `ApproachTable` holds the same close approaches as `CloseApproach` objects.
+
+An `NEODatabase` built from an `ApproachTable` should behave exactly like one
+built from `CloseApproach` objects: the views it generates should have the same
+attributes, string representations and serializations.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_table
+"""
+import datetime
+import pathlib
+import pickle
+import unittest
+
+from database import NEODatabase
+from extract import load_neos, load_approaches, load_approach_table
+from filters import create_filters
+from models import CloseApproach
+from table import ApproachTable
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+class TestApproachTable(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.approaches = load_approaches(TEST_CAD_FILE)
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), cls.approaches)
+        cls.table = load_approach_table(TEST_CAD_FILE)
+        cls.table_db = NEODatabase(load_neos(TEST_NEO_FILE), cls.table)
+
+    def test_table_contains_all_rows(self):
+        self.assertIsInstance(self.table, ApproachTable)
+        self.assertEqual(len(self.table), 4700)
+        self.assertEqual(len(self.table.minutes), 4700)
+        self.assertEqual(self.table.distances.typecode, 'd')
+
+    def test_table_rows_are_close_approaches(self):
+        view = self.table[0]
+        self.assertIsInstance(view, CloseApproach)
+        self.assertIsInstance(view.time, datetime.datetime)
+        self.assertIsInstance(view.distance, float)
+        self.assertIsInstance(view.velocity, float)
+
+    def test_views_match_objects(self):
+        for view, approach in zip(self.table_db.query(), self.db.query()):
+            self.assertEqual(view._designation, approach._designation)
+            self.assertEqual(view.time, approach.time)
+            self.assertEqual(view.time_minutes, approach.time_minutes)
+            self.assertEqual(view.day_ordinal, approach.day_ordinal)
+            self.assertEqual(view.serialize(), approach.serialize())
+            self.assertEqual(repr(view.neo.serialize()), repr(approach.neo.serialize()))
+            self.assertEqual(str(view), str(approach))
+
+    def test_views_of_the_same_row_are_equal(self):
+        self.assertEqual(self.table[10], self.table[10])
+        self.assertEqual(hash(self.table[10]), hash(self.table[10]))
+        self.assertNotEqual(self.table[10], self.table[11])
+
+    def test_neos_are_linked_to_their_rows(self):
+        adonis = self.table_db.get_neo_by_designation('2101')
+        expected = [str(approach) for approach in self.db.get_neo_by_designation('2101').approaches]
+        self.assertGreater(len(adonis.approaches), 0)
+        self.assertEqual([str(approach) for approach in adonis.approaches], expected)
+        for approach in adonis.approaches:
+            self.assertIs(approach.neo, adonis)
+
+    def test_filters_work_on_views(self):
+        filters = create_filters(start_date=datetime.date(2020, 3, 1), end_date=datetime.date(2020, 5, 31),
+                                 distance_max=0.1, diameter_min=0.1, hazardous=True)
+        expected = [str(approach) for approach in self.db.query(filters)]
+        self.assertGreater(len(expected), 0)
+        self.assertEqual([str(view) for view in self.table_db.query(filters)], expected)
+
+    def test_table_from_approaches(self):
+        table = ApproachTable.from_approaches(self.approaches)
+        self.assertEqual(len(table), len(self.approaches))
+        self.assertEqual(table[5].time, self.approaches[5].time)
+        self.assertEqual(table[5]._designation, self.approaches[5]._designation)
+
+    def test_views_can_be_pickled_with_their_table(self):
+        view, neo = pickle.loads(pickle.dumps((self.table_db._approaches[42], self.table[42].neo)))
+        self.assertEqual(str(view), str(self.table[42]))
+        self.assertIs(view.neo, neo)
+
+
+if __name__ == '__main__':
+    unittest.main()
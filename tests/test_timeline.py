@@ -0,0 +1,164 @@
+"""Check that close approaches can be looked up by time, for each NEO and around given times.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_timeline
+"""
+import contextlib
+import datetime
+import io
+import pathlib
+import random
+import unittest
+import unittest.mock
+
+from database import NEODatabase
+from extract import load_neos, load_approaches, load_approach_table
+from filters import create_filters
+import main
+from models import time_order
+from table import ApproachTable
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+def random_datetimes(rng, count):
+    """Make random datetimes, around the dates of the test data."""
+    start = datetime.datetime(2019, 12, 1)
+    return [start + datetime.timedelta(minutes=rng.randrange(400 * 1440)) for _ in range(count)]
+
+
+class TestTimelines(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        approaches = list(load_approaches(TEST_CAD_FILE))
+        random.Random(22).shuffle(approaches)
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), approaches)
+
+        # The same data, shuffled, as a table.
+        table = load_approach_table(TEST_CAD_FILE)
+        order = list(range(len(table)))
+        random.Random(22).shuffle(order)
+        shuffled = ApproachTable()
+        for row in order:
+            shuffled.append(table.designation(row), table.minutes[row], table.distances[row], table.velocities[row])
+        cls.table_db = NEODatabase(load_neos(TEST_NEO_FILE), shuffled)
+
+        cls.neos = [neo for db in (cls.db, cls.table_db)
+                    for neo in db._designations_mapping.values() if len(neo.approaches) > 1]
+
+    def test_approaches_are_sorted_by_time(self):
+        self.assertTrue(self.neos)
+        for neo in self.neos:
+            keys = [time_order(approach) for approach in neo.approaches]
+            self.assertEqual(keys, sorted(keys))
+
+    def test_approaches_between_match_a_scan(self):
+        rng = random.Random(22)
+        for neo in self.neos:
+            for start, end in zip(random_datetimes(rng, 5), random_datetimes(rng, 5)):
+                expected = [approach for approach in neo.approaches if start <= approach.time < end]
+                self.assertEqual(neo.approaches_between(start, end), expected)
+            self.assertEqual(list(neo.approaches_between()), list(neo.approaches))
+
+    def test_dates_stand_for_the_start_of_the_day(self):
+        for neo in self.neos:
+            approach = neo.approaches[0]
+            day = approach.time.date()
+            self.assertIn(approach, neo.approaches_between(day, day + datetime.timedelta(days=1)))
+            self.assertNotIn(approach, neo.approaches_between(None, day))
+            self.assertIs(type(neo.next_approach(day)), type(approach))
+            self.assertEqual(neo.next_approach(day).time.date(), day)
+
+    def test_next_and_previous_approaches_match_a_scan(self):
+        rng = random.Random(22)
+        for neo in self.neos:
+            for time in random_datetimes(rng, 5) + [approach.time for approach in neo.approaches]:
+                after = [approach for approach in neo.approaches if approach.time >= time]
+                before = [approach for approach in neo.approaches if approach.time < time]
+                self.assertEqual(neo.next_approach(time), after[0] if after else None)
+                self.assertEqual(neo.previous_approach(time), before[-1] if before else None)
+
+    def test_next_and_previous_default_to_the_day_of_the_inspection(self):
+        parser = main.make_parser()[0]
+        args = parser.parse_args(['inspect', '--pdes', self.neos[0].designation, '--next', '--previous'])
+        self.assertIs(args.next, main.TODAY)
+        self.assertIs(args.previous, main.TODAY)
+
+        class LaterDate(datetime.date):
+            @classmethod
+            def today(cls):
+                return cls(2020, 6, 1)
+
+        output = io.StringIO()
+        with unittest.mock.patch('datetime.date', LaterDate), contextlib.redirect_stdout(output):
+            main.inspect(self.db, pdes=args.pdes, next_date=args.next, previous_date=args.previous)
+        self.assertIn("Next approach on or after 2020-06-01", output.getvalue())
+        self.assertIn("Previous approach before 2020-06-01", output.getvalue())
+
+
+class TestApproachesNear(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.approaches = list(load_approaches(TEST_CAD_FILE))
+        random.Random(24).shuffle(cls.approaches)
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), cls.approaches)
+        cls.table_db = NEODatabase(load_neos(TEST_NEO_FILE), load_approach_table(TEST_CAD_FILE))
+
+    def scan(self, approaches, time, window, filters=()):
+        lo, hi = time - window, time + window
+        matches = [approach for approach in approaches
+                   if lo <= approach.time <= hi and all(f(approach) for f in filters)]
+        return sorted(matches, key=time_order)
+
+    def test_approaches_near_match_a_scan(self):
+        rng = random.Random(24)
+        filters = create_filters(distance_max=0.2)
+        for db in (self.db, self.table_db):
+            approaches = list(db.query())
+            for time in random_datetimes(rng, 30):
+                window = datetime.timedelta(minutes=rng.randrange(5 * 1440))
+                self.assertEqual(db.approaches_near(time, window), self.scan(approaches, time, window))
+                self.assertEqual(db.approaches_near(time, window, filters),
+                                 self.scan(approaches, time, window, filters))
+            day = datetime.date(2020, 3, 1)
+            self.assertEqual(db.approaches_near(day, 2),
+                             self.scan(approaches, datetime.datetime(2020, 3, 1), datetime.timedelta(days=2)))
+
+    def test_many_times_match_one_time_at_a_time(self):
+        rng = random.Random(24)
+        times = random_datetimes(rng, 200)
+        filters = create_filters(hazardous=False)
+        for window in (0, 0.5, 3):
+            self.assertEqual(self.db.approaches_near_many(times, window, filters),
+                             [self.db.approaches_near(time, window, filters) for time in times])
+        self.assertEqual(self.db.approaches_near_many([], 1), [])
+        with self.assertRaises(ValueError):
+            self.db.approaches_near(times[0], -1)
+
+    def test_around_selects_the_days_within_the_window(self):
+        day = datetime.date(2020, 6, 15)
+        filters = create_filters(around=day, window=3)
+        expected = [approach for approach in self.approaches
+                    if day - datetime.timedelta(days=3) <= approach.time.date() <= day + datetime.timedelta(days=3)]
+        self.assertEqual(list(self.db.query(filters)), expected)
+        narrowed = create_filters(around=day, window=3, start_date=day)
+        self.assertEqual(list(self.db.query(narrowed)), [approach for approach in expected
+                                                         if approach.time.date() >= day])
+        with self.assertRaises(ValueError):
+            create_filters(around=day, window=-1)
+
+    def test_windows_are_checked_by_the_parser(self):
+        query_parser = main.make_parser()[2]
+        args = main.NEOShell.parse_arg_with('--around 2020-06-15', query_parser)
+        self.assertEqual(repr(main.filters_from_args(args)),
+                         repr(create_filters(around=datetime.date(2020, 6, 15), window=1)))
+        args = main.NEOShell.parse_arg_with('--around 2020-06-15 --window 0', query_parser)
+        self.assertEqual(args.window, 0)
+        for arg in ('--around 2020-06-15 --window -2', '--around 2020-06-15 --window 1.5', '--window 2'):
+            with contextlib.redirect_stderr(io.StringIO()) as errors:
+                self.assertIsNone(main.NEOShell.parse_arg_with(arg, query_parser), msg=arg)
+            self.assertIn('--window', errors.getvalue(), msg=arg)
@@ -0,0 +1,78 @@
+"""Check that filters evaluated over NumPy columns match those evaluated one approach at a time.
+
+These tests are skipped if NumPy isn't installed.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_vectorized
+"""
+import datetime
+import operator
+import pathlib
+import pickle
+import random
+import unittest
+
+from database import NEODatabase
+from extract import load_neos, load_approaches, load_approach_table
+from filters import create_filters, AttributeFilter, DistanceFilter, DateFilter
+import vectorized
+
+from tests.criteria import random_criteria
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+class NameFilter(AttributeFilter):
+    """A filter that can't be evaluated as a mask."""
+
+    @classmethod
+    def get(cls, approach):
+        return approach.neo.name
+
+
+@unittest.skipIf(not vectorized.available(), "NumPy isn't installed")
+class TestVectorizedQuery(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.scalar = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE), vectorize=False)
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+        cls.table_db = NEODatabase(load_neos(TEST_NEO_FILE), load_approach_table(TEST_CAD_FILE))
+
+    def assertSameResults(self, filters):
+        expected = [str(approach) for approach in self.scalar.query(filters)]
+        self.assertEqual([str(approach) for approach in self.db.query(filters)], expected)
+        self.assertEqual([str(approach) for approach in self.table_db.query(filters)], expected)
+
+    def test_scalar_database_has_no_engine(self):
+        list(self.scalar.query(create_filters(distance_min=0.01)))
+        self.assertIsNone(self.scalar._engine)
+
+    def test_full_scans_use_the_engine(self):
+        self.assertSameResults(create_filters(distance_min=0.01, hazardous=False))
+        self.assertIsNotNone(self.db._engine)
+
+    def test_randomized_filters(self):
+        rng = random.Random(14)
+        for _ in range(100):
+            self.assertSameResults(create_filters(**random_criteria(rng)))
+
+    def test_attribute_filters(self):
+        self.assertSameResults([DateFilter(operator.ge, datetime.date(2020, 6, 1)), DistanceFilter(operator.lt, 0.2)])
+
+    def test_filters_without_masks_are_evaluated_on_matching_rows(self):
+        self.assertSameResults([NameFilter(operator.ne, None), DistanceFilter(operator.lt, 0.3)])
+
+    def test_engine_is_not_pickled(self):
+        list(self.db.query(create_filters(distance_min=0.01)))
+        state = pickle.loads(pickle.dumps(self.db))
+        self.assertIsNone(state._engine)
+        self.assertEqual(len(list(state.query(create_filters(distance_min=0.01)))),
+                         len(list(self.db.query(create_filters(distance_min=0.01)))))
+
+
+if __name__ == '__main__':
+    unittest.main()
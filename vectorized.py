@@ -0,0 +1,193 @@
+"""Evaluate filters on many close approaches at once, over NumPy arrays.
+
+A `VectorizedEngine` holds the columns of the approaches of an `NEODatabase` -
+including the diameter and hazardousness of their NEOs, fanned out to each of
+their approaches - as NumPy arrays. Each filter is then evaluated on a whole
+column at once, as a boolean mask, and only the rows that match every filter
+are turned into `CloseApproach` objects by the database. The engine also
+computes the running totals of aggregations (see `aggregate`) over whole
+columns, grouping rows by sorting their group codes.
+
+NumPy is optional: if it isn't installed, `available()` is False and the
+database evaluates its filters one approach at a time instead.
+
+The engine copies the columns of the `ApproachTable`, and remembers which
+version of the table it copied (see `ApproachTable.version`).
+"""
+import operator
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from aggregate import month_label
+from filters import RangeFilter, DateFilter, DistanceFilter, VelocityFilter, DiameterFilter, HazardousFilter
+from table import NO_TIME, NO_NEO
+
+
+# Below this many candidate rows, the fixed cost of building masks outweighs the gain.
+MIN_ROWS = 256
+
+# The ordinal of 1970-01-01, the epoch of NumPy's `datetime64`.
+_EPOCH_ORDINAL = 719163
+
+# The operators that NumPy applies elementwise.
+_VECTOR_OPS = {operator.eq, operator.ne, operator.lt, operator.le, operator.gt, operator.ge}
+
+# The column that each kind of (non-range) filter compares, by its type.
+_FILTER_COLUMNS = {
+    DateFilter: 'day',
+    DistanceFilter: 'distance',
+    VelocityFilter: 'velocity',
+    DiameterFilter: 'diameter',
+    HazardousFilter: 'hazardous',
+}
+
+
+def available():
+    """Return whether NumPy is installed, and so whether a `VectorizedEngine` can be built."""
+    return numpy is not None
+
+
+class VectorizedEngine:
+    """The columns of the approaches of a database, as NumPy arrays."""
+
+    def __init__(self, database):
+        """Create a new `VectorizedEngine` over the approaches of a database.
+
+        :param database: An `NEODatabase`.
+        """
+        table = database._table
+        self.version = table.version
+        self.columns = {
+            'time': numpy.array(table.minutes, dtype=numpy.int64),
+            'distance': numpy.array(table.distances, dtype=numpy.float64),
+            'velocity': numpy.array(table.velocities, dtype=numpy.float64),
+            'diameter': numpy.array(database._column('diameter'), dtype=numpy.float64),
+            'hazardous': numpy.array(database._column('hazardous'), dtype=numpy.bool_),
+            'neo': numpy.array(table.neo_indexes, dtype=numpy.int64),
+        }
+        self.columns['day'] = self.columns['time'] // 1440
+        self._has_time = self.columns['time'] != NO_TIME
+        self._neos = table.neos
+
+    def filter_rows(self, rows, filters):
+        """Select the rows that satisfy the filters that can be evaluated as masks.
+
+        :param rows: A sequence of candidate row numbers, in internal order.
+        :param filters: A collection of filters.
+        :return: A pair of the selected row numbers (in internal order) and a list of the filters that still need to be evaluated on them.
+        """
+        if isinstance(rows, range) and rows == range(len(self._has_time)):
+            selection = None
+        else:
+            selection = numpy.asarray(rows, dtype=numpy.intp)
+
+        mask = None
+        remaining = []
+        for f in filters:
+            condition = self._mask(f, selection)
+            if condition is None:
+                remaining.append(f)
+            else:
+                mask = condition if mask is None else mask & condition
+
+        if mask is None:
+            return rows, remaining
+        if selection is None:
+            return numpy.flatnonzero(mask).tolist(), remaining
+        return selection[mask].tolist(), remaining
+
+    def group_totals(self, rows, group_by=None):
+        """Compute the running total of each group of rows, as `aggregate.group_totals` does.
+
+        Rows that have no group here - those without a time when grouping by
+        year or month, and those without a known NEO when grouping by NEO - are
+        left for `aggregate.group_totals` to total.
+
+        :param rows: A sequence of row numbers.
+        :param group_by: One of `aggregate.GROUPINGS`, or None to put every row in one group.
+        :return: A pair of a dictionary from group labels to running totals, and a list of the rows left out.
+        """
+        selection = numpy.asarray(rows, dtype=numpy.intp)
+        if group_by == 'neo':
+            codes = self.columns['neo'][selection]
+            grouped = codes != NO_NEO
+        elif group_by is not None:
+            grouped = self._has_time[selection]
+            dates = (self.columns['day'][selection] - _EPOCH_ORDINAL).astype('datetime64[D]')
+            codes = dates.astype('datetime64[Y]' if group_by == 'year' else 'datetime64[M]').astype(numpy.int64)
+        else:
+            codes = numpy.zeros(len(selection), dtype=numpy.int64)
+            grouped = None
+
+        if grouped is None:
+            left_out = []
+        else:
+            left_out = selection[~grouped].tolist()
+            selection, codes = selection[grouped], codes[grouped]
+        if len(selection) == 0:
+            return {}, left_out
+
+        # Sort the rows by group, keeping their order within each group, and reduce each run of a group.
+        order = numpy.argsort(codes, kind='stable')
+        codes, selection = codes[order], selection[order]
+        starts = numpy.flatnonzero(numpy.concatenate(([True], codes[1:] != codes[:-1])))
+        counts = numpy.diff(numpy.append(starts, len(codes)))
+        columns = []
+        for name in ('distance', 'velocity'):
+            # Values that aren't known (NaN) are left out, as `aggregate.group_totals` leaves them out.
+            values = self.columns[name][selection]
+            known = ~numpy.isnan(values)
+            minimums = numpy.fmin.reduceat(values, starts)
+            maximums = numpy.fmax.reduceat(values, starts)
+            # A group without any known value has the bounds of an empty running total.
+            columns.extend((numpy.where(numpy.isnan(minimums), numpy.inf, minimums),
+                            numpy.where(numpy.isnan(maximums), -numpy.inf, maximums),
+                            numpy.add.reduceat(numpy.where(known, values, 0.0), starts),
+                            numpy.add.reduceat(known.astype(numpy.int64), starts)))
+
+        totals = {}
+        for position, code in enumerate(codes[starts].tolist()):
+            if group_by is None:
+                label = None
+            elif group_by == 'neo':
+                label = self._neos[code].designation
+            elif group_by == 'year':
+                label = 1970 + code
+            else:
+                label = month_label(1970 + code // 12, code % 12 + 1)
+            totals[label] = [int(counts[position])] + [column[position].item() for column in columns]
+        return totals, left_out
+
+    def _mask(self, f, selection):
+        """Evaluate a filter on the selected rows.
+
+        :return: A boolean array, or None if the filter can't be evaluated as a mask.
+        """
+        if isinstance(f, RangeFilter):
+            name = f.attribute
+            comparisons = f.comparisons()
+        else:
+            name = _FILTER_COLUMNS.get(type(f))
+            comparisons = [(f.op, f.value)]
+        if name is None or not all(op in _VECTOR_OPS for op, _ in comparisons):
+            return None
+
+        column = self.columns[name]
+        if selection is not None:
+            column = column[selection]
+        mask = None
+        for op, value in comparisons:
+            condition = op(column, value)
+            mask = condition if mask is None else mask & condition
+        if name in ('time', 'day'):
+            # An approach without a time satisfies no criterion on its time.
+            has_time = self._has_time if selection is None else self._has_time[selection]
+            mask = has_time if mask is None else mask & has_time
+        elif name == 'hazardous':
+            # Nor does an approach without a known NEO satisfy a criterion on its hazardousness.
+            neos = self.columns['neo'] if selection is None else self.columns['neo'][selection]
+            mask = mask & (neos != NO_NEO)
+        return mask